@@ -0,0 +1,95 @@
+import json
+import os
+
+JOURNAL_SUFFIX = '.journal'
+
+
+def journal_path(labels_csv_path):
+    """ The journal lives next to the labels CSV it amends. """
+    return f"{labels_csv_path}{JOURNAL_SUFFIX}"
+
+
+class LabelJournal:
+    """
+    Append-only log of label edits made since the labels CSV was last written in full.
+    One JSON record per line: {"f": start, "t": stop, "l": label, "v": value} sets frames
+    [start, stop) of a label, {"drop": label} clears a deleted label. Replaying the journal on top
+    of the CSV restores the session; compaction rewrites the CSV and drops the replayed prefix.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def append(self, changes):
+        """ Appends LabelStore change records and flushes them to disk. Returns the number written. """
+        if not changes:
+            return 0
+        lines = []
+        for record in changes:
+            if record[0] == "set":
+                _, start, stop, label, value = record
+                lines.append(json.dumps({"f": start, "t": stop, "l": label, "v": value}))
+            elif record[0] == "drop":
+                lines.append(json.dumps({"drop": record[1]}))
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return len(lines)
+
+    def replay(self, label_store, label_names=None):
+        """
+        Applies the journal to label_store. Records for labels outside label_names are skipped, and a
+        truncated last line (crash during a write) is ignored. Returns the number of records applied.
+        """
+        if not self.exists():
+            return 0
+        applied = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if "drop" in record:
+                    label = record["drop"]
+                    if label_names is not None and label not in label_names:
+                        continue
+                    numeric = label_store.has_label(label) and label_store.is_numeric(label)
+                    label_store.remove_label(label)
+                    label_store.add_label(label, numeric=numeric)
+                else:
+                    if label_names is not None and record["l"] not in label_names:
+                        continue
+                    label_store.fill_range({record["l"]: record["v"]}, record["f"], record["t"])
+                applied += 1
+        return applied
+
+    def truncate_before(self, offset):
+        """ Drops the first offset bytes (already compacted into the CSV), keeping later records. """
+        if not self.exists():
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            remainder = f.read()
+        if not remainder:
+            self.discard()
+            return
+        with open(f"{self.path}.tmp", 'wb') as f:
+            f.write(remainder)
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,63 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from utils import OperationCancelled
+
+
+class TaskContext:
+    """
+    Handed to a background function as its first argument. Lets the function report progress and
+    notice cancellation; check_cancelled() raises OperationCancelled once cancel() was requested.
+    """
+
+    def __init__(self, progress_callback=None):
+        self._cancel_event = threading.Event()
+        self._progress_callback = progress_callback
+
+    def report(self, done, total, message=""):
+        self.check_cancelled()
+        if self._progress_callback is not None:
+            self._progress_callback(int(done), int(total), message)
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise OperationCancelled()
+
+
+class BackgroundTask(QThread):
+    """
+    Runs fn(context, *args, **kwargs) on a worker thread. The result, an error message or the
+    cancellation is delivered through signals, which are queued to the receiver's (GUI) thread.
+    """
+    progress = pyqtSignal(int, int, str)
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, description, fn, *args, parent=None, **kwargs):
+        super().__init__(parent)
+        self.description = description
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        self.context = TaskContext(self.progress.emit)
+
+    def cancel(self):
+        self.context.cancel()
+
+    def run(self):
+        try:
+            result = self._fn(self.context, *self._args, **self._kwargs)
+            self.context.check_cancelled()
+        except OperationCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(f"{e}")
+        else:
+            self.succeeded.emit(result)
@@ -0,0 +1,277 @@
+import os
+import numpy as np
+import pandas as pd
+
+from utils import orient_keypoints
+
+try:
+    import pyarrow  # noqa: F401  (engine behind pandas' Parquet/Feather writers)
+except ImportError:
+    pyarrow = None
+
+ID_COLUMNS = ["climber_id", "route_id", "frame"]
+# Export targets by file extension. Parquet and Feather keep column types (string labels as
+# categoricals) and are compressed; the .npz holds the keypoint tensor plus one array per label.
+EXPORT_FORMATS = {".csv": "csv", ".parquet": "parquet", ".feather": "feather", ".npz": "npz"}
+COLUMNAR_COMPRESSION = "zstd"
+# Frames per chunk of the streamed CSV writers; peak memory is one chunk's table, whatever the length.
+CSV_CHUNK_FRAMES = 8192
+_NAN_TEXTS = ("nan", "+nan", "-nan")
+
+
+def parse_float_texts(texts):
+    """
+    Vectorised float(text) with the label export rule: blank or unparseable entries become 0.0.
+    Returns a float64 array.
+    """
+    texts = pd.Series(texts, dtype=object).astype(str)
+    stripped = texts.str.strip()
+    values = pd.to_numeric(stripped, errors="coerce")
+    # to_numeric gives NaN for unparseable text; only a literal "nan" should stay NaN, as with float().
+    values = values.where(values.notna() | stripped.str.lower().isin(_NAN_TEXTS), 0.0)
+    return values.where(stripped != "", 0.0).to_numpy(dtype=np.float64)
+
+
+def keypoint_columns(num_keypoints):
+    columns = []
+    for i in range(num_keypoints):
+        columns.extend([f"kp{i}_x", f"kp{i}_y", f"kp{i}_z"])
+    return columns
+
+
+def export_columns(num_keypoints, label_names):
+    """ Column order of the exported CSV. """
+    return ID_COLUMNS + keypoint_columns(num_keypoints) + list(label_names)
+
+
+def label_file_columns(label_names):
+    """ Column order of the labels-only working file. """
+    return ID_COLUMNS + list(label_names)
+
+
+def export_label_values(label_store, name, is_numeric, start, stop):
+    """
+    Values of one label for frames [start, stop), coerced as in the CSV: float64 for numeric labels
+    (blank/unparseable -> 0.0) and an object array of str for the others. Frames or labels missing
+    from the store get the default value.
+    """
+    num_frames = stop - start
+    available_stop = min(stop, len(label_store))
+    if is_numeric:
+        values = np.zeros(num_frames, dtype=np.float64)
+    else:
+        values = np.full(num_frames, "", dtype=object)
+    if not label_store.has_label(name) or available_stop <= start:
+        return values
+
+    available = available_stop - start
+    if label_store.is_numeric(name):
+        stored = label_store.column_values(name, start, available_stop)
+        if is_numeric:
+            values[:available] = stored
+        else:
+            texts, inverse = np.unique(stored, return_inverse=True)
+            values[:available] = np.array([str(float(v)) for v in texts], dtype=object)[inverse]
+    else:
+        # Coerce each distinct string once, then expand through the category codes.
+        codes, categories = label_store.categorical(name, start, available_stop)
+        if is_numeric:
+            values[:available] = parse_float_texts(categories)[codes]
+        else:
+            values[:available] = np.asarray(categories, dtype=object)[codes]
+    return values
+
+
+def _id_frame(climber_id, route_id, start, stop):
+    num_frames = stop - start
+    return pd.DataFrame({
+        "climber_id": np.full(num_frames, climber_id, dtype=object),
+        "route_id": np.full(num_frames, route_id, dtype=object),
+        "frame": np.arange(start, stop, dtype=np.int64),
+    })
+
+
+def _label_frame(label_store, label_names, label_is_numeric, start, stop, index):
+    labels = pd.DataFrame({
+        position: export_label_values(label_store, name, label_is_numeric.get(name, False), start, stop)
+        for position, name in enumerate(label_names)
+    }, index=index)
+    labels.columns = list(label_names)
+    return labels
+
+
+def build_label_frame(label_store, label_names, label_is_numeric, climber_id, route_id, num_frames,
+                      start=0, stop=None):
+    """
+    Builds the labels-only working table (IDs, frame and label columns) for frames [start, stop) of a
+    num_frames long sequence. It holds the same label values as the export, minus the keypoints.
+    """
+    stop = num_frames if stop is None else min(stop, num_frames)
+    ids = _id_frame(climber_id, route_id, start, stop)
+    return pd.concat([ids, _label_frame(label_store, label_names, label_is_numeric, start, stop, ids.index)], axis=1)
+
+
+def build_export_frame(keypoints, axis_signs, label_store, label_names, label_is_numeric,
+                       climber_id, route_id, start=0, stop=None):
+    """
+    Builds the export table for frames [start, stop) in one go: the oriented keypoint block is
+    reshaped into the kp{i}_x/y/z columns and every label column comes from a whole array.
+    """
+    stop = keypoints.shape[0] if stop is None else min(stop, keypoints.shape[0])
+    block = orient_keypoints(keypoints[start:stop], axis_signs)
+    num_frames, num_keypoints = block.shape[0], block.shape[1]
+
+    ids = _id_frame(climber_id, route_id, start, stop)
+    coordinates = pd.DataFrame(block.reshape(num_frames, num_keypoints * 3), columns=keypoint_columns(num_keypoints))
+    labels = _label_frame(label_store, label_names, label_is_numeric, start, stop, ids.index)
+    return pd.concat([ids, coordinates, labels], axis=1)
+
+
+def write_csv_chunks(path, num_frames, build_chunk, chunk_frames=CSV_CHUNK_FRAMES, progress=None):
+    """
+    Streams the table build_chunk(start, stop) returns for consecutive frame chunks into one CSV,
+    with the header written once. The bytes are the same as writing the whole table at once.
+    progress(done_frames, num_frames) is called after each chunk.
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        start = 0
+        while True:
+            stop = min(start + chunk_frames, num_frames)
+            build_chunk(start, stop).to_csv(f, header=start == 0, index=False)
+            if progress is not None:
+                progress(stop, num_frames)
+            if stop >= num_frames:
+                break
+            start = stop
+
+
+def write_label_csv(path, label_store, label_names, label_is_numeric, climber_id, route_id, num_frames,
+                    chunk_frames=CSV_CHUNK_FRAMES, progress=None):
+    """ Writes the labels-only working file (see build_label_frame) in frame chunks. """
+    write_csv_chunks(path, num_frames,
+                     lambda start, stop: build_label_frame(label_store, label_names, label_is_numeric,
+                                                           climber_id, route_id, num_frames, start, stop),
+                     chunk_frames, progress)
+
+
+def write_export_csv(path, keypoints, axis_signs, label_store, label_names, label_is_numeric, climber_id, route_id,
+                     chunk_frames=CSV_CHUNK_FRAMES, progress=None):
+    """
+    Writes the merged CSV (see build_export_frame) in frame chunks read straight from the keypoint
+    array, so a memory-mapped sequence is never loaded or oriented as a whole.
+    """
+    write_csv_chunks(path, keypoints.shape[0],
+                     lambda start, stop: build_export_frame(keypoints, axis_signs, label_store, label_names,
+                                                            label_is_numeric, climber_id, route_id, start, stop),
+                     chunk_frames, progress)
+
+
+def export_label_codes(label_store, name, start, stop):
+    """
+    String values of one label for frames [start, stop) as (codes, categories). A string column of
+    the store is already coded, so its codes are used as they are.
+    """
+    if label_store.has_label(name) and not label_store.is_numeric(name) and len(label_store) >= stop:
+        codes, categories = label_store.categorical(name, start, stop)
+        return np.asarray(codes, dtype=np.int32), list(categories)
+    values = export_label_values(label_store, name, False, start, stop)
+    categories, codes = np.unique(values.astype(str), return_inverse=True)
+    return codes.astype(np.int32), categories.tolist()
+
+
+def build_columnar_export_frame(keypoints, axis_signs, label_store, label_names, label_is_numeric,
+                                climber_id, route_id):
+    """
+    Typed variant of build_export_frame for the columnar formats: keypoints keep their dtype, numeric
+    labels are float64 and the IDs and string labels are categoricals.
+    """
+    num_frames = keypoints.shape[0]
+    block = orient_keypoints(keypoints, axis_signs)
+    columns = {
+        "climber_id": pd.Categorical.from_codes(np.zeros(num_frames, dtype=np.int8), [climber_id]),
+        "route_id": pd.Categorical.from_codes(np.zeros(num_frames, dtype=np.int8), [route_id]),
+        "frame": np.arange(num_frames, dtype=np.int64),
+    }
+    flat = block.reshape(num_frames, -1)
+    for position, column in enumerate(keypoint_columns(block.shape[1])):
+        columns[column] = flat[:, position]
+    for name in label_names:
+        if name in columns:
+            continue
+        if label_is_numeric.get(name, False):
+            columns[name] = export_label_values(label_store, name, True, 0, num_frames)
+        else:
+            codes, categories = export_label_codes(label_store, name, 0, num_frames)
+            columns[name] = pd.Categorical.from_codes(codes, categories)
+    return pd.DataFrame(columns)
+
+
+def export_format(path):
+    """ Export format for path, from its extension. Raises ValueError for unsupported extensions. """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{extension}'. Use one of: {', '.join(EXPORT_FORMATS)}.")
+    file_format = EXPORT_FORMATS[extension]
+    if file_format in ("parquet", "feather") and pyarrow is None:
+        raise ValueError(f"{file_format.capitalize()} export needs the optional 'pyarrow' package.")
+    return file_format
+
+
+def available_export_formats():
+    """ Extensions that can be exported with the installed packages. """
+    return [extension for extension, file_format in EXPORT_FORMATS.items()
+            if pyarrow is not None or file_format not in ("parquet", "feather")]
+
+
+def write_npz_export(file, keypoints, axis_signs, label_store, label_names, label_is_numeric, climber_id, route_id,
+                     skeleton=None):
+    """
+    Writes a compressed .npz: 'keypoints' (frames, joints, 3) in export orientation, 'frame', the IDs,
+    'label_names', and per label 'labels/<name>': float64 values for numeric labels, int32 codes
+    into 'categories/<name>' for the others. With a Skeleton, its name and (n, 2) uint32 'limbs' are added.
+    """
+    num_frames = keypoints.shape[0]
+    arrays = {
+        "keypoints": orient_keypoints(keypoints, axis_signs),
+        "frame": np.arange(num_frames, dtype=np.int64),
+        "climber_id": np.array(climber_id),
+        "route_id": np.array(route_id),
+        "label_names": np.array(list(dict.fromkeys(label_names)), dtype=str),
+    }
+    for name in dict.fromkeys(label_names):
+        if label_is_numeric.get(name, False):
+            arrays[f"labels/{name}"] = export_label_values(label_store, name, True, 0, num_frames)
+        else:
+            codes, categories = export_label_codes(label_store, name, 0, num_frames)
+            arrays[f"labels/{name}"] = codes
+            arrays[f"categories/{name}"] = np.array(categories, dtype=str)
+    if skeleton is not None:
+        arrays["skeleton"] = np.array(skeleton.name)
+        arrays["limbs"] = skeleton.limbs
+    np.savez_compressed(file, **arrays)
+
+
+def write_export(path, file_format, keypoints, axis_signs, label_store, label_names, label_is_numeric,
+                 climber_id, route_id, progress=None, skeleton=None):
+    """
+    Writes the merged dataset to path in file_format ('csv', 'parquet', 'feather' or 'npz').
+    The CSV is streamed in chunks and reports progress(done_frames, total_frames). The skeleton's
+    limbs are stored with the .npz format only.
+    """
+    if file_format == "csv":
+        write_export_csv(path, keypoints, axis_signs, label_store, label_names, label_is_numeric,
+                         climber_id, route_id, progress=progress)
+    elif file_format == "npz":
+        # A file object, since np.savez would append '.npz' to a path without that extension.
+        with open(path, 'wb') as f:
+            write_npz_export(f, keypoints, axis_signs, label_store, label_names, label_is_numeric,
+                             climber_id, route_id, skeleton)
+    elif file_format in ("parquet", "feather"):
+        df = build_columnar_export_frame(keypoints, axis_signs, label_store, label_names, label_is_numeric,
+                                         climber_id, route_id)
+        if file_format == "parquet":
+            df.to_parquet(path, index=False, compression=COLUMNAR_COMPRESSION)
+        else:
+            df.to_feather(path, compression=COLUMNAR_COMPRESSION)
+    else:
+        raise ValueError(f"Unknown export format '{file_format}'.")
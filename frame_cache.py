@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_FRAME_CACHE_MB = 512
+
+
+class FrameCache:
+    """
+    Thread-safe LRU cache of decoded frames (NumPy arrays) under a byte budget. Keys are whatever
+    identifies a frame for the caller, e.g. (frame_index, display_size). Hit and miss counts are
+    kept so the budget can be tuned.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_FRAME_CACHE_MB * 1024 * 1024):
+        self._lock = threading.Lock()
+        self._frames = OrderedDict()
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def peek(self, key):
+        """ Like get, but does not count a hit or miss or refresh the entry. """
+        with self._lock:
+            return key in self._frames
+
+    def put(self, key, frame):
+        """ Stores frame (which must not be modified afterwards) and evicts the least recently used. """
+        if frame.nbytes > self._max_bytes:
+            return
+        with self._lock:
+            old = self._frames.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._frames[key] = frame
+            self._bytes += frame.nbytes
+            self._evict()
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """ Returns a dict with hits, misses, frames, bytes and max_bytes. """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "frames": len(self._frames),
+                    "bytes": self._bytes, "max_bytes": self._max_bytes}
+
+    def __len__(self):
+        return len(self._frames)
+
+    def _evict(self):
+        while self._bytes > self._max_bytes and self._frames:
+            _, frame = self._frames.popitem(last=False)
+            self._bytes -= frame.nbytes
@@ -0,0 +1,45 @@
+import cv2
+import numpy as np
+from PyQt6.QtGui import QImage
+
+from video_reader import fitted_size
+
+
+class FramePresenter:
+    """
+    Turns BGR frames into QImages sized for a label. The frame is resized straight into a reused
+    buffer and wrapped as a Format_BGR888 image, so there is no colour conversion and no full-resolution
+    intermediate; a frame that already has the target size (the display-size cache) is wrapped as is.
+    The returned image shares memory with the buffer or frame: convert it (QPixmap.fromImage) before
+    the next call.
+    """
+
+    def __init__(self):
+        self._buffer = None
+        self.allocations = 0
+
+    def to_image(self, frame, width, height, fast=False):
+        """ QImage of frame scaled to fit width x height, or None if the area is empty. """
+        if width <= 0 or height <= 0:
+            return None
+        h, w = frame.shape[:2]
+        size = fitted_size(w, h, width, height)
+        if size == (w, h) and frame.flags['C_CONTIGUOUS']:
+            image = frame
+        else:
+            image = self._resize(frame, size, fast)
+        return QImage(image.data, image.shape[1], image.shape[0], image.strides[0], QImage.Format.Format_BGR888)
+
+    def _resize(self, frame, size, fast):
+        shape = (size[1], size[0], 3)
+        if self._buffer is None or self._buffer.shape != shape:
+            self._buffer = np.empty(shape, dtype=np.uint8)
+            self.allocations += 1
+        if fast:
+            interpolation = cv2.INTER_NEAREST
+        elif size[0] < frame.shape[1]:
+            interpolation = cv2.INTER_AREA
+        else:
+            interpolation = cv2.INTER_LINEAR
+        cv2.resize(frame, size, dst=self._buffer, interpolation=interpolation)
+        return self._buffer
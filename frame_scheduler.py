@@ -0,0 +1,49 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+class FrameRequestScheduler(QObject):
+    """
+    Latest-wins frame requests. Every request replaces the pending one, and render(index, preview)
+    is emitted at most once per event-loop pass (and per min_interval_ms), so a burst of slider ticks
+    costs one render of the newest target instead of one per tick.
+    """
+    render = pyqtSignal(int, bool)
+
+    def __init__(self, parent=None, min_interval_ms=0):
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(min_interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self._pending = None
+        self.requested = 0
+        self.rendered = 0
+
+    @property
+    def dropped(self):
+        """ Requests superseded before they were rendered. """
+        return self.requested - self.rendered - (self._pending is not None)
+
+    def request(self, index, preview=False):
+        self.requested += 1
+        self._pending = (index, preview)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """ Renders the pending request now, if there is one. """
+        self._timer.stop()
+        if self._pending is None:
+            return
+        index, preview = self._pending
+        self._pending = None
+        self.rendered += 1
+        self.render.emit(index, preview)
+
+    def cancel(self):
+        """ Drops the pending request, e.g. when the frame was changed some other way since. """
+        self._timer.stop()
+        self._pending = None
+
+    def has_pending(self):
+        return self._pending is not None
@@ -2,28 +2,49 @@
 import sys
 import os
 import numpy as np
-import cv2
 import pandas as pd
 from datetime import datetime
 from PyQt6.QtWidgets import (QMainWindow, QHBoxLayout, QVBoxLayout, QLabel,
                              QWidget, QPushButton, QFileDialog, QLineEdit,
                              QFormLayout, QCheckBox, QScrollArea, QMessageBox,
                              QSizePolicy, QStatusBar, QSlider, QApplication,
-                             QDialog, QDialogButtonBox, QListWidget, QListWidgetItem)
-from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QImage, QPixmap, QCloseEvent, QIntValidator
-
-from open_gl_widget import OpenGLWidget
-from utils import load_keypoint_data
+                             QDialog, QDialogButtonBox, QListWidget, QListWidgetItem, QProgressBar,
+                             QSpinBox, QComboBox)
+from PyQt6.QtCore import Qt, QSize, QTimer
+from PyQt6.QtGui import QPixmap, QCloseEvent, QIntValidator
+
+from open_gl_widget import OpenGLWidget, DEFAULT_MAX_FPS
+from autosave import LabelJournal, journal_path
+from background import BackgroundTask, TaskContext
+from label_store import LabelStore
+from export import parse_float_texts, write_export, write_label_csv, export_format, available_export_formats
+from frame_cache import FrameCache, DEFAULT_FRAME_CACHE_MB
+from keyframe_index import load_or_build_keyframe_index
+from proxy import PROXY_WIDTH, build_proxy, find_proxy
+from prefetch import FramePrefetcher, DEFAULT_PREFETCH_WINDOW
+from frame_scheduler import FrameRequestScheduler
+from frame_presenter import FramePresenter
+from skeletons import SKELETONS, DEFAULT_SKELETON, load_skeleton, skeleton_for_joint_count
+from video_reader import VideoReader, fit_frame
+from utils import load_keypoint_data, keypoint_axis_signs, orient_keypoints
 import warnings
 
 
+EXPORT_FILE_FILTERS = {
+    ".csv": "CSV Files (*.csv)",
+    ".parquet": "Parquet Files (*.parquet)",
+    ".feather": "Feather Files (*.feather)",
+    ".npz": "NumPy Archive (*.npz)",
+}
+
+
 class LabelUIElements:
-    def __init__(self, name_widget, value_widget, numeric_checkbox, container_widget):
+    def __init__(self, name_widget, value_widget, numeric_checkbox, container_widget, delete_button=None):
         self.name_widget = name_widget
         self.value_widget = value_widget
         self.numeric_checkbox = numeric_checkbox
         self.container_widget = container_widget
+        self.delete_button = delete_button
 
 
 class SelectLabelsDialog(QDialog):
@@ -56,20 +77,45 @@ class Interface(QMainWindow):
     def __init__(self):
         super().__init__()
         self.keypoints = None
+        self.keypoint_axis_signs = None
         self.video_path = None
         self.keypoints_path = None
-        self.cap = None
+        self.video = None
+        # Decoded frames, keyed by (frame_index, size they were stored at); None is full resolution.
+        self.frame_cache = FrameCache(DEFAULT_FRAME_CACHE_MB * 1024 * 1024)
+        # Scales frames into a reused buffer and wraps them as QImages without colour conversion.
+        self.frame_presenter = FramePresenter()
+        # Decodes the frames around the current one into frame_cache on its own thread and capture.
+        self.prefetcher = None
+        # Low-resolution all-intra copy of the video used for display when "Use low-res proxy" is on.
+        self.proxy_video = None
+        self._proxy_task = None
+        # Slider moves are coalesced here: only the newest requested frame is rendered, and while the
+        # slider is dragged it is rendered as a cheap preview.
+        self.frame_scheduler = FrameRequestScheduler(self)
+        self.frame_scheduler.render.connect(self._render_requested_frame)
         self.total_frames = 0
         self.frame_index = 0
-        self.limbSeq = [[0, 1], [1, 2], [2, 3], [0, 4], [4, 5], [5, 6], [0, 7],
-                        [7, 8], [8, 9], [8, 11], [8, 14], [9, 10], [11, 12],
-                        [12, 13], [14, 15], [15, 16]]
+        # Joint topology from the skeleton registry; limbSeq is its limb list.
+        self.skeleton = SKELETONS[DEFAULT_SKELETON]
+        self.limbSeq = self.skeleton.limb_list()
         self.label_names = []
         self.label_is_numeric = {}
         self.label_ui_elements = {}
-        self.label_values = {}
+        # "runs" stores each label as constant segments (cheap for segment-style annotation),
+        # "dense" as one array slot per frame.
+        self.label_storage_mode = "runs"
+        self.label_values = LabelStore(mode=self.label_storage_mode)
         self.csv_file = None
         self._has_unsaved_changes = False
+        self._active_task = None
+        # Non-exclusive task (saves, journal compaction) that runs alongside editing.
+        self._save_task = None
+        # Label edits are appended to a journal next to the labels CSV on this interval; once the
+        # journal grows past journal_compaction_bytes it is folded into the CSV in the background.
+        self.autosave_interval_ms = 30000
+        self.journal_compaction_bytes = 4 * 1024 * 1024
+        self._journal = None
         self.initUI()
         self.update_widget_states()
 
@@ -79,6 +125,21 @@ class Interface(QMainWindow):
         self.statusBar = QStatusBar(self)
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage("Ready. Load video and keypoints to begin.")
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.hide()
+        self.cancel_task_button = QPushButton("Cancel", self)
+        self.cancel_task_button.setToolTip("Cancel the running task.")
+        self.cancel_task_button.clicked.connect(self.cancel_background_task)
+        self.cancel_task_button.hide()
+        self.cache_stats_label = QLabel("", self)
+        self.cache_stats_label.setToolTip("Decoded-frame cache: hits / misses, memory used / budget.")
+        self.statusBar.addPermanentWidget(self.cache_stats_label)
+        self.statusBar.addPermanentWidget(self.progress_bar)
+        self.statusBar.addPermanentWidget(self.cancel_task_button)
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.timeout.connect(self.autosave)
+        self.autosave_timer.start(self.autosave_interval_ms)
         central_widget = QWidget(self)
         self.setCentralWidget(central_widget)
         main_layout = QHBoxLayout(central_widget)
@@ -114,6 +175,7 @@ class Interface(QMainWindow):
         self.slider.setMinimum(0);
         self.slider.setMaximum(0)
         self.slider.valueChanged.connect(self.slider_update_frame)
+        self.slider.sliderReleased.connect(self.slider_released)
         nav_controls_group_layout.addWidget(self.slider)
         copy_until_layout = QHBoxLayout()
         copy_until_layout.addWidget(QLabel("Copy selected labels from current until frame:"))
@@ -143,6 +205,83 @@ class Interface(QMainWindow):
         file_layout.addRow(self.load_video_button, self.video_path_label);
         file_layout.addRow(self.load_keypoints_button, self.keypoints_path_label)
         right_panel.addLayout(file_layout)
+        skeleton_layout = QHBoxLayout()
+        skeleton_layout.addWidget(QLabel("Skeleton:"))
+        self.skeleton_combo = QComboBox(self)
+        self.skeleton_combo.addItems(list(SKELETONS))
+        self.skeleton_combo.setCurrentText(self.skeleton.name)
+        self.skeleton_combo.setToolTip("Joint topology used to draw limbs. Chosen to match the keypoints on load.")
+        self.skeleton_combo.currentTextChanged.connect(self.set_skeleton)
+        skeleton_layout.addWidget(self.skeleton_combo, stretch=1)
+        self.load_skeleton_button = QPushButton("Load Skeleton (.json)", self)
+        self.load_skeleton_button.setToolTip('JSON with "name", "num_joints" and "limbs" ([start, end] pairs).')
+        self.load_skeleton_button.clicked.connect(self.load_skeleton_file)
+        skeleton_layout.addWidget(self.load_skeleton_button)
+        right_panel.addLayout(skeleton_layout)
+        onion_layout = QHBoxLayout()
+        onion_layout.addWidget(QLabel("Onion skin (frames):"))
+        self.onion_spinbox = QSpinBox(self)
+        self.onion_spinbox.setRange(0, 600)
+        self.onion_spinbox.setValue(0)
+        self.onion_spinbox.setToolTip("Poses shown before (blue) and after (orange) the current frame. 0 turns it off.")
+        self.onion_spinbox.valueChanged.connect(self.update_onion_skin)
+        onion_layout.addWidget(self.onion_spinbox)
+        self.onion_ghosts_checkbox = QCheckBox("Ghosts", self)
+        self.onion_ghosts_checkbox.setChecked(True)
+        self.onion_ghosts_checkbox.toggled.connect(self.update_onion_skin)
+        onion_layout.addWidget(self.onion_ghosts_checkbox)
+        self.onion_trajectories_checkbox = QCheckBox("Trajectories", self)
+        self.onion_trajectories_checkbox.setChecked(True)
+        self.onion_trajectories_checkbox.toggled.connect(self.update_onion_skin)
+        onion_layout.addWidget(self.onion_trajectories_checkbox)
+        onion_layout.addStretch()
+        right_panel.addLayout(onion_layout)
+        view_layout = QHBoxLayout()
+        view_layout.addWidget(QLabel("3D view max FPS:"))
+        self.max_fps_spinbox = QSpinBox(self)
+        self.max_fps_spinbox.setRange(0, 240)
+        self.max_fps_spinbox.setValue(DEFAULT_MAX_FPS)
+        self.max_fps_spinbox.setToolTip("Repaints of the 3D view are coalesced to at most this rate. 0 removes the cap.")
+        self.max_fps_spinbox.valueChanged.connect(self.openGLWidget.set_max_fps)
+        view_layout.addWidget(self.max_fps_spinbox)
+        self.render_stats_checkbox = QCheckBox("Show render stats", self)
+        self.render_stats_checkbox.setToolTip("Overlay paint time, draw calls and vertices per frame on the 3D view.")
+        self.render_stats_checkbox.toggled.connect(self.openGLWidget.set_stats_overlay)
+        view_layout.addWidget(self.render_stats_checkbox)
+        view_layout.addStretch()
+        right_panel.addLayout(view_layout)
+        cache_layout = QHBoxLayout()
+        cache_layout.addWidget(QLabel("Frame cache (MB):"))
+        self.frame_cache_spinbox = QSpinBox(self)
+        self.frame_cache_spinbox.setRange(0, 65536)
+        self.frame_cache_spinbox.setSingleStep(128)
+        self.frame_cache_spinbox.setValue(DEFAULT_FRAME_CACHE_MB)
+        self.frame_cache_spinbox.setToolTip("Memory for decoded video frames. 0 disables the cache.")
+        self.frame_cache_spinbox.valueChanged.connect(self.set_frame_cache_budget)
+        cache_layout.addWidget(self.frame_cache_spinbox)
+        self.cache_display_size_checkbox = QCheckBox("Cache at display size", self)
+        self.cache_display_size_checkbox.setToolTip(
+            "Store frames downscaled to the preview size: many more frames fit in the budget.")
+        self.cache_display_size_checkbox.setChecked(True)
+        self.cache_display_size_checkbox.stateChanged.connect(lambda state: self.frame_cache.clear())
+        cache_layout.addWidget(self.cache_display_size_checkbox)
+        cache_layout.addWidget(QLabel("Prefetch:"))
+        self.prefetch_spinbox = QSpinBox(self)
+        self.prefetch_spinbox.setRange(0, 1024)
+        self.prefetch_spinbox.setSingleStep(8)
+        self.prefetch_spinbox.setValue(DEFAULT_PREFETCH_WINDOW)
+        self.prefetch_spinbox.setToolTip(
+            "Frames decoded ahead in the direction of navigation (half as many behind). 0 disables prefetching.")
+        self.prefetch_spinbox.valueChanged.connect(self.set_prefetch_window)
+        cache_layout.addWidget(self.prefetch_spinbox)
+        cache_layout.addStretch()
+        right_panel.addLayout(cache_layout)
+        self.use_proxy_checkbox = QCheckBox("Use low-res proxy", self)
+        self.use_proxy_checkbox.setToolTip(
+            f"Display a {PROXY_WIDTH} px wide copy of the video, built once in the background and kept next to "
+            "it. Uncheck to view the full-resolution source.")
+        self.use_proxy_checkbox.toggled.connect(self.set_use_proxy)
+        right_panel.addWidget(self.use_proxy_checkbox)
         id_layout = QFormLayout()
         self.climber_id_input = QLineEdit("climber_001", self);
         self.route_id_input = QLineEdit("route_001", self)
@@ -154,9 +293,13 @@ class Interface(QMainWindow):
         self.load_labels_button.clicked.connect(self.load_label_names_and_init_data)
         self.save_button = QPushButton("Save Labels to CSV", self);
         self.save_button.clicked.connect(self.save_csv)
+        self.export_button = QPushButton("Export Merged Dataset...", self);
+        self.export_button.setToolTip("Write keypoints and labels together into one CSV for training.")
+        self.export_button.clicked.connect(self.export_merged_dataset)
         label_controls_layout.addWidget(self.load_labels_button);
         label_controls_layout.addWidget(self.save_button)
         right_panel.addLayout(label_controls_layout)
+        right_panel.addWidget(self.export_button)
         right_panel.addWidget(QLabel("--- Labels (Edit Value, Set Type) ---"), alignment=Qt.AlignmentFlag.AlignCenter)
         self.labels_scroll_area = QScrollArea(self);
         self.labels_scroll_area.setWidgetResizable(True);
@@ -170,24 +313,33 @@ class Interface(QMainWindow):
         self.show()
 
     def update_widget_states(self):
-        has_video = self.cap is not None and self.cap.isOpened()
+        has_video = self.video is not None and self.video.is_opened()
         has_keypoints = self.keypoints is not None
         has_labels = bool(self.label_names)
+        busy = self._active_task is not None
         data_loaded = has_keypoints or has_video
-        can_copy_last = has_keypoints and has_labels and self.frame_index > 0
-        can_open_copy_until_dialog = has_keypoints and has_labels
+        # While a task runs the labels may be a placeholder (e.g. during a label load), so no edits.
+        can_copy_last = has_keypoints and has_labels and self.frame_index > 0 and not busy
+        can_open_copy_until_dialog = has_keypoints and has_labels and not busy
 
         self.prev_button.setEnabled(data_loaded);
         self.next_button.setEnabled(data_loaded)
         self.slider.setEnabled(data_loaded)
         self.openGLWidget.setEnabled(has_keypoints)
-        self.save_button.setEnabled(has_keypoints and has_labels and self.csv_file is not None)
+        self.save_button.setEnabled(has_keypoints and has_labels and self.csv_file is not None and not busy
+                                    and self._save_task is None)
+        self.export_button.setEnabled(has_keypoints and has_labels and not busy and self._save_task is None)
+        self.load_video_button.setEnabled(not busy)
+        self.load_keypoints_button.setEnabled(not busy)
+        self.load_labels_button.setEnabled(not busy)
         self.copy_last_button.setEnabled(can_copy_last)
         if hasattr(self, 'copy_until_button'):
             self.copy_until_button.setEnabled(can_open_copy_until_dialog)
             self.copy_until_frame_input.setEnabled(can_open_copy_until_dialog)
         for elements in self.label_ui_elements.values():
-            elements.value_widget.setEnabled(has_keypoints)
+            elements.value_widget.setEnabled(has_keypoints and not busy)
+            if elements.delete_button is not None:
+                elements.delete_button.setEnabled(not busy)
         if data_loaded:
             self.slider.setMaximum(self.total_frames - 1 if self.total_frames > 0 else 0)
         else:
@@ -203,68 +355,201 @@ class Interface(QMainWindow):
         QMessageBox.critical(self, title, message)
         self.show_status_message(f"Error: {message}", 5000)
 
+    def _start_background_task(self, description, fn, *args, on_success=None, on_failure=None, on_cancel=None,
+                               exclusive=True):
+        """
+        Runs fn(context, *args) on a worker thread while the GUI stays responsive. on_success(result),
+        on_failure(message) and on_cancel() are called back on the GUI thread. One exclusive task runs at
+        a time and locks the loading/editing widgets; a non-exclusive one (at most one) leaves them usable.
+        """
+        running = self._active_task if exclusive else self._save_task
+        if running is not None:
+            self.show_status_message(f"Busy: {running.description}. Wait or cancel it first.", 3000)
+            return False
+        task = BackgroundTask(description, fn, *args, parent=self)
+        task.progress.connect(self._on_task_progress)
+        task.succeeded.connect(lambda result: self._finish_background_task(task, on_success, result))
+        task.failed.connect(lambda message: self._finish_background_task(task, on_failure, message))
+        task.cancelled.connect(lambda: self._finish_background_task(task, on_cancel))
+        task.finished.connect(task.deleteLater)
+        if exclusive:
+            self._active_task = task
+        else:
+            self._save_task = task
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.show()
+        self.cancel_task_button.show()
+        self.show_status_message(f"{description}...", 0)
+        self.update_widget_states()
+        task.start()
+        return True
+
+    def _on_task_progress(self, done, total, message):
+        if total > 0:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(min(done, total))
+        if message: self.show_status_message(message, 0)
+
+    def _finish_background_task(self, task, callback, *payload):
+        if task is self._active_task:
+            self._active_task = None
+        elif task is self._save_task:
+            self._save_task = None
+        else:
+            return
+        if self._active_task is None and self._save_task is None:
+            self.progress_bar.hide()
+            self.cancel_task_button.hide()
+        if callback is not None: callback(*payload)
+        self.update_widget_states()
+
+    def cancel_background_task(self):
+        task = self._active_task if self._active_task is not None else self._save_task
+        if task is not None:
+            task.cancel()
+            self.show_status_message(f"Cancelling: {task.description}...", 0)
+
     def load_video(self):
         video_file, _ = QFileDialog.getOpenFileName(self, "Select Video File", "", "MP4 Files (*.mp4);;All Files (*)")
         if video_file:
-            try:
-                if self.cap: self.cap.release()
-                self.cap = cv2.VideoCapture(video_file)
-                if not self.cap.isOpened(): raise ValueError("Could not open video file.")
-                self.video_path = video_file;
-                self.video_path_label.setText(os.path.basename(video_file))
-                num_video_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                if self.keypoints is not None:
-                    if num_video_frames != self.keypoints.shape[0]: QMessageBox.warning(self, "Frame Count Mismatch",
-                                                                                        f"Video: {num_video_frames}, Keypoints: {self.keypoints.shape[0]}. Using keypoint count.")
-                    self.total_frames = self.keypoints.shape[0]
-                else:
-                    self.total_frames = num_video_frames
-                self.frame_index = 0;
-                self.update_widget_states()
-                self.show_status_message(f"Video loaded: {os.path.basename(video_file)} ({self.total_frames} frames)",
-                                         5000)
-            except Exception as e:
-                self.display_error_message("Video Load Error", f"{e}");
-                self.cap = None;
-                self.video_path = None;
-                self.video_path_label.setText("None")
-                self.total_frames = self.keypoints.shape[0] if self.keypoints is not None else 0;
-                self.update_widget_states()
+            self._start_background_task(f"Opening video {os.path.basename(video_file)}",
+                                        self._open_video_in_background, video_file,
+                                        on_success=lambda result: self._apply_loaded_video(video_file, *result),
+                                        on_failure=self._video_load_failed,
+                                        on_cancel=lambda: self.show_status_message("Video loading cancelled.", 3000))
+
+    @staticmethod
+    def _open_video_in_background(context, video_file):
+        # One packet scan per video (no decoding), saved next to it, gives frame-accurate keyframe seeks.
+        keyframe_index = load_or_build_keyframe_index(
+            video_file, progress=lambda done, total: context.report(done, total, f"Indexing video... {done} frames"))
+        video = VideoReader(video_file, keyframe_index=keyframe_index)
+        return video, video.frame_count
+
+    def _apply_loaded_video(self, video_file, video, num_video_frames):
+        try:
+            if self.video: self.video.release()
+            self._close_proxy()
+            self.video = video
+            self.frame_cache.clear()
+            self.frame_cache.reset_stats()
+            if self.use_proxy_checkbox.isChecked(): self._open_or_build_proxy()
+            self._restart_prefetcher()
+            self.video_path = video_file;
+            self.video_path_label.setText(os.path.basename(video_file))
+            if self.keypoints is not None:
+                if num_video_frames != self.keypoints.shape[0]: QMessageBox.warning(self, "Frame Count Mismatch",
+                                                                                    f"Video: {num_video_frames}, Keypoints: {self.keypoints.shape[0]}. Using keypoint count.")
+                self.total_frames = self.keypoints.shape[0]
+            else:
+                self.total_frames = num_video_frames
+            self.frame_index = 0;
+            self.update_widget_states()
+            self.show_status_message(f"Video loaded: {os.path.basename(video_file)} ({self.total_frames} frames)",
+                                     5000)
+        except Exception as e:
+            self._video_load_failed(f"{e}")
+
+    def _video_load_failed(self, message):
+        self.display_error_message("Video Load Error", message);
+        if self.video: self.video.release()
+        self.video = None;
+        self._close_proxy()
+        self._stop_prefetcher()
+        self.video_path = None;
+        self.video_path_label.setText("None")
+        self.total_frames = self.keypoints.shape[0] if self.keypoints is not None else 0;
+        self.update_widget_states()
 
     def load_keypoints(self):
         file_filter = "Keypoints Files (*.npy *.csv);;All Files (*)";
         keypoints_file, _ = QFileDialog.getOpenFileName(self, "Select Keypoints File", "", file_filter)
         if keypoints_file:
-            keypoints_data = load_keypoint_data(keypoints_file)
-            if keypoints_data is None: self.display_error_message("Keypoint Load Error",
-                                                                  f"Failed load: {keypoints_file}"); return
-            if keypoints_data.ndim != 3 or keypoints_data.shape[2] != 3: self.display_error_message(
-                "Keypoint Data Error", f"Invalid shape: {keypoints_data.shape}. Expected (frames, points, 3)."); return
-
-            if keypoints_file.endswith('.npy'):
-                keypoints_data[:, :, 1] *= -1
-                keypoints_data[:, :, 0] *= -1
-            elif keypoints_file.endswith('.csv'):
-                keypoints_data[:, :, 0] *= -1
-
-            self.keypoints = keypoints_data;
-            self.keypoints_path = keypoints_file;
-            self.keypoints_path_label.setText(os.path.basename(keypoints_file))
-            num_keypoint_frames = self.keypoints.shape[0]
-            if self.cap is not None and self.cap.isOpened():
-                num_video_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                if num_keypoint_frames != num_video_frames: QMessageBox.warning(self, "Frame Count Mismatch",
-                                                                                f"Keypoints: {num_keypoint_frames}, Video: {num_video_frames}. Using keypoint count.")
-                self.total_frames = num_keypoint_frames
-            else:
-                self.total_frames = num_keypoint_frames
-            self.frame_index = 0;
-            self.openGLWidget.set_data(self.keypoints, self.limbSeq)
-            if self.label_names: self._load_or_initialize_label_data()
-            self.update_widget_states()
-            self.show_status_message(
-                f"Keypoints loaded: {os.path.basename(keypoints_file)} ({self.total_frames} frames, {self.keypoints.shape[1]} points)",
-                5000)
+            self._start_background_task(f"Loading keypoints {os.path.basename(keypoints_file)}",
+                                        self._read_keypoints_in_background, keypoints_file,
+                                        on_success=lambda data: self._apply_loaded_keypoints(keypoints_file, data),
+                                        on_failure=lambda message: self.display_error_message("Keypoint Load Error",
+                                                                                              message),
+                                        on_cancel=lambda: self.show_status_message("Keypoint loading cancelled.", 3000))
+
+    @staticmethod
+    def _read_keypoints_in_background(context, keypoints_file):
+        return load_keypoint_data(keypoints_file, mmap_mode='r', use_cache=True,
+                                  progress=lambda done, total: context.report(done, total,
+                                                                              f"Parsing keypoints... {done} rows"))
+
+    def _apply_loaded_keypoints(self, keypoints_file, keypoints_data):
+        if keypoints_data is None: self.display_error_message("Keypoint Load Error",
+                                                              f"Failed load: {keypoints_file}"); return
+        if keypoints_data.ndim != 3 or keypoints_data.shape[2] != 3: self.display_error_message(
+            "Keypoint Data Error", f"Invalid shape: {keypoints_data.shape}. Expected (frames, points, 3)."); return
+
+        # The axis flip is applied per displayed/exported frame, so the loaded array is never mutated.
+        self.keypoints = keypoints_data;
+        self.keypoint_axis_signs = keypoint_axis_signs(keypoints_file)
+        self.keypoints_path = keypoints_file;
+        self.keypoints_path_label.setText(os.path.basename(keypoints_file))
+        num_keypoint_frames = self.keypoints.shape[0]
+        if self.video is not None and self.video.is_opened():
+            num_video_frames = self.video.frame_count
+            if num_keypoint_frames != num_video_frames: QMessageBox.warning(self, "Frame Count Mismatch",
+                                                                            f"Keypoints: {num_keypoint_frames}, Video: {num_video_frames}. Using keypoint count.")
+            self.total_frames = num_keypoint_frames
+        else:
+            self.total_frames = num_keypoint_frames
+        self.frame_index = 0;
+        self._match_skeleton_to_keypoints()
+        self.openGLWidget.set_data(self.keypoints, self.skeleton, self.keypoint_axis_signs)
+        if self.label_names: self._load_or_initialize_label_data(background=True)
+        self.update_widget_states()
+        self.show_status_message(
+            f"Keypoints loaded: {os.path.basename(keypoints_file)} ({self.total_frames} frames, {self.keypoints.shape[1]} points)",
+            5000)
+
+    def _match_skeleton_to_keypoints(self):
+        """ Switches to a registered skeleton with the loaded joint count if the current one does not match. """
+        num_points = self.keypoints.shape[1]
+        skeleton = skeleton_for_joint_count(num_points, self.skeleton.name if self.skeleton else DEFAULT_SKELETON)
+        if skeleton is None:
+            self.show_status_message(f"No registered skeleton has {num_points} joints; drawing joints only.", 5000)
+        self._apply_skeleton(skeleton)
+
+    def _apply_skeleton(self, skeleton):
+        self.skeleton = skeleton
+        self.limbSeq = skeleton.limb_list() if skeleton is not None else None
+        if skeleton is not None and self.skeleton_combo.currentText() != skeleton.name:
+            self.skeleton_combo.blockSignals(True)
+            self.skeleton_combo.setCurrentText(skeleton.name)
+            self.skeleton_combo.blockSignals(False)
+
+    def set_skeleton(self, name):
+        skeleton = SKELETONS.get(name)
+        if skeleton is None: return
+        if self.keypoints is not None and not skeleton.fits(self.keypoints.shape[1]):
+            self.show_status_message(f"Skeleton '{name}' needs {skeleton.num_joints} joints; "
+                                     f"the keypoints have {self.keypoints.shape[1]}.", 5000)
+            if self.skeleton is not None: self._apply_skeleton(self.skeleton)
+            return
+        self._apply_skeleton(skeleton)
+        self.openGLWidget.set_data(self.keypoints, self.skeleton, self.keypoint_axis_signs)
+
+    def update_onion_skin(self, *args):
+        frames = self.onion_spinbox.value()
+        self.openGLWidget.set_onion_skin(frames, frames, self.onion_ghosts_checkbox.isChecked(),
+                                         self.onion_trajectories_checkbox.isChecked())
+
+    def load_skeleton_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Select Skeleton File", "", "JSON Files (*.json);;All Files (*)")
+        if not path: return
+        try:
+            skeleton = load_skeleton(path)
+        except ValueError as e:
+            self.display_error_message("Skeleton Load Error", f"{e}"); return
+        if self.skeleton_combo.findText(skeleton.name) < 0: self.skeleton_combo.addItem(skeleton.name)
+        if self.skeleton_combo.currentText() == skeleton.name:
+            self.set_skeleton(skeleton.name)  # Reloaded under the same name: no change signal
+        else:
+            self.skeleton_combo.setCurrentText(skeleton.name)
 
     def load_label_names_and_init_data(self):
         if self.keypoints is None: QMessageBox.warning(self, "Load Order", "Load keypoints before labels."); return
@@ -281,8 +566,7 @@ class Interface(QMainWindow):
             self.label_names = loaded_names
             for name in self.label_names: self.label_is_numeric[name] = False; self._add_label_ui(name)
             self.show_status_message(f"Loaded {len(self.label_names)} names. Initializing...", 0);
-            QApplication.processEvents()
-            self._load_or_initialize_label_data()
+            self._load_or_initialize_label_data(background=True)
         except FileNotFoundError:
             self.display_error_message("Load Error", f"File not found: {label_file}")
         except Exception as e:
@@ -292,9 +576,11 @@ class Interface(QMainWindow):
             self.update_widget_states()
 
     def _clear_labels(self):
+        self.autosave()
+        self._journal = None
         self.label_names = [];
         self.label_is_numeric = {};
-        self.label_values = {};
+        self.label_values = LabelStore(mode=self.label_storage_mode);
         self.csv_file = None;
         self._has_unsaved_changes = False
         for label_name in list(self.label_ui_elements.keys()):
@@ -334,7 +620,7 @@ class Interface(QMainWindow):
         self.labels_layout.addWidget(label_container_widget)
 
         ui_elements = LabelUIElements(label_name_display, label_value_input, numeric_label_checkbox,
-                                      label_container_widget)
+                                      label_container_widget, delete_button)
         self.label_ui_elements[label_name] = ui_elements
 
         numeric_label_checkbox.setChecked(self.label_is_numeric.get(label_name, False))
@@ -345,7 +631,7 @@ class Interface(QMainWindow):
                                                                                                                    text,
                                                                                                                    iw,
                                                                                                                    cb))
-        value = self.label_values.get(self.frame_index, {}).get(label_name, "");
+        value = self.label_values.value(self.frame_index, label_name, "");
         label_value_input.setText(str(value))
 
     def _prompt_delete_label(self, label_name_to_delete):
@@ -369,16 +655,14 @@ class Interface(QMainWindow):
                 self.label_names.remove(label_name_to_delete)
             if label_name_to_delete in self.label_is_numeric:
                 del self.label_is_numeric[label_name_to_delete]
-            for frame_idx in self.label_values:
-                if label_name_to_delete in self.label_values[frame_idx]:
-                    del self.label_values[frame_idx][label_name_to_delete]
+            self.label_values.remove_label(label_name_to_delete)
             self._has_unsaved_changes = True
             self.update_widget_states()
             self.show_status_message(f"Label '{label_name_to_delete}' deleted.", 3000)
         except Exception as e:
             self.display_error_message("Delete Error", f"Could not delete label '{label_name_to_delete}': {e}")
 
-    def _load_or_initialize_label_data(self):  # Using version from joss_new_interface_py_test_fixes_v7
+    def _load_or_initialize_label_data(self, background=False):  # Using version from joss_new_interface_py_test_fixes_v7
         if self.keypoints is None or not self.label_names:
             self.show_status_message("Cannot initialize: Load keypoints and label names first.", 5000)
             return
@@ -386,74 +670,147 @@ class Interface(QMainWindow):
             self.display_error_message("Data Error", "Keypoints path is missing for CSV determination.")
             return
 
+        # Edits to the outgoing label set go to its own journal before the store is replaced.
+        self.autosave()
+        self._journal = None
         base_name = os.path.splitext(self.keypoints_path)[0]
         self.csv_file = f"{base_name}_newlabels.csv"
-        self.label_values = {}
+        self.label_values = LabelStore(mode=self.label_storage_mode)
         self._has_unsaved_changes = False
+        args = (self.csv_file, list(self.label_names), dict(self.label_is_numeric), self.keypoints.shape[0],
+                self.label_storage_mode)
 
-        try:
-            if os.path.exists(self.csv_file):
-                self.show_status_message(f"Loading existing labels from {self.csv_file}...", 0)
-                df = pd.read_csv(self.csv_file, dtype=str, na_filter=False)
-
-                if "frame" not in df.columns:
-                    raise ValueError("Existing CSV is missing the required 'frame' column.")
-
-                for frame_idx_str in df["frame"].unique():
-                    frame = int(frame_idx_str)
-                    if frame not in self.label_values:
-                        self.label_values[frame] = {}
-
-                    row_series = df[df["frame"] == frame_idx_str].iloc[0]
-
-                    for label_name in self.label_names:
-                        is_numeric = self.label_is_numeric.get(label_name, False)
-                        default_value = 0.0 if is_numeric else ""
-
-                        value_from_csv_str = ""
-                        if label_name in df.columns:
-                            raw_cell_value = row_series.get(label_name)
-                            value_from_csv_str = str(raw_cell_value) if raw_cell_value is not None else ""
-
-                        if value_from_csv_str.strip() == "":
-                            value = default_value
-                        else:
-                            if is_numeric:
-                                try:
-                                    value = float(value_from_csv_str)
-                                except ValueError:
-                                    value = 0.0
-                            else:
-                                value = value_from_csv_str
-                        self.label_values[frame][label_name] = value
-                self.show_status_message(f"Successfully loaded labels from {self.csv_file}", 5000)
+        if os.path.exists(self.csv_file):
+            self.show_status_message(f"Loading existing labels from {self.csv_file}...", 0)
+        else:
+            self.show_status_message(f"No existing label file found. Creating new file: {self.csv_file}", 0)
 
-            else:
-                self.show_status_message(f"No existing label file found. Creating new file: {self.csv_file}", 0)
-                num_frames = self.keypoints.shape[0]
-                for frame_idx in range(num_frames):
-                    self.label_values[frame_idx] = {
-                        name: (0.0 if self.label_is_numeric.get(name, False) else "")
-                        for name in self.label_names
-                    }
-                self.show_status_message(f"Initialized empty labels for {num_frames} frames. Save to create CSV.", 5000)
+        if background:
+            self._start_background_task("Loading labels", self._read_label_values, *args,
+                                        on_success=self._apply_label_values,
+                                        on_failure=self._label_data_load_failed,
+                                        on_cancel=self._label_data_load_cancelled)
+            return
+        try:
+            result = self._read_label_values(None, *args)
+        except Exception as e:
+            self._label_data_load_failed(f"{e}")
+            return
+        self._apply_label_values(result)
 
-        except FileNotFoundError:
-            self.display_error_message("Load Error", f"Could not find CSV file: {self.csv_file}")
-            self.csv_file = None
-        except (ValueError, KeyError, pd.errors.ParserError, Exception) as e:
-            self.display_error_message("Load Error",
-                                       f"Failed to load or parse existing CSV ({self.csv_file}):\n{e}\n\nRe-initializing with empty labels.")
-            self.label_values = {}
-            self.csv_file = f"{base_name}_newlabels.csv"
-            num_frames = self.keypoints.shape[0]
-            for frame_idx in range(num_frames):
-                self.label_values[frame_idx] = {name: (0.0 if self.label_is_numeric.get(name, False) else "") for name
-                                                in self.label_names}
+    @staticmethod
+    def _default_label_store(label_names, label_is_numeric, num_frames, mode="dense"):
+        label_values = LabelStore(num_frames, mode=mode)
+        for name in label_names:
+            label_values.add_label(name, numeric=label_is_numeric.get(name, False))
+        return label_values
+
+    @staticmethod
+    def _read_label_values(context, csv_file, label_names, label_is_numeric, num_frames, mode="dense"):
+        """
+        Builds a LabelStore from csv_file if it exists, else with defaults for num_frames, then replays
+        the autosave journal on top. Only touches its arguments, so it can run on a worker thread.
+        Returns (label_values, loaded_existing, replayed_edits).
+        """
+        label_values = Interface._default_label_store(label_names, label_is_numeric, num_frames, mode)
+        loaded_existing = os.path.exists(csv_file)
+        if loaded_existing:
+            df = pd.read_csv(csv_file, dtype=str, na_filter=False)
+
+            if "frame" not in df.columns:
+                raise ValueError("Existing CSV is missing the required 'frame' column.")
+
+            # Every frame's first row wins, as before; everything else is a whole-column operation.
+            df = df.drop_duplicates(subset="frame", keep="first")
+            frames = pd.to_numeric(df["frame"], errors="raise")
+            if len(frames) and (frames != np.floor(frames)).any():
+                raise ValueError("Existing CSV has non-integer values in the 'frame' column.")
+            frames = frames.astype(np.int64)
+            keep = ~frames.duplicated(keep="last")
+            df, frames = df[keep.to_numpy()], frames[keep].to_numpy()
+
+            present_labels = [name for name in label_names if name in df.columns]
+            for count, label_name in enumerate(present_labels):
+                if context is not None:
+                    context.report(count, len(present_labels), f"Loading labels... {label_name}")
+                raw = df[label_name].astype(str)
+                stripped = raw.str.strip()
+                if label_is_numeric.get(label_name, False):
+                    values = parse_float_texts(raw)
+                else:
+                    values = raw.where(stripped != "", "").to_numpy(dtype=object)
+                label_values.assign_column(label_name, frames, values)
+            if len(frames):
+                label_values.resize(max(len(label_values), int(frames.max()) + 1))
+        replayed_edits = LabelJournal(journal_path(csv_file)).replay(label_values, label_names)
+        return label_values, loaded_existing, replayed_edits
+
+    def _apply_label_values(self, result):
+        self.label_values, loaded_existing, replayed_edits = result
+        self._start_journal()
+        if replayed_edits:
+            # The CSV on disk is behind the recovered edits until the journal is compacted into it.
+            self._has_unsaved_changes = True
+            self.show_status_message(f"Recovered {replayed_edits} autosaved edit(s) for {self.csv_file}", 5000)
+            self._compact_journal()
+        elif loaded_existing:
+            self.show_status_message(f"Successfully loaded labels from {self.csv_file}", 5000)
+        else:
+            self.show_status_message(
+                f"Initialized empty labels for {len(self.label_values)} frames. Save to create CSV.", 5000)
+        self.update_label_value_inputs()
+        self.update_widget_states()
 
+    def _label_data_load_failed(self, message):
+        self.display_error_message("Load Error",
+                                   f"Failed to load or parse existing CSV ({self.csv_file}):\n{message}\n\nRe-initializing with empty labels.")
+        self.csv_file = f"{os.path.splitext(self.keypoints_path)[0]}_newlabels.csv"
+        self.label_values = self._default_label_store(self.label_names, self.label_is_numeric,
+                                                      self.keypoints.shape[0], self.label_storage_mode)
+        self._start_journal()
         self.update_label_value_inputs()
         self.update_widget_states()
 
+    def _label_data_load_cancelled(self):
+        # Keeping a half-initialized label set around could overwrite the existing CSV on the next save.
+        self._clear_labels()
+        self.update_widget_states()
+        self.show_status_message("Label loading cancelled. Load label names again to retry.", 5000)
+
+    def _start_journal(self):
+        """ Starts recording label edits for the autosave journal of the current labels CSV. """
+        self._journal = LabelJournal(journal_path(self.csv_file)) if self.csv_file else None
+        self.label_values.start_tracking()
+
+    def autosave(self):
+        """ Appends the label edits made since the last autosave to the journal. Cheap: no CSV is written. """
+        if self._journal is None or not self.label_values.has_changes(): return
+        written = self._flush_journal()
+        if written:
+            self.show_status_message(f"Autosaved {written} edit(s).", 2000)
+            if self._journal.size() > self.journal_compaction_bytes:
+                self._compact_journal()
+
+    def _flush_journal(self):
+        """ Moves pending label edits into the journal. Returns the number written, or None on failure. """
+        if self._journal is None: return 0
+        changes = self.label_values.drain_changes()
+        try:
+            return self._journal.append(changes)
+        except OSError as e:
+            self.label_values.requeue_changes(changes)
+            self.show_status_message(f"Autosave failed: {e}", 5000)
+            return None
+
+    def _compact_journal(self):
+        """ Folds the journal into the labels CSV with a background save of the current labels. """
+        if self._journal is None or self._save_task is not None or self.keypoints is None: return
+        self._start_label_save(self.csv_file, "Compacting autosave journal",
+                           on_saved=lambda path: self.show_status_message(
+                               f"Autosave compacted into {os.path.basename(path)}", 3000),
+                           on_failure=lambda message: self.show_status_message(
+                               f"Autosave compaction failed: {message}", 5000))
+
     def prev_frame(self):
         if self.total_frames > 0 and self.frame_index > 0: self.frame_index -= 1; self.update_frame_display()
 
@@ -461,13 +818,35 @@ class Interface(QMainWindow):
         if self.total_frames > 0 and self.frame_index < self.total_frames - 1: self.frame_index += 1; self.update_frame_display()
 
     def slider_update_frame(self, value):
-        if self.keypoints is not None or self.cap is not None:
+        if self.keypoints is not None or self.video is not None:
             max_idx = self.total_frames - 1 if self.total_frames > 0 else 0
-            self.frame_index = max(0, min(value, max_idx));
+            self.frame_scheduler.request(max(0, min(value, max_idx)), preview=self.slider.isSliderDown())
+
+    def slider_released(self):
+        # The last preview is replaced by the full-quality frame.
+        if self.keypoints is not None or self.video is not None:
+            self.frame_scheduler.request(self.slider.value(), preview=False)
+
+    def _render_requested_frame(self, index, preview):
+        self.frame_index = index
+        if preview:
+            self.update_frame_preview()
+        else:
             self.update_frame_display()
 
+    def update_frame_preview(self):
+        """ Cheap redraw while scrubbing: frame number, video frame and skeleton, but not the label inputs. """
+        max_idx = self.total_frames - 1 if self.total_frames > 0 else 0
+        self.frame_index = max(0, min(self.frame_index, max_idx))
+        self.frame_label.setText(f"Frame: {self.frame_index} / {max_idx}")
+        self.display_video_frame(preview=True)
+        if self.keypoints is not None:
+            self.openGLWidget.set_frame_index(self.frame_index)
+
     def update_frame_display(self):
-        if not (self.keypoints is not None or self.cap is not None):
+        # A slider request still waiting to be rendered is older than this frame change.
+        self.frame_scheduler.cancel()
+        if not (self.keypoints is not None or self.video is not None):
             self.frame_label.setText("Frame: N/A");
             self.copy_last_button.setEnabled(False)
             if hasattr(self, 'slider'): self.slider.setEnabled(False)
@@ -495,23 +874,21 @@ class Interface(QMainWindow):
             self.copy_until_button.setEnabled(can_open_copy_until_dialog)
             self.copy_until_frame_input.setEnabled(can_open_copy_until_dialog)
 
-    def display_video_frame(self):
-        if self.cap and self.cap.isOpened():
-            video_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    def display_video_frame(self, preview=False):
+        if self.video and self.video.is_opened():
+            video_frames = self.video.frame_count
             if not (0 <= self.frame_index < video_frames): self.video_label.setText(
                 f"Frame {self.frame_index} out video (0-{video_frames - 1})"); return
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.frame_index);
-            ret, frame = self.cap.read()
-            if ret:
+            frame = self._video_frame(self.frame_index)
+            if self.prefetcher is not None:
+                self.prefetcher.set_target(self.frame_index, self._frame_cache_size())
+            self._update_cache_stats()
+            if frame is not None:
                 try:
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB);
-                    h, w, ch = frame_rgb.shape;
-                    bytes_per_line = ch * w
-                    qt_image = QImage(frame_rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-                    pixmap = QPixmap.fromImage(qt_image);
-                    scaled_pixmap = pixmap.scaled(self.video_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
-                                                  Qt.TransformationMode.SmoothTransformation)
-                    self.video_label.setPixmap(scaled_pixmap)
+                    qt_image = self.frame_presenter.to_image(frame, self.video_label.width(),
+                                                             self.video_label.height(), fast=preview)
+                    if qt_image is not None:
+                        self.video_label.setPixmap(QPixmap.fromImage(qt_image))
                 except Exception as e:
                     print(f"Error display frame {self.frame_index}: {e}");
                     self.video_label.setText(
@@ -521,8 +898,136 @@ class Interface(QMainWindow):
         else:
             self.video_label.setText("No Video Loaded")
 
+    def _video_frame(self, index):
+        """ Frame index from the cache, else decoded (and downscaled if caching at display size) and cached. """
+        size = self._frame_cache_size()
+        key = (index, size)
+        frame = self.frame_cache.get(key)
+        if frame is not None:
+            return frame
+        # The reader decodes forward when stepping and only seeks on real jumps.
+        frame = self._display_reader().read(index)
+        if frame is None:
+            return None
+        if size is not None:
+            frame = fit_frame(frame, *size)
+        self.frame_cache.put(key, frame)
+        return frame
+
+    def _frame_cache_size(self):
+        """ (width, height) frames are cached at, or None for full resolution. """
+        if self.cache_display_size_checkbox.isChecked():
+            return self.video_label.width(), self.video_label.height()
+        return None
+
+    def _display_reader(self):
+        """ The proxy while it is enabled and ready, else the source video. """
+        if self.proxy_video is not None and self.use_proxy_checkbox.isChecked():
+            return self.proxy_video
+        return self.video
+
+    def set_use_proxy(self, enabled):
+        if enabled:
+            self._open_or_build_proxy()
+        self._display_source_changed()
+
+    def _display_source_changed(self):
+        # Cached frames and the prefetcher belong to the previous source.
+        self.frame_cache.clear()
+        self._restart_prefetcher()
+        if self.video is not None: self.display_video_frame()
+
+    def _open_or_build_proxy(self):
+        if self.video is None or self.proxy_video is not None or self._proxy_task is not None: return
+        if self.video.width <= PROXY_WIDTH:
+            self.show_status_message("Video is already preview-sized; showing the source.", 3000)
+            return
+        path = find_proxy(self.video.path)
+        if path is not None:
+            self._open_proxy(path)
+            return
+        task = BackgroundTask("Building proxy", self._build_proxy_in_background, self.video.path, parent=self)
+        task.progress.connect(lambda done, total, message: self.use_proxy_checkbox.setText(
+            f"Use low-res proxy (building {100 * done // max(total, 1)}%)"))
+        task.succeeded.connect(lambda path: self._proxy_task_finished(task, path))
+        task.failed.connect(lambda message: self._proxy_task_finished(task, None, message))
+        task.cancelled.connect(lambda: self._proxy_task_finished(task, None))
+        task.finished.connect(task.deleteLater)
+        self._proxy_task = task
+        self.use_proxy_checkbox.setText("Use low-res proxy (building...)")
+        task.start()
+
+    @staticmethod
+    def _build_proxy_in_background(context, video_file):
+        return build_proxy(video_file, progress=context.report)
+
+    def _proxy_task_finished(self, task, path, error=None):
+        if task is not self._proxy_task: return
+        self._proxy_task = None
+        self.use_proxy_checkbox.setText("Use low-res proxy")
+        if error is not None:
+            self.show_status_message(f"Proxy build failed: {error}", 5000)
+        if path is not None and self.video is not None and path == find_proxy(self.video.path):
+            self._open_proxy(path)
+            if self.use_proxy_checkbox.isChecked(): self._display_source_changed()
+
+    def _open_proxy(self, path):
+        try:
+            proxy_video = VideoReader(path)
+        except ValueError as e:
+            self.show_status_message(f"Could not open proxy: {e}", 5000)
+            return
+        if proxy_video.frame_count != self.video.frame_count:
+            proxy_video.release()
+            self.show_status_message("Proxy does not match the video's frames; showing the source.", 5000)
+            return
+        self.proxy_video = proxy_video
+        self.show_status_message(f"Using proxy {os.path.basename(path)}", 3000)
+
+    def _close_proxy(self):
+        if self._proxy_task is not None:
+            self._proxy_task.cancel()
+            self._proxy_task.wait()
+            self._proxy_task = None
+            self.use_proxy_checkbox.setText("Use low-res proxy")
+        if self.proxy_video is not None:
+            self.proxy_video.release()
+            self.proxy_video = None
+
+    def _restart_prefetcher(self):
+        self._stop_prefetcher()
+        window = self.prefetch_spinbox.value()
+        if self.video is None or window <= 0: return
+        reader = self._display_reader()
+        self.prefetcher = FramePrefetcher(reader.path, self.frame_cache, ahead=window, behind=window // 2,
+                                          keyframe_index=reader.keyframe_index)
+        self.prefetcher.start()
+
+    def _stop_prefetcher(self):
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+            self.prefetcher = None
+
+    def set_prefetch_window(self, frames):
+        if frames <= 0:
+            self._stop_prefetcher()
+        elif self.prefetcher is None:
+            self._restart_prefetcher()
+        else:
+            self.prefetcher.set_window(frames, frames // 2)
+
+    def set_frame_cache_budget(self, megabytes):
+        self.frame_cache.set_max_bytes(megabytes * 1024 * 1024)
+        self._update_cache_stats()
+
+    def _update_cache_stats(self):
+        stats = self.frame_cache.stats()
+        self.cache_stats_label.setText(
+            f"Cache: {stats['hits']} hits / {stats['misses']} misses, "
+            f"{stats['bytes'] / 1024 ** 2:.0f}/{stats['max_bytes'] / 1024 ** 2:.0f} MB")
+
     def update_label_value_inputs(self):
-        current_frame_values = self.label_values.get(self.frame_index, {})
+        current_frame_values = self.label_values.frame_values(self.frame_index)
         for label_name, elements in self.label_ui_elements.items():
             value = current_frame_values.get(label_name, "")
             elements.value_widget.blockSignals(True);
@@ -533,7 +1038,6 @@ class Interface(QMainWindow):
             elements.numeric_checkbox.blockSignals(False)
 
     def _update_label_data_from_input(self, label_name, text, input_widget, numeric_checkbox):
-        if self.frame_index not in self.label_values: self.label_values[self.frame_index] = {}
         is_numeric = numeric_checkbox.isChecked();
         current_value = None;
         parse_error = False
@@ -552,22 +1056,20 @@ class Interface(QMainWindow):
             current_value = text;
             input_widget.setStyleSheet("")
 
-        previous_value = self.label_values[self.frame_index].get(label_name)
+        previous_value = self.label_values.value(self.frame_index, label_name)
 
         if (is_numeric and parse_error) or \
                 (not parse_error and previous_value != current_value):
-            self.label_values[self.frame_index][label_name] = current_value;
+            self.label_values.set_value(self.frame_index, label_name, current_value);
             self._has_unsaved_changes = True
 
     def copy_labels_from_previous_frame(self):
         if self.frame_index <= 0: self.show_status_message("Cannot copy: First frame.", 3000); return
         if not self.label_values: self.show_status_message("Cannot copy: No label data.", 3000); return
         prev_frame_index = self.frame_index - 1
-        prev_frame_data = self.label_values.get(prev_frame_index, None)
-        if prev_frame_data is None: self.show_status_message(f"Cannot copy: No data for frame {prev_frame_index}.",
-                                                             3000); return
-        if self.frame_index not in self.label_values: self.label_values[self.frame_index] = {}
-        self.label_values[self.frame_index] = prev_frame_data.copy()
+        if prev_frame_index not in self.label_values: self.show_status_message(
+            f"Cannot copy: No data for frame {prev_frame_index}.", 3000); return
+        self.label_values.copy_frame(prev_frame_index, self.frame_index)
         self._has_unsaved_changes = True;
         self.update_label_value_inputs()
         self.show_status_message(f"Copied labels from frame {prev_frame_index}.", 2000)
@@ -604,7 +1106,7 @@ class Interface(QMainWindow):
                                            f"Target frame cannot exceed total frames ({self.total_frames - 1}).")
                 return
 
-            current_frame_data = self.label_values.get(self.frame_index, {})
+            current_frame_data = self.label_values.frame_values(self.frame_index)
             values_to_copy = {}
             for label_name in selected_labels:
                 if label_name in current_frame_data:
@@ -617,19 +1119,8 @@ class Interface(QMainWindow):
                 self.show_status_message("No values to copy from current frame for selected labels.", 3000)
                 return
 
-            frames_copied_count = 0
-            for frame_to_update in range(self.frame_index + 1, target_frame_idx + 1):
-                if frame_to_update not in self.label_values:
-                    self.label_values[frame_to_update] = {}
-
-                changed_in_this_frame = False
-                for label_name, value_to_set in values_to_copy.items():
-                    if self.label_values[frame_to_update].get(label_name) != value_to_set:
-                        self.label_values[frame_to_update][label_name] = value_to_set
-                        changed_in_this_frame = True
-
-                if changed_in_this_frame:
-                    frames_copied_count += 1
+            frames_copied_count = self.label_values.fill_range(values_to_copy, self.frame_index + 1,
+                                                               target_frame_idx + 1)
 
             if frames_copied_count > 0:
                 self._has_unsaved_changes = True
@@ -644,9 +1135,21 @@ class Interface(QMainWindow):
         else:
             self.show_status_message("Copy until frame cancelled.", 2000)
 
-    def save_csv(self, show_dialog=True):
+    def save_csv(self, show_dialog=True, background=True):
         if self.keypoints is None: self.display_error_message("Save Error", "No keypoints loaded."); return
         if not self.label_names: self.display_error_message("Save Error", "No labels defined."); return
+        if self._active_task is not None:
+            # The labels may still be a placeholder (e.g. while labels load), which must not overwrite the file.
+            self.display_error_message("Save Error", f"Cannot save while busy: {self._active_task.description}. "
+                                                     "Wait for it to finish or cancel it, then save.")
+            return
+        if self._save_task is not None:
+            if background:
+                self.show_status_message(f"Busy: {self._save_task.description}. Save again when it finishes.", 3000)
+                return
+            # A running export to the same file must not land after this one.
+            self._save_task.wait()
+            QApplication.processEvents()
         save_path = self.csv_file
         if not self.csv_file or show_dialog:
             suggested_path = self.csv_file if self.csv_file else f"{os.path.splitext(self.keypoints_path)[0]}_newlabels.csv" if self.keypoints_path else "keypoints_newlabels.csv"
@@ -655,48 +1158,121 @@ class Interface(QMainWindow):
             if not save_path_selected: self.show_status_message("Save cancelled.", 2000); return
             save_path = save_path_selected;
             self.csv_file = save_path
-        climber_id = self.climber_id_input.text().strip();
-        route_id = self.route_id_input.text().strip()
-        self.show_status_message(f"Saving to {save_path}...");
-        QApplication.processEvents()
-        data_to_save = [];
-        num_frames = self.keypoints.shape[0]
+        self.show_status_message(f"Saving to {save_path}...", 0)
+        self._start_label_save(save_path, f"Saving {os.path.basename(save_path)}",
+                           on_saved=lambda path: self.show_status_message(f"Saved to {path}", 5000),
+                           on_failure=self._save_failed, background=background)
+
+    def _save_failed(self, message):
+        self.display_error_message("Save Error", f"Unexpected save error:\n{message}");
+        self.show_status_message("Save failed.", 5000)
+
+    def _start_label_save(self, path, description, on_saved, on_failure, background=True):
+        """
+        Writes the labels file to path from a snapshot of the labels taken now, so labelling can go on
+        while a worker writes the file. Once the file is in place, the journal records covered by the snapshot
+        are dropped. With background=False the export is written before returning (used on close).
+        """
+        if self._flush_journal() is None: return False
+        journal = self._journal
+        if journal is None or journal.path != journal_path(path):
+            # Saving under a new name: the snapshot holds every edit, so that file's old journal is stale.
+            journal = LabelJournal(journal_path(path))
+            journal.discard()
+            self._journal = journal
+        self.label_values.start_tracking()
+        offset = journal.size()
+        args = (path, self.keypoints, self.keypoint_axis_signs, self.label_values.copy(), list(self.label_names),
+                dict(self.label_is_numeric), self.climber_id_input.text().strip(), self.route_id_input.text().strip())
+        on_success = lambda saved_path: self._label_save_finished(journal, offset, saved_path, on_saved)
+        if background:
+            return self._start_background_task(description, self._write_label_file, *args, exclusive=False,
+                                               on_success=on_success, on_failure=on_failure)
         try:
-            headers = ["climber_id", "route_id", "frame"];
-            num_kps = self.keypoints.shape[1]
-            for i in range(num_kps): headers.extend([f"kp{i}_x", f"kp{i}_y", f"kp{i}_z"])
-            headers.extend(self.label_names)
-            for frame_idx in range(num_frames):
-                frame_data = {"climber_id": climber_id, "route_id": route_id, "frame": frame_idx}
-                for kp_idx, point in enumerate(self.keypoints[frame_idx]):
-                    frame_data[f"kp{kp_idx}_x"] = point[0];
-                    frame_data[f"kp{kp_idx}_y"] = point[1];
-                    frame_data[f"kp{kp_idx}_z"] = point[2]
-                frame_labels = self.label_values.get(frame_idx, {})
-                for label_name in self.label_names:
-                    is_numeric = self.label_is_numeric.get(label_name, False);
-                    default_value = 0.0 if is_numeric else ""
-                    value = frame_labels.get(label_name,
-                                             default_value)
-                    if is_numeric:
-                        try:
-                            value = float(value)
-                        except (ValueError, TypeError):
-                            value = 0.0
-                    else:
-                        value = str(value)
-                    frame_data[label_name] = value
-                data_to_save.append(frame_data)
-                if (frame_idx + 1) % 100 == 0: self.show_status_message(f"Saving... {frame_idx + 1}/{num_frames}",
-                                                                        0); QApplication.processEvents()
-            df = pd.DataFrame(data_to_save, columns=headers);
-            df.to_csv(save_path, index=False);
-            self._has_unsaved_changes = False
-            self.show_status_message(f"Saved to {save_path}", 5000)
+            saved_path = self._write_label_file(TaskContext(), *args)
         except Exception as e:
-            self.display_error_message("Save Error", f"Unexpected save error:\n{e}");
-            self.show_status_message(
-                "Save failed.", 5000)
+            on_failure(f"{e}")
+            return False
+        on_success(saved_path)
+        return True
+
+    @staticmethod
+    def _write_label_file(context, path, keypoints, axis_signs, label_values, label_names, label_is_numeric,
+                          climber_id, route_id):
+        """ Writes the labels-only working CSV: IDs, frame and labels for every keypoint frame. """
+        progress = Interface._writing_progress(context, path)
+        progress(0, keypoints.shape[0])
+        return Interface._replace_atomically(
+            context, path, lambda temp_path: write_label_csv(temp_path, label_values, label_names, label_is_numeric,
+                                                             climber_id, route_id, keypoints.shape[0],
+                                                             progress=progress))
+
+    @staticmethod
+    def _write_export_file(context, path, keypoints, axis_signs, label_values, label_names, label_is_numeric,
+                           climber_id, route_id, skeleton=None):
+        """ Writes the merged dataset (labels joined to the oriented keypoints) in the format of path's extension. """
+        file_format = export_format(path)
+        progress = Interface._writing_progress(context, path)
+        progress(0, keypoints.shape[0])
+        return Interface._replace_atomically(
+            context, path, lambda temp_path: write_export(temp_path, file_format, keypoints, axis_signs, label_values,
+                                                          label_names, label_is_numeric, climber_id, route_id,
+                                                          progress=progress, skeleton=skeleton))
+
+    @staticmethod
+    def _writing_progress(context, path):
+        name = os.path.basename(path)
+        return lambda done, total: context.report(done, total, f"Writing {name}... {done}/{total} frames")
+
+    @staticmethod
+    def _replace_atomically(context, path, write):
+        """ Calls write(temp_path) and renames the result over path, so path is never half-written. """
+        temp_path = f"{path}.tmp"
+        try:
+            write(temp_path)
+            context.check_cancelled()
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path): os.remove(temp_path)
+            raise
+        return path
+
+    def export_merged_dataset(self):
+        """
+        Writes keypoints plus labels into one file for training on a worker: CSV, Parquet/Feather
+        (typed, compressed; needs pyarrow) or .npz, chosen by the file extension.
+        """
+        if self.keypoints is None: self.display_error_message("Export Error", "No keypoints loaded."); return
+        if not self.label_names: self.display_error_message("Export Error", "No labels defined."); return
+        suggested_path = f"{os.path.splitext(self.keypoints_path)[0]}_merged.csv" if self.keypoints_path else "keypoints_merged.csv"
+        filters = [EXPORT_FILE_FILTERS[extension] for extension in available_export_formats()]
+        export_path, selected_filter = QFileDialog.getSaveFileName(self, "Export Merged Dataset", suggested_path,
+                                                                   ";;".join(filters))
+        if not export_path: self.show_status_message("Export cancelled.", 2000); return
+        if not os.path.splitext(export_path)[1]:
+            export_path += next((extension for extension, file_filter in EXPORT_FILE_FILTERS.items()
+                                 if file_filter == selected_filter), ".csv")
+        try:
+            export_format(export_path)
+        except ValueError as e:
+            self.display_error_message("Export Error", f"{e}"); return
+        skeleton = self.skeleton if self.skeleton is not None and self.skeleton.fits(self.keypoints.shape[1]) else None
+        args = (export_path, self.keypoints, self.keypoint_axis_signs, self.label_values.copy(),
+                list(self.label_names), dict(self.label_is_numeric),
+                self.climber_id_input.text().strip(), self.route_id_input.text().strip(), skeleton)
+        self._start_background_task(f"Exporting {os.path.basename(export_path)}", self._write_export_file, *args,
+                                    exclusive=False,
+                                    on_success=lambda path: self.show_status_message(f"Exported to {path}", 5000),
+                                    on_failure=lambda message: self.display_error_message(
+                                        "Export Error", f"Unexpected export error:\n{message}"))
+
+    def _label_save_finished(self, journal, offset, path, on_saved):
+        # A new label set loaded since the snapshot has its own journal; this one is no longer ours.
+        if journal is self._journal:
+            journal.truncate_before(offset)
+            if not journal.exists() and not self.label_values.has_changes():
+                self._has_unsaved_changes = False
+        on_saved(path)
 
     def closeEvent(self, event: QCloseEvent):
         proceed_to_close = True  # Assume we will close
@@ -710,20 +1286,30 @@ class Interface(QMainWindow):
                                          QMessageBox.StandardButton.Cancel)
 
             if reply == QMessageBox.StandardButton.Save:
-                self.save_csv(show_dialog=False)
+                self.save_csv(show_dialog=False, background=False)
                 if self._has_unsaved_changes:  # Save failed or was cancelled by user in file dialog
                     proceed_to_close = False
             elif reply == QMessageBox.StandardButton.Cancel:
                 proceed_to_close = False
             elif reply == QMessageBox.StandardButton.Discard:
-                # User chose to discard, proceed_to_close remains True
-                pass
+                # User chose to discard, proceed_to_close remains True; the journal must not resurrect the edits.
+                if self._journal is not None: self._journal.discard()
+                self._journal = None
             else:  # Should not happen
                 proceed_to_close = False
 
         if proceed_to_close:
-            if self.cap:
-                self.cap.release()
+            self.autosave_timer.stop()
+            self.autosave()
+            if self._active_task is not None:
+                self._active_task.cancel()
+                self._active_task.wait()
+            if self._save_task is not None:
+                self._save_task.wait()
+            self._stop_prefetcher()
+            self._close_proxy()
+            if self.video:
+                self.video.release()
             event.accept()
         else:
             event.ignore()
@@ -0,0 +1,118 @@
+import json
+import os
+import cv2
+import numpy as np
+
+from keypoint_cache import source_fingerprint
+
+# The index is written next to the video as '<video>.kfindex.npz'.
+INDEX_SUFFIX = '.kfindex.npz'
+INDEX_FORMAT_VERSION = 1
+PROGRESS_EVERY_PACKETS = 2048
+
+
+def index_path(video_path):
+    return f"{video_path}{INDEX_SUFFIX}"
+
+
+class KeyframeIndex:
+    """
+    Presentation timestamps of every frame of a video and the frame indices of its keyframes.
+    Frame i is the frame with the i-th smallest timestamp, as the decoder returns them.
+    """
+
+    def __init__(self, pts, keyframes):
+        self.pts = np.asarray(pts, dtype=np.int64)
+        self.keyframes = np.asarray(keyframes, dtype=np.int64)
+
+    @property
+    def frame_count(self):
+        return len(self.pts)
+
+    def keyframe_at_or_before(self, index):
+        """ Nearest keyframe at or before frame index (0 if there is none). """
+        position = np.searchsorted(self.keyframes, index, side='right') - 1
+        return int(self.keyframes[position]) if position >= 0 else 0
+
+    def keyframe_before(self, index):
+        """ Nearest keyframe strictly before frame index, or None. """
+        position = np.searchsorted(self.keyframes, index, side='left') - 1
+        return int(self.keyframes[position]) if position >= 0 else None
+
+    def frame_at_pts(self, pts):
+        """ Frame index with timestamp pts, or None if no frame has it. """
+        position = int(np.searchsorted(self.pts, pts))
+        if position < len(self.pts) and self.pts[position] == pts:
+            return position
+        return None
+
+    @classmethod
+    def build(cls, video_path, progress=None):
+        """
+        Scans the video's packets without decoding them, through OpenCV's FFmpeg raw-stream mode.
+        Returns None if the backend cannot report packets. progress(done, total) may raise
+        OperationCancelled to stop the scan.
+        """
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+        try:
+            if not cap.isOpened() or cap.get(cv2.CAP_PROP_FORMAT) != -1:
+                return None
+            total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            pts, is_key = [], []
+            while cap.grab():
+                pts.append(cap.get(cv2.CAP_PROP_PTS))
+                is_key.append(bool(cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME)))
+                if progress is not None and len(pts) % PROGRESS_EVERY_PACKETS == 0:
+                    progress(len(pts), max(total, len(pts)))
+        finally:
+            cap.release()
+        if not pts:
+            return None
+        packet_pts = np.asarray(pts, dtype=np.float64)
+        if not np.isfinite(packet_pts).all() or len(np.unique(packet_pts)) != len(packet_pts):
+            # No usable timestamps: assume packets are in presentation order.
+            packet_pts = np.arange(len(pts), dtype=np.float64)
+        packet_pts = packet_pts.astype(np.int64)
+        # Packets come in decode order; frame indices follow presentation order.
+        frame_pts = np.sort(packet_pts)
+        keyframes = np.searchsorted(frame_pts, packet_pts[np.asarray(is_key, dtype=bool)])
+        if not len(keyframes) or keyframes[0] != 0:
+            keyframes = np.concatenate([[0], keyframes])
+        return cls(frame_pts, np.unique(keyframes))
+
+    def save(self, video_path):
+        """ Writes the index next to video_path. Returns False if it cannot be written. """
+        path = index_path(video_path)
+        meta = {"version": INDEX_FORMAT_VERSION, "key": source_fingerprint(video_path)}
+        try:
+            with open(f"{path}.tmp", 'wb') as f:
+                np.savez(f, pts=self.pts, keyframes=self.keyframes, meta=np.array(json.dumps(meta)))
+            os.replace(f"{path}.tmp", path)
+            return True
+        except OSError:
+            if os.path.exists(f"{path}.tmp"):
+                os.remove(f"{path}.tmp")
+            return False
+
+    @classmethod
+    def load(cls, video_path):
+        """ Returns the saved index of video_path if it matches the current file, else None. """
+        try:
+            with np.load(index_path(video_path)) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("version") != INDEX_FORMAT_VERSION or meta.get("key") != source_fingerprint(video_path):
+                    return None
+                return cls(data["pts"], data["keyframes"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def load_or_build_keyframe_index(video_path, progress=None):
+    """ Loads the saved keyframe index of video_path, or scans the video once and saves it. """
+    index = KeyframeIndex.load(video_path)
+    if index is not None:
+        return index
+    index = KeyframeIndex.build(video_path, progress)
+    if index is not None:
+        index.save(video_path)
+    return index
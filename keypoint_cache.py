@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+# Sidecar files are written next to the source: '<source>.kpcache.npy' holds the parsed array and
+# '<source>.kpcache.json' the key it was built from.
+CACHE_SUFFIX = '.kpcache'
+CACHE_FORMAT_VERSION = 1
+# Arrays larger than this are not cached (the sidecar would cost as much disk as it saves time).
+DEFAULT_MAX_CACHE_BYTES = 4 * 1024 ** 3
+# Bytes read from the start and from the end of the source to build the content hash.
+HASH_SAMPLE_BYTES = 1024 * 1024
+
+
+def cache_paths(source_path):
+    """ Returns (data_path, meta_path) of the sidecar cache for source_path. """
+    base = f"{source_path}{CACHE_SUFFIX}"
+    return f"{base}.npy", f"{base}.json"
+
+
+def source_fingerprint(source_path):
+    """
+    Key identifying the current contents of source_path: absolute path, size, mtime and a hash of
+    the size plus the first and last HASH_SAMPLE_BYTES (cheap even for multi-GB files).
+    """
+    stat = os.stat(source_path)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(stat.st_size).encode())
+    with open(source_path, 'rb') as f:
+        digest.update(f.read(HASH_SAMPLE_BYTES))
+        if stat.st_size > HASH_SAMPLE_BYTES:
+            f.seek(max(HASH_SAMPLE_BYTES, stat.st_size - HASH_SAMPLE_BYTES))
+            digest.update(f.read(HASH_SAMPLE_BYTES))
+    return {
+        "source": os.path.abspath(source_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "content_hash": digest.hexdigest(),
+    }
+
+
+def read_cached_keypoints(source_path, mmap_mode='r'):
+    """
+    Returns (keypoints, frame_index_stripped) from the sidecar cache if it matches the current
+    source file, else None. The array is memory-mapped unless mmap_mode is None.
+    """
+    data_path, meta_path = cache_paths(source_path)
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        if meta.get("version") != CACHE_FORMAT_VERSION or meta.get("key") != source_fingerprint(source_path):
+            return None
+        keypoints = np.load(data_path, mmap_mode=mmap_mode)
+    except (OSError, ValueError):
+        return None
+    if list(keypoints.shape) != meta.get("shape"):
+        return None
+    return keypoints, bool(meta.get("frame_index_stripped", False))
+
+
+def write_cached_keypoints(source_path, keypoints, frame_index_stripped, max_bytes=DEFAULT_MAX_CACHE_BYTES):
+    """
+    Writes the sidecar cache for source_path. Returns False (without raising) if the array is over
+    max_bytes or the sidecar cannot be written, e.g. next to a read-only source.
+    """
+    if max_bytes is not None and keypoints.nbytes > max_bytes:
+        return False
+    data_path, meta_path = cache_paths(source_path)
+    try:
+        meta = {
+            "version": CACHE_FORMAT_VERSION,
+            "key": source_fingerprint(source_path),
+            "shape": list(keypoints.shape),
+            "frame_index_stripped": bool(frame_index_stripped),
+        }
+        # Write to temporary names and rename, so a reader never sees a half-written sidecar.
+        with open(f"{data_path}.tmp", 'wb') as f:
+            np.save(f, np.ascontiguousarray(keypoints))
+        with open(f"{meta_path}.tmp", 'w') as f:
+            json.dump(meta, f)
+        os.replace(f"{data_path}.tmp", data_path)
+        os.replace(f"{meta_path}.tmp", meta_path)
+        return True
+    except OSError:
+        for path in (f"{data_path}.tmp", f"{meta_path}.tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+        return False
+
+
+def invalidate_keypoint_cache(source_path):
+    """ Deletes the sidecar cache for source_path, if any. """
+    for path in cache_paths(source_path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
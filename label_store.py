@@ -0,0 +1,480 @@
+import numpy as np
+
+
+def _is_number(value):
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+
+def _mask_to_intervals(mask, offset=0):
+    """ Converts a boolean mask into a list of (start, stop) intervals of its True runs. """
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False])).astype(np.int8)))
+    return [(offset + int(start), offset + int(stop)) for start, stop in zip(edges[::2], edges[1::2])]
+
+
+def _count_union(intervals):
+    """ Number of frames covered by the union of (start, stop) intervals. """
+    total = 0
+    current_start = current_stop = None
+    for start, stop in sorted(intervals):
+        if current_stop is None or start > current_stop:
+            if current_stop is not None:
+                total += current_stop - current_start
+            current_start, current_stop = start, stop
+        else:
+            current_stop = max(current_stop, stop)
+    if current_stop is not None:
+        total += current_stop - current_start
+    return total
+
+
+class _DenseColumn:
+    """ Stores one value per frame in a contiguous array (float64 values or int32 category codes). """
+
+    def __init__(self, num_frames, dtype, fill_value):
+        self.data = np.full(num_frames, fill_value, dtype=dtype)
+
+    def get(self, frame):
+        return self.data[frame]
+
+    def set(self, frame, value):
+        self.data[frame] = value
+
+    def fill(self, start, stop, value):
+        """ Sets frames [start, stop) to value and returns the intervals that actually changed. """
+        changed = _mask_to_intervals(self.data[start:stop] != value, offset=start)
+        self.data[start:stop] = value
+        return changed
+
+    def assign(self, frames, values):
+        self.data[frames] = values
+
+    def values(self, start=0, stop=None):
+        return self.data[start:stop]
+
+    def is_all(self, value):
+        return not (self.data != value).any()
+
+    def resize(self, num_frames, fill_value):
+        old = self.data
+        self.data = np.full(num_frames, fill_value, dtype=old.dtype)
+        keep = min(len(old), num_frames)
+        self.data[:keep] = old[:keep]
+
+    def copy(self):
+        column = _DenseColumn.__new__(_DenseColumn)
+        column.data = self.data.copy()
+        return column
+
+    @classmethod
+    def from_values(cls, values):
+        column = cls.__new__(cls)
+        column.data = np.array(values)
+        return column
+
+
+class _RunColumn:
+    """
+    Stores a column as sorted runs of equal values: run i covers frames [starts[i], starts[i + 1]).
+    starts and run_values are numpy arrays, so reads are a searchsorted, a range fill is one splice
+    whatever the segment length, and a column that changes on every frame still costs only an
+    index and a value per frame.
+    """
+
+    def __init__(self, num_frames, dtype, fill_value):
+        self.dtype = np.dtype(dtype)
+        self.num_frames = num_frames
+        self.starts = np.zeros(1, dtype=np.int64)
+        self.run_values = np.full(1, fill_value, dtype=self.dtype)
+
+    def _run_index(self, frame):
+        return int(np.searchsorted(self.starts, frame, side='right')) - 1
+
+    def _run_stops(self, first, last):
+        """ End frames of runs first..last - 1. """
+        following = self.starts[first + 1:last + 1]
+        if last >= len(self.starts):
+            following = np.append(following, self.num_frames)
+        return following
+
+    def get(self, frame):
+        return self.run_values[self._run_index(frame)]
+
+    def set(self, frame, value):
+        self.fill(frame, frame + 1, value)
+
+    def fill(self, start, stop, value):
+        """ Sets frames [start, stop) to value and returns the intervals that actually changed. """
+        value = self.dtype.type(value)
+        first = self._run_index(start)
+        last = self._run_index(stop - 1) + 1
+        differs = self.run_values[first:last] != value
+        if not differs.any():
+            return []
+        run_starts = np.maximum(self.starts[first:last][differs], start)
+        run_stops = np.minimum(self._run_stops(first, last)[differs], stop)
+        changed = list(zip(run_starts.tolist(), run_stops.tolist()))
+
+        # Keep the runs before start (the one containing start truncated), the new run, and the runs
+        # from stop on (the one containing stop restarted at stop).
+        keep_before = first + 1 if self.starts[first] < start else first
+        starts = [self.starts[:keep_before], [start]]
+        values = [self.run_values[:keep_before], [value]]
+        if stop < self.num_frames:
+            after = self._run_index(stop)
+            starts += [[stop], self.starts[after + 1:]]
+            values += [[self.run_values[after]], self.run_values[after + 1:]]
+        self.starts, self.run_values = self._merged(np.concatenate(starts).astype(np.int64),
+                                                    np.concatenate(values).astype(self.dtype))
+        return changed
+
+    @staticmethod
+    def _merged(starts, run_values):
+        """ Drops runs equal to the one before them, so runs stay maximal. """
+        keep = np.concatenate(([True], run_values[1:] != run_values[:-1]))
+        return starts[keep], run_values[keep]
+
+    def assign(self, frames, values):
+        """ Scattered bulk write; rebuilds the runs from the expanded column. """
+        expanded = self.values()
+        expanded[frames] = values
+        rebuilt = _RunColumn.from_values(expanded)
+        self.starts, self.run_values = rebuilt.starts, rebuilt.run_values
+
+    def values(self, start=0, stop=None):
+        """ Expands frames [start, stop) into a per-frame array. """
+        stop = self.num_frames if stop is None else min(stop, self.num_frames)
+        if stop <= start:
+            return np.empty(0, dtype=self.dtype)
+        first = self._run_index(start)
+        last = self._run_index(stop - 1) + 1
+        bounds = np.append(self.starts[first:last], stop)
+        bounds[0] = start
+        return np.repeat(self.run_values[first:last], np.diff(bounds))
+
+    def is_all(self, value):
+        return not (self.run_values != value).any()
+
+    def resize(self, num_frames, fill_value):
+        if num_frames < self.num_frames:
+            keep = max(1, int(np.searchsorted(self.starts, num_frames, side='left')))
+            self.starts = self.starts[:keep]
+            self.run_values = self.run_values[:keep]
+        elif num_frames > self.num_frames:
+            fill_value = self.dtype.type(fill_value)
+            if self.num_frames == 0:
+                self.run_values[0] = fill_value
+            elif self.run_values[-1] != fill_value:
+                self.starts = np.append(self.starts, self.num_frames)
+                self.run_values = np.append(self.run_values, fill_value).astype(self.dtype)
+        self.num_frames = num_frames
+
+    def copy(self):
+        column = _RunColumn.__new__(_RunColumn)
+        column.dtype = self.dtype
+        column.num_frames = self.num_frames
+        column.starts = self.starts.copy()
+        column.run_values = self.run_values.copy()
+        return column
+
+    @classmethod
+    def from_values(cls, values):
+        values = np.asarray(values)
+        column = cls(len(values), values.dtype, 0)
+        if len(values):
+            column.starts = np.concatenate(([0], np.flatnonzero(values[1:] != values[:-1]) + 1)).astype(np.int64)
+            column.run_values = values[column.starts].astype(column.dtype)
+        return column
+
+
+_COLUMN_TYPES = {"dense": _DenseColumn, "runs": _RunColumn}
+
+
+class _FrameView:
+    """ Dict-like view of one frame's labels, backed by the store. """
+
+    def __init__(self, store, frame):
+        self._store = store
+        self._frame = frame
+
+    def __getitem__(self, name):
+        if not self._store.has_label(name):
+            raise KeyError(name)
+        return self._store.value(self._frame, name)
+
+    def __setitem__(self, name, value):
+        self._store.set_value(self._frame, name, value)
+
+    def __contains__(self, name):
+        return self._store.has_label(name)
+
+    def get(self, name, default=None):
+        return self._store.value(self._frame, name, default)
+
+    def keys(self):
+        return self._store.label_names()
+
+    def items(self):
+        return self.copy().items()
+
+    def copy(self):
+        return self._store.frame_values(self._frame)
+
+    def __repr__(self):
+        return repr(self.copy())
+
+
+class LabelStore:
+    """
+    Columnar per-frame label storage. Numeric labels are float64 values; string labels are int32
+    codes into a per-label vocabulary whose code 0 is the empty string. In "dense" mode each label
+    is one array (a few bytes per frame); in "runs" mode it is sorted arrays of constant segments,
+    so segment-style annotation costs memory per segment and range fills are O(log n). Per-frame
+    arrays are only materialised by column_values(), e.g. at export time.
+
+    Values are coerced the way they are exported: numeric columns hold floats, string columns hold
+    str(value). A numeric column that is given a non-numeric value is converted to a string column,
+    so no value is ever lost; a string column that is still all-empty becomes numeric when it is
+    given a number. For compatibility the store also behaves like the former
+    {frame: {label: value}} mapping: store[frame][label], frame in store, len(store).
+    """
+
+    def __init__(self, num_frames=0, mode="dense"):
+        if mode not in _COLUMN_TYPES:
+            raise ValueError(f"Unknown label storage mode '{mode}'. Expected one of {list(_COLUMN_TYPES)}.")
+        self.num_frames = num_frames
+        self.mode = mode
+        self._column_type = _COLUMN_TYPES[mode]
+        self._columns = {}
+        self._numeric = {}
+        self._vocab = {}
+        self._vocab_index = {}
+        self._changes = None
+
+    # --- Change tracking ---
+
+    def start_tracking(self):
+        """
+        Starts recording edits as ("set", start, stop, label, value) and ("drop", label) records,
+        which drain_changes() hands out (e.g. to an autosave journal). Bulk imports are not recorded.
+        """
+        self._changes = []
+
+    def drain_changes(self):
+        """ Returns the edits recorded since the last call and clears them. """
+        if self._changes is None:
+            return []
+        changes, self._changes = self._changes, []
+        return changes
+
+    def requeue_changes(self, changes):
+        """ Puts drained edits back in front of the log, e.g. after a failed journal write. """
+        if self._changes is not None:
+            self._changes[:0] = changes
+
+    def has_changes(self):
+        return bool(self._changes)
+
+    def _record(self, *record):
+        if self._changes is not None:
+            self._changes.append(record)
+
+    # --- Labels ---
+
+    def label_names(self):
+        return list(self._columns)
+
+    def has_label(self, name):
+        return name in self._columns
+
+    def is_numeric(self, name):
+        return self._numeric[name]
+
+    def add_label(self, name, numeric=False):
+        if name in self._columns:
+            return
+        self._numeric[name] = numeric
+        if numeric:
+            self._columns[name] = self._new_column(np.float64, 0.0)
+        else:
+            self._vocab[name] = [""]
+            self._vocab_index[name] = {"": 0}
+            self._columns[name] = self._new_column(np.int32, 0)
+
+    def remove_label(self, name):
+        if name in self._columns:
+            self._record("drop", name)
+        self._columns.pop(name, None)
+        self._numeric.pop(name, None)
+        self._vocab.pop(name, None)
+        self._vocab_index.pop(name, None)
+
+    def default_value(self, name):
+        return 0.0 if self._numeric[name] else ""
+
+    def _new_column(self, dtype, fill_value):
+        return self._column_type(self.num_frames, dtype, fill_value)
+
+    def _to_string_column(self, name):
+        """ Converts a numeric column to a string column, keeping str(value) of every frame. """
+        values = self._columns[name].values()
+        categories, codes = np.unique(values, return_inverse=True)
+        vocab = [""] + [str(float(value)) for value in categories]
+        self._vocab[name] = vocab
+        self._vocab_index[name] = {text: code for code, text in enumerate(vocab)}
+        self._columns[name] = self._column_type.from_values((codes + 1).astype(np.int32))
+        self._numeric[name] = False
+
+    def _to_numeric_column(self, name):
+        """ Converts an all-empty string column to a numeric column of 0.0 (its exported value). """
+        self._vocab.pop(name)
+        self._vocab_index.pop(name)
+        self._columns[name] = self._new_column(np.float64, 0.0)
+        self._numeric[name] = True
+
+    def _is_empty_string_column(self, name):
+        return len(self._vocab[name]) == 1 or self._columns[name].is_all(0)
+
+    def _encode(self, name, value):
+        """ Returns the stored representation of value for the column, converting the column if needed. """
+        if not self._numeric[name] and _is_number(value) and self._is_empty_string_column(name):
+            self._to_numeric_column(name)
+        if self._numeric[name]:
+            if _is_number(value):
+                return float(value)
+            self._to_string_column(name)
+        text = str(value)
+        code = self._vocab_index[name].get(text)
+        if code is None:
+            code = len(self._vocab[name])
+            self._vocab[name].append(text)
+            self._vocab_index[name][text] = code
+        return code
+
+    def _decode(self, name, stored):
+        if self._numeric[name]:
+            return float(stored)
+        return self._vocab[name][int(stored)]
+
+    # --- Frames ---
+
+    def resize(self, num_frames):
+        for name, column in self._columns.items():
+            column.resize(num_frames, 0.0 if self._numeric[name] else 0)
+        self.num_frames = num_frames
+
+    def _ensure_frame(self, frame):
+        if frame < 0:
+            raise IndexError(f"Frame {frame} is negative.")
+        if frame >= self.num_frames:
+            self.resize(frame + 1)
+
+    def value(self, frame, name, default=None):
+        if name not in self._columns or not 0 <= frame < self.num_frames:
+            return default
+        return self._decode(name, self._columns[name].get(frame))
+
+    def set_value(self, frame, name, value):
+        """ Sets one label of one frame; unknown labels are created with a type inferred from value. """
+        if name not in self._columns:
+            self.add_label(name, numeric=_is_number(value))
+        self._ensure_frame(frame)
+        stored = self._encode(name, value)
+        self._columns[name].set(frame, stored)
+        self._record("set", frame, frame + 1, name, self._decode(name, stored))
+
+    def frame_values(self, frame):
+        """ Returns {label: value} for frame (empty if the frame is out of range). """
+        if not 0 <= frame < self.num_frames:
+            return {}
+        return {name: self._decode(name, column.get(frame)) for name, column in self._columns.items()}
+
+    def set_frame_values(self, frame, values):
+        for name, value in values.items():
+            self.set_value(frame, name, value)
+
+    def copy_frame(self, source_frame, target_frame, names=None):
+        for name in (self.label_names() if names is None else names):
+            self.set_value(target_frame, name, self.value(source_frame, name))
+
+    def fill_range(self, values, start, stop):
+        """
+        Sets every label in values ({label: value}) to its value on frames [start, stop).
+        Returns the number of frames in which at least one label changed.
+        """
+        if stop <= start:
+            return 0
+        self._ensure_frame(stop - 1)
+        changed = []
+        for name, value in values.items():
+            if name not in self._columns:
+                self.add_label(name, numeric=_is_number(value))
+            stored = self._encode(name, value)
+            label_changed = self._columns[name].fill(start, stop, stored)
+            if label_changed:
+                self._record("set", start, stop, name, self._decode(name, stored))
+            changed.extend(label_changed)
+        return _count_union(changed)
+
+    # --- Whole columns ---
+
+    def assign_column(self, name, frames, values):
+        """
+        Vectorised bulk write: sets label name at each of frames (int array) to the matching entry of
+        values (floats for numeric labels, strings otherwise). Used to import whole label files.
+        """
+        frames = np.asarray(frames, dtype=np.int64)
+        if frames.size == 0:
+            return
+        if frames.min() < 0:
+            raise IndexError(f"Frame {int(frames.min())} is negative.")
+        self._ensure_frame(int(frames.max()))
+        if self._numeric[name]:
+            stored = np.asarray(values, dtype=np.float64)
+        else:
+            texts, inverse = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+            codes = np.array([self._encode(name, text) for text in texts], dtype=np.int32)
+            stored = codes[inverse]
+        self._columns[name].assign(frames, stored)
+
+    def column_values(self, name, start=0, stop=None):
+        """
+        Values of a label for frames [start, stop): a float64 array for numeric labels,
+        an object array of strings for string labels.
+        """
+        stored = self._columns[name].values(start, stop)
+        if self._numeric[name]:
+            return np.asarray(stored, dtype=np.float64)
+        return np.asarray(self._vocab[name], dtype=object)[stored]
+
+    def categorical(self, name, start=0, stop=None):
+        """ Returns (codes, categories) of a string label, without materialising the strings per frame. """
+        return self._columns[name].values(start, stop), list(self._vocab[name])
+
+    def copy(self):
+        """ Independent snapshot of the store (e.g. for saving on a worker thread). """
+        store = LabelStore(self.num_frames, mode=self.mode)
+        store._columns = {name: column.copy() for name, column in self._columns.items()}
+        store._numeric = dict(self._numeric)
+        store._vocab = {name: list(vocab) for name, vocab in self._vocab.items()}
+        store._vocab_index = {name: dict(index) for name, index in self._vocab_index.items()}
+        return store
+
+    # --- Mapping compatibility ---
+
+    def __len__(self):
+        return self.num_frames
+
+    def __contains__(self, frame):
+        return isinstance(frame, (int, np.integer)) and 0 <= frame < self.num_frames
+
+    def __iter__(self):
+        return iter(range(self.num_frames))
+
+    def __getitem__(self, frame):
+        if frame not in self:
+            raise KeyError(frame)
+        return _FrameView(self, frame)
+
+    def __setitem__(self, frame, values):
+        self._ensure_frame(frame)
+        self.set_frame_values(frame, values)
@@ -0,0 +1,235 @@
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+import cv2
+import numpy as np
+import pandas as pd
+from OpenGL.GL import *
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QOpenGLContext, QOffscreenSurface, QSurfaceFormat
+from PyQt6.QtOpenGL import QOpenGLFramebufferObject, QOpenGLFramebufferObjectFormat
+
+from export import ID_COLUMNS
+from open_gl_widget import OpenGLWidget
+from skeletons import SKELETONS, skeleton_for_joint_count
+from utils import load_keypoint_data, keypoint_axis_signs
+
+DEFAULT_RENDER_SIZE = (960, 720)
+DEFAULT_RENDER_FPS = 30.0
+VIDEO_FOURCC = 'mp4v'
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+PREVIEW_SUFFIX = '_preview'
+PROGRESS_EVERY_FRAMES = 100
+# Columns of a merged export that hold keypoints rather than labels.
+KEYPOINT_COLUMN = re.compile(r"kp\d+_[xyz]$")
+
+
+def default_labels_path(keypoints_path):
+    """ The labels CSV the interface saves next to a keypoints file, if it exists. """
+    path = f"{os.path.splitext(keypoints_path)[0]}_newlabels.csv"
+    return path if os.path.exists(path) else None
+
+
+def read_label_texts(labels_csv, num_frames):
+    """ Per frame, the 'name: value' lines of its non-empty labels, from a labels or merged CSV. """
+    df = pd.read_csv(labels_csv, dtype=str, keep_default_na=False)
+    names = [c for c in df.columns if c not in ID_COLUMNS and not KEYPOINT_COLUMN.match(c)]
+    frames = pd.to_numeric(df["frame"], errors='coerce') if "frame" in df.columns else pd.Series(range(len(df)))
+    texts = [[] for _ in range(num_frames)]
+    for frame, values in zip(frames, df[names].itertuples(index=False)):
+        if pd.notna(frame) and 0 <= int(frame) < num_frames:
+            texts[int(frame)] = [f"{name}: {value}" for name, value in zip(names, values) if value != ""]
+    return texts
+
+
+def draw_label_text(image, lines, frame_index=None):
+    """ Writes the frame number and label lines in the top-left corner of a BGR image, in place. """
+    if frame_index is not None:
+        lines = [f"Frame {frame_index}"] + list(lines)
+    for row, line in enumerate(lines):
+        origin = (10, 24 + 22 * row)
+        cv2.putText(image, line, origin, cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 3, cv2.LINE_AA)
+        cv2.putText(image, line, origin, cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 1, cv2.LINE_AA)
+    return image
+
+
+class OffscreenRenderer:
+    """
+    Renders the 3D view of OpenGLWidget (same camera, GL state and skeleton drawing) into an offscreen
+    framebuffer, so frames can be produced without showing a window. Needs a Qt platform with OpenGL
+    support; the widget itself is never shown.
+    """
+
+    def __init__(self, width=DEFAULT_RENDER_SIZE[0], height=DEFAULT_RENDER_SIZE[1]):
+        self.width, self.height = width, height
+        self._app = QApplication.instance() or QApplication([])
+        self.view = OpenGLWidget()
+        surface_format = QSurfaceFormat()
+        surface_format.setProfile(QSurfaceFormat.OpenGLContextProfile.CompatibilityProfile)
+        surface_format.setDepthBufferSize(24)
+        self._context = QOpenGLContext()
+        self._context.setFormat(surface_format)
+        self._surface = QOffscreenSurface()
+        self._fbo = None
+        if not self._context.create():
+            raise ValueError("Could not create an OpenGL context for offscreen rendering.")
+        self._surface.setFormat(self._context.format())
+        self._surface.create()
+        if not self._context.makeCurrent(self._surface):
+            raise ValueError("Could not activate the offscreen OpenGL context.")
+        fbo_format = QOpenGLFramebufferObjectFormat()
+        fbo_format.setAttachment(QOpenGLFramebufferObject.Attachment.CombinedDepthStencil)
+        self._fbo = QOpenGLFramebufferObject(width, height, fbo_format)
+        self._fbo.bind()
+        self.view.setup_gl_state()
+        self.view.resizeGL(width, height)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def set_data(self, keypoints, skeleton, axis_signs=None):
+        self.view.set_data(keypoints, skeleton, axis_signs)
+
+    def set_camera(self, rotation_x=0.0, rotation_y=0.0, zoom=5.0):
+        self.view.rotation_x, self.view.rotation_y, self.view.zoom_factor = rotation_x, rotation_y, zoom
+
+    def render(self, frame_index):
+        """ The scene at frame_index as a (height, width, 3) BGR array. """
+        self._context.makeCurrent(self._surface)
+        self._fbo.bind()
+        self.view.frame_index = frame_index
+        self.view.draw_scene()
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        pixels = glReadPixels(0, 0, self.width, self.height, GL_BGR, GL_UNSIGNED_BYTE)
+        # GL rows start at the bottom.
+        return np.frombuffer(pixels, dtype=np.uint8).reshape(self.height, self.width, 3)[::-1].copy()
+
+    def release(self):
+        if self._fbo is not None:
+            self._context.makeCurrent(self._surface)
+            self.view.renderer.release()
+            self._fbo.release()
+            self._fbo = None
+            self._context.doneCurrent()
+        self._surface.destroy()
+
+
+def render_sequence(keypoints_path, output_path, labels_csv=None, size=DEFAULT_RENDER_SIZE, fps=DEFAULT_RENDER_FPS,
+                    skeleton_name=None, rotation=(0.0, 0.0), zoom=5.0, onion=0, progress=None):
+    """
+    Renders every frame of a keypoints file with the current labels written on it. output_path is a
+    video (.mp4, .avi) or an image name (.png, .jpg), which becomes '<name>_<frame>.png' per frame.
+    progress(done, total) is called periodically. Returns output_path; raises ValueError on bad input.
+    """
+    keypoints = load_keypoint_data(keypoints_path, mmap_mode='r')
+    if keypoints is None or keypoints.ndim != 3 or keypoints.shape[2] != 3:
+        raise ValueError(f"Could not load keypoints from {keypoints_path}.")
+    num_frames = keypoints.shape[0]
+    if skeleton_name is not None:
+        if skeleton_name not in SKELETONS:
+            raise ValueError(f"Unknown skeleton '{skeleton_name}'.")
+        skeleton = SKELETONS[skeleton_name]
+    else:
+        skeleton = skeleton_for_joint_count(keypoints.shape[1])
+    texts = read_label_texts(labels_csv, num_frames) if labels_csv else [[] for _ in range(num_frames)]
+    stem, extension = os.path.splitext(output_path)
+    as_images = extension.lower() in IMAGE_EXTENSIONS
+    writer = None
+    with OffscreenRenderer(*size) as renderer:
+        renderer.set_data(keypoints, skeleton, keypoint_axis_signs(keypoints_path))
+        renderer.set_camera(rotation[0], rotation[1], zoom)
+        renderer.view.set_onion_skin(onion, onion)
+        try:
+            if not as_images:
+                writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*VIDEO_FOURCC), fps, tuple(size))
+                if not writer.isOpened():
+                    raise ValueError(f"Could not create the video {output_path}.")
+            for frame_index in range(num_frames):
+                image = draw_label_text(renderer.render(frame_index), texts[frame_index], frame_index)
+                if as_images:
+                    cv2.imwrite(f"{stem}_{frame_index:06d}{extension}", image)
+                else:
+                    writer.write(image)
+                if progress is not None and ((frame_index + 1) % PROGRESS_EVERY_FRAMES == 0
+                                             or frame_index + 1 == num_frames):
+                    progress(frame_index + 1, num_frames)
+        finally:
+            if writer is not None:
+                writer.release()
+    return output_path
+
+
+def _render_job(job):
+    """ Worker entry point: renders one sequence, returning (output_path, error message or None). """
+    try:
+        return render_sequence(**job), None
+    except Exception as e:
+        return job.get("output_path"), f"{e}"
+
+
+def render_batch(jobs, processes=None):
+    """
+    Renders several sequences (dicts of render_sequence arguments) in parallel worker processes, each
+    with its own offscreen context. Yields (output_path, error message or None) as jobs finish.
+    """
+    if processes == 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _render_job(job)
+        return
+    # Qt and OpenGL state must not be inherited through fork.
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        yield from pool.imap_unordered(_render_job, jobs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render skeleton preview videos of keypoint files without a window.")
+    parser.add_argument("keypoints", nargs="+", help="Keypoint files (.npy or .csv).")
+    parser.add_argument("--labels", help="Labels CSV (single input only). Default: '<keypoints>_newlabels.csv' "
+                                         "next to each input, if it exists.")
+    parser.add_argument("--output-dir", help="Directory for the previews. Default: next to each input.")
+    parser.add_argument("--format", default="mp4", choices=["mp4", "avi", "png", "jpg"],
+                        help="Video container, or an image per frame.")
+    parser.add_argument("--size", default=f"{DEFAULT_RENDER_SIZE[0]}x{DEFAULT_RENDER_SIZE[1]}", help="WIDTHxHEIGHT.")
+    parser.add_argument("--fps", type=float, default=DEFAULT_RENDER_FPS)
+    parser.add_argument("--skeleton", choices=list(SKELETONS), help="Default: chosen from the joint count.")
+    parser.add_argument("--rotate-x", type=float, default=0.0)
+    parser.add_argument("--rotate-y", type=float, default=0.0)
+    parser.add_argument("--zoom", type=float, default=5.0, help="Camera distance, as in the 3D view.")
+    parser.add_argument("--onion", type=int, default=0, help="Onion-skin frames before and after each frame.")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes. Default: one per CPU.")
+    args = parser.parse_args(argv)
+    if args.labels and len(args.keypoints) > 1:
+        parser.error("--labels can only be used with a single keypoints file.")
+    try:
+        size = tuple(int(v) for v in args.size.lower().split("x"))
+        if len(size) != 2 or min(size) <= 0: raise ValueError
+    except ValueError:
+        parser.error(f"Invalid size '{args.size}'; expected WIDTHxHEIGHT.")
+
+    jobs = []
+    for keypoints_path in args.keypoints:
+        stem = os.path.splitext(os.path.basename(keypoints_path))[0]
+        directory = args.output_dir or os.path.dirname(os.path.abspath(keypoints_path))
+        jobs.append(dict(keypoints_path=keypoints_path,
+                         output_path=os.path.join(directory, f"{stem}{PREVIEW_SUFFIX}.{args.format}"),
+                         labels_csv=args.labels or default_labels_path(keypoints_path), size=size, fps=args.fps,
+                         skeleton_name=args.skeleton, rotation=(args.rotate_x, args.rotate_y), zoom=args.zoom,
+                         onion=args.onion))
+    if args.output_dir: os.makedirs(args.output_dir, exist_ok=True)
+    failures = 0
+    for output_path, error in render_batch(jobs, args.jobs):
+        if error is None:
+            print(f"Rendered {output_path}")
+        else:
+            failures += 1
+            print(f"Failed {output_path}: {error}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
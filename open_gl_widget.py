@@ -1,10 +1,22 @@
 from PyQt6.QtOpenGLWidgets import QOpenGLWidget
-from PyQt6.QtCore import QPoint, Qt, pyqtSignal
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtCore import QPoint, Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QMouseEvent
 from OpenGL.GL import *
 from OpenGL.GLU import *
 import numpy as np
-import warnings
+import time
+from collections import deque
+
+from skeleton_renderer import SkeletonRenderer
+from skeletons import Skeleton
+
+# Default cap on repaints per second (0 = uncapped).
+DEFAULT_MAX_FPS = 60
+# Paints averaged in paint_stats(), and how often the stats overlay is refreshed.
+STATS_WINDOW_PAINTS = 60
+OVERLAY_REFRESH_MS = 500
+
 
 class OpenGLWidget(QOpenGLWidget):
     """
@@ -25,12 +37,43 @@ class OpenGLWidget(QOpenGLWidget):
         self.frame_index = 0
         self.keypoints = None # Expected shape: (n_frames, n_points, 3)
         self.limbSeq = None   # Expected format: list of [start_idx, end_idx]
+        self.skeleton = None  # Registry skeleton the limbs came from, if any
+        self.axis_signs = None # Per-axis signs applied lazily to the drawn frame
+        # Keeps the sequence in GPU buffers and draws a frame from its offset
+        self.renderer = SkeletonRenderer()
+        # Onion skin: frames shown before/after the current one (0 = off), as ghosts and/or trajectories
+        self.onion_before = 0
+        self.onion_after = 0
+        self.onion_ghosts = True
+        self.onion_trajectories = True
+
+        # Repaints are requested through request_repaint(): at most one is pending, and with max_fps > 0
+        # they are spaced at least 1/max_fps apart.
+        self.max_fps = DEFAULT_MAX_FPS
+        self._last_paint_start = 0.0
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.timeout.connect(lambda: self.update())
+        # Paint instrumentation: CPU time of recent paintGL calls and what the last one submitted
+        self.sync_paint_timing = False # glFinish() before timing, so the time includes the GPU's work
+        self._paint_times = deque(maxlen=STATS_WINDOW_PAINTS)
+        self._paint_starts = deque(maxlen=STATS_WINDOW_PAINTS)
+        self._last_draw_calls = 0
+        self._last_vertices = 0
+        self.stats_overlay = QLabel(self)
+        self.stats_overlay.setStyleSheet("background-color: rgba(0, 0, 0, 150); color: white; padding: 3px;")
+        self.stats_overlay.move(4, 4)
+        self.stats_overlay.hide()
+        self._overlay_timer = QTimer(self)
+        self._overlay_timer.setInterval(OVERLAY_REFRESH_MS)
+        self._overlay_timer.timeout.connect(self._refresh_stats_overlay)
 
         # Set focus policy to accept keyboard events if needed later
         # self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
 
-    def set_data(self, keypoints, limbSeq):
+    def set_data(self, keypoints, limbSeq, axis_signs=None):
         """ Safely sets keypoint and limb sequence data. """
+        self.axis_signs = axis_signs
         if keypoints is not None:
              # Basic validation of keypoints structure
             if not isinstance(keypoints, np.ndarray) or keypoints.ndim != 3 or keypoints.shape[2] != 3:
@@ -42,7 +85,11 @@ class OpenGLWidget(QOpenGLWidget):
         else:
              self.keypoints = None
 
-        if limbSeq is not None:
+        self.skeleton = limbSeq if isinstance(limbSeq, Skeleton) else None
+        if self.skeleton is not None:
+            # Already validated and compiled by the registry
+            self.limbSeq = self.skeleton.limb_list()
+        elif limbSeq is not None:
             # Basic validation of limb sequence
              if isinstance(limbSeq, list) and all(isinstance(l, list) and len(l) == 2 for l in limbSeq):
                  self.limbSeq = limbSeq
@@ -52,7 +99,8 @@ class OpenGLWidget(QOpenGLWidget):
         else:
             self.limbSeq = None
 
-        self.update() # Trigger repaint
+        self.renderer.set_data(self.keypoints, self.skeleton or self.limbSeq, self.axis_signs)
+        self.request_repaint()
 
     def set_frame_index(self, index):
         """ Safely sets the current frame index. """
@@ -65,10 +113,73 @@ class OpenGLWidget(QOpenGLWidget):
                 self.statusUpdateRequest.emit(f"Warning: Frame index {index} out of bounds ({self.keypoints.shape[0]} frames). Clamped to {self.frame_index}.", 3000)
         else:
             self.frame_index = index # Allow setting even if no keypoints, but drawing will fail safely
-        self.update() # Trigger repaint
+        self.request_repaint()
+
+    def request_repaint(self):
+        """ Schedules a repaint, coalescing requests and respecting max_fps. """
+        if self.max_fps <= 0:
+            self.update()
+            return
+        if self._repaint_timer.isActive():
+            return
+        wait_ms = (self._last_paint_start + 1.0 / self.max_fps - time.perf_counter()) * 1000
+        if wait_ms <= 0:
+            self.update()
+        else:
+            self._repaint_timer.start(int(wait_ms) + 1)
+
+    def set_max_fps(self, fps):
+        """ Caps the repaint rate; 0 means repaint as often as requested. """
+        self.max_fps = max(0, fps)
+
+    def paint_stats(self):
+        """ Timing of the recent paints (CPU milliseconds in paintGL) and what the last one submitted. """
+        times = list(self._paint_times)
+        starts = list(self._paint_starts)
+        span = starts[-1] - starts[0] if len(starts) > 1 else 0.0
+        return {
+            "paints": len(times),
+            "paint_ms": times[-1] if times else 0.0,
+            "avg_paint_ms": sum(times) / len(times) if times else 0.0,
+            "max_paint_ms": max(times) if times else 0.0,
+            "fps": (len(starts) - 1) / span if span > 0 else 0.0,
+            "draw_calls": self._last_draw_calls,
+            "vertices": self._last_vertices,
+        }
+
+    def set_stats_overlay(self, visible):
+        """ Shows the paint stats in the corner of the view, refreshed a few times per second. """
+        self.stats_overlay.setVisible(visible)
+        if visible:
+            self._refresh_stats_overlay()
+            self._overlay_timer.start()
+        else:
+            self._overlay_timer.stop()
+
+    def _refresh_stats_overlay(self):
+        stats = self.paint_stats()
+        self.stats_overlay.setText(
+            f"{stats['fps']:.0f} fps | paint {stats['paint_ms']:.2f} ms (avg {stats['avg_paint_ms']:.2f}, "
+            f"max {stats['max_paint_ms']:.2f}) | {stats['draw_calls']} draw calls, {stats['vertices']} vertices")
+        self.stats_overlay.adjustSize()
+
+    def set_onion_skin(self, before, after, ghosts=True, trajectories=True):
+        """ Shows the poses of up to before/after neighbouring frames around the current one. """
+        self.onion_before = max(0, before)
+        self.onion_after = max(0, after)
+        self.onion_ghosts = ghosts
+        self.onion_trajectories = trajectories
+        self.request_repaint()
 
     def initializeGL(self):
         """ Called once when the widget is initialized. """
+        self.setup_gl_state()
+
+        # GPU buffers belong to this context
+        self.context().aboutToBeDestroyed.connect(self._release_gl)
+
+    def setup_gl_state(self):
+        """ Sets the fixed GL state of the scene in the current context (also used for offscreen rendering). """
         glClearColor(1.0, 1.0, 1.0, 1.0) # White background
         glEnable(GL_DEPTH_TEST)
         glEnable(GL_POINT_SMOOTH) # Make points circular
@@ -102,6 +213,20 @@ class OpenGLWidget(QOpenGLWidget):
 
     def paintGL(self):
         """ Called whenever the widget needs to be painted. """
+        start = time.perf_counter()
+        self._last_paint_start = start
+        self.renderer.reset_counters()
+        self.draw_scene()
+        if self.sync_paint_timing:
+            glFinish()
+        self._paint_times.append((time.perf_counter() - start) * 1000)
+        self._paint_starts.append(start)
+        # The axes are three lines in one immediate-mode batch.
+        self._last_draw_calls = self.renderer.draw_calls + 1
+        self._last_vertices = self.renderer.vertices + 6
+
+    def draw_scene(self):
+        """ Clears the view and draws the axes and the pose. """
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
         # Reset ModelView matrix
@@ -147,52 +272,16 @@ class OpenGLWidget(QOpenGLWidget):
             self.statusUpdateRequest.emit(f"Error drawing pose: Frame index {self.frame_index} out of bounds.", 5000)
             return
 
-        current_frame_keypoints = self.keypoints[self.frame_index]
-        num_points = current_frame_keypoints.shape[0]
-
-        # --- Draw Limbs ---
-        if self.limbSeq is not None:
-            glLineWidth(2.5)
-            glColor3f(0.0, 0.0, 0.0) # Black lines
-            glBegin(GL_LINES)
-            for limb in self.limbSeq:
-                try:
-                    start_idx, end_idx = limb
-                    if 0 <= start_idx < num_points and 0 <= end_idx < num_points:
-                        start_point = current_frame_keypoints[start_idx]
-                        end_point = current_frame_keypoints[end_idx]
-                        # Ensure points are 3D
-                        if len(start_point) == 3 and len(end_point) == 3:
-                             glVertex3fv(start_point)
-                             glVertex3fv(end_point)
-                        else:
-                             warnings.warn(f"Limb {limb}: Invalid point dimensions detected.", UserWarning)
-                    else:
-                        warnings.warn(f"Limb {limb}: Indices out of bounds for {num_points} points.", UserWarning)
-                except IndexError:
-                     warnings.warn(f"Error accessing keypoints for limb {limb}.", UserWarning)
-                except Exception as e:
-                    warnings.warn(f"Unexpected error drawing limb {limb}: {e}", UserWarning)
-            glEnd()
-        else:
-            # self.statusUpdateRequest.emit("Cannot draw limbs: Limb sequence not loaded.", 3000)
-            pass # Don't draw limbs if sequence isn't available
-
-
-        # --- Draw Keypoints ---
-        glPointSize(6.0)
-        glColor3f(0.0, 0.5, 1.0) # Light blue points
-        glBegin(GL_POINTS)
-        try:
-            for i, point in enumerate(current_frame_keypoints):
-                 # Ensure point is 3D
-                if len(point) == 3:
-                    glVertex3fv(point)
-                else:
-                    warnings.warn(f"Keypoint {i}: Invalid point dimensions detected.", UserWarning)
-        except Exception as e:
-             warnings.warn(f"Unexpected error drawing points: {e}", UserWarning)
-        glEnd()
+        if self.onion_ghosts or self.onion_trajectories:
+            self.renderer.draw_onion(self.frame_index, self.onion_before, self.onion_after,
+                                     self.onion_ghosts, self.onion_trajectories)
+        self.renderer.draw(self.frame_index)
+
+    def _release_gl(self):
+        """ Frees the renderer's GPU buffers while the context still exists. """
+        self.makeCurrent()
+        self.renderer.release()
+        self.doneCurrent()
 
     def mousePressEvent(self, event: QMouseEvent):
         """ Stores the initial mouse position when a button is pressed. """
@@ -216,7 +305,7 @@ class OpenGLWidget(QOpenGLWidget):
             self.rotation_x = max(-90.0, min(90.0, self.rotation_x))
 
             self.last_pos = event.position().toPoint()
-            self.update() # Trigger repaint
+            self.request_repaint()
 
     def wheelEvent(self, event):
         """ Zooms the view using the mouse wheel. """
@@ -226,4 +315,4 @@ class OpenGLWidget(QOpenGLWidget):
         self.zoom_factor -= delta * zoom_sensitivity
         # Clamp zoom factor to reasonable limits
         self.zoom_factor = max(1.0, min(self.zoom_factor, 50.0))
-        self.update() # Trigger repaint
\ No newline at end of file
+        self.request_repaint()
\ No newline at end of file
@@ -0,0 +1,114 @@
+import threading
+
+from video_reader import VideoReader, fit_frame
+
+DEFAULT_PREFETCH_WINDOW = 32
+# Frames behind the target are decoded in forward blocks of this size, nearest block first, so going
+# backwards costs one seek per block instead of one per frame.
+BEHIND_BLOCK = 8
+
+
+def prefetch_order(index, direction, ahead, behind, frame_count):
+    """
+    Frame indices to decode around index, most useful first: the side the user is moving towards,
+    then the other side. Each side is a list of ascending blocks (decodable without seeking).
+    """
+    forward = [list(range(index + 1, min(index + 1 + ahead, frame_count)))]
+    backward = []
+    stop = index
+    floor = max(0, index - behind)
+    while stop > floor:
+        start = max(floor, stop - BEHIND_BLOCK)
+        backward.append(list(range(start, stop)))
+        stop = start
+    blocks = backward + forward if direction < 0 else forward + backward
+    return [i for block in blocks for i in block]
+
+
+class FramePrefetcher:
+    """
+    Decodes frames around the current position on a worker thread, with its own VideoReader, into a
+    shared FrameCache. set_target() is called on every navigation step; the worker drops whatever it
+    was doing and refills the window around the new target, following the direction of travel.
+    """
+
+    def __init__(self, video_path, cache, ahead=DEFAULT_PREFETCH_WINDOW, behind=DEFAULT_PREFETCH_WINDOW // 2,
+                 keyframe_index=None):
+        self.video_path = video_path
+        self.keyframe_index = keyframe_index
+        self.cache = cache
+        self.ahead = ahead
+        self.behind = behind
+        self.decoded = 0
+        self._condition = threading.Condition()
+        self._target = None
+        self._size = None
+        self._direction = 1
+        self._generation = 0
+        self._idle_generation = 0
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="frame-prefetch", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def set_target(self, index, size=None):
+        """ Re-centres the window on index; size is the (width, height) frames are cached at, or None. """
+        with self._condition:
+            if self._target is not None and index != self._target:
+                self._direction = 1 if index > self._target else -1
+            self._target, self._size = index, size
+            self._generation += 1
+            self._condition.notify()
+
+    def set_window(self, ahead, behind):
+        with self._condition:
+            self.ahead, self.behind = ahead, behind
+            self._generation += 1
+            self._condition.notify()
+
+    def stop(self, timeout=2.0):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def wait_idle(self, timeout=5.0):
+        """ Waits until the current window is filled (for tests and benchmarks). """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._stopped or self._idle_generation == self._generation,
+                                            timeout)
+
+    def _run(self):
+        try:
+            reader = VideoReader(self.video_path, keyframe_index=self.keyframe_index)
+        except ValueError:
+            return
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._stopped or (self._target is not None and
+                                                                       self._idle_generation != self._generation))
+                    if self._stopped:
+                        return
+                    generation, target, size = self._generation, self._target, self._size
+                    order = prefetch_order(target, self._direction, self.ahead, self.behind, reader.frame_count)
+                for index in order:
+                    if self._stopped or self._generation != generation:
+                        break
+                    key = (index, size)
+                    if self.cache.peek(key):
+                        continue
+                    frame = reader.read(index)
+                    if frame is None:
+                        continue
+                    self.cache.put(key, fit_frame(frame, *size) if size is not None else frame)
+                    self.decoded += 1
+                else:
+                    with self._condition:
+                        if self._generation == generation:
+                            self._idle_generation = generation
+                            self._condition.notify_all()
+        finally:
+            reader.release()
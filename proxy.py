@@ -0,0 +1,82 @@
+import json
+import os
+import cv2
+
+from keypoint_cache import source_fingerprint
+from video_reader import fit_frame
+
+# Proxies are Motion-JPEG AVIs: every frame is a keyframe, so any seek is a single cheap decode.
+PROXY_WIDTH = 640
+PROXY_FOURCC = 'MJPG'
+PROXY_QUALITY = 85
+PROXY_FORMAT_VERSION = 1
+PROGRESS_EVERY_FRAMES = 64
+
+
+def proxy_path(video_path, width=PROXY_WIDTH):
+    return f"{video_path}.proxy{width}.avi"
+
+
+def _meta_path(path):
+    return f"{path}.json"
+
+
+def find_proxy(video_path, width=PROXY_WIDTH):
+    """ Path of the proxy of video_path if it was built from the current file, else None. """
+    path = proxy_path(video_path, width)
+    try:
+        with open(_meta_path(path), 'r') as f:
+            meta = json.load(f)
+        if meta.get("version") != PROXY_FORMAT_VERSION or meta.get("key") != source_fingerprint(video_path):
+            return None
+    except (OSError, ValueError):
+        return None
+    return path if os.path.exists(path) else None
+
+
+def build_proxy(video_path, width=PROXY_WIDTH, progress=None):
+    """
+    Transcodes video_path into an all-intra proxy at most width pixels wide, with exactly the same
+    frames, and saves it next to the source. progress(done, total) may raise OperationCancelled.
+    Returns the proxy path.
+    """
+    source = cv2.VideoCapture(video_path)
+    if not source.isOpened():
+        raise ValueError("Could not open video file.")
+    path = proxy_path(video_path, width)
+    # VideoWriter picks the container from the extension, so the temporary name keeps '.avi'.
+    temp_path = f"{path}.tmp.avi"
+    writer = None
+    try:
+        total = int(source.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = source.get(cv2.CAP_PROP_FPS) or 25.0
+        done = 0
+        while True:
+            ok, frame = source.read()
+            if not ok:
+                break
+            frame = fit_frame(frame, width, frame.shape[0] * width / frame.shape[1])
+            if writer is None:
+                writer = cv2.VideoWriter(temp_path, cv2.VideoWriter_fourcc(*PROXY_FOURCC), fps,
+                                         (frame.shape[1], frame.shape[0]))
+                writer.set(cv2.VIDEOWRITER_PROP_QUALITY, PROXY_QUALITY)
+                if not writer.isOpened():
+                    raise ValueError("Could not create the proxy video.")
+            writer.write(frame)
+            done += 1
+            if progress is not None and done % PROGRESS_EVERY_FRAMES == 0:
+                progress(done, max(total, done))
+        if writer is None:
+            raise ValueError("The video has no readable frames.")
+        writer.release()
+        writer = None
+        os.replace(temp_path, path)
+        with open(_meta_path(path), 'w') as f:
+            json.dump({"version": PROXY_FORMAT_VERSION, "key": source_fingerprint(video_path), "frames": done}, f)
+        return path
+    finally:
+        source.release()
+        if writer is not None:
+            writer.release()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
@@ -0,0 +1,231 @@
+import ctypes
+import warnings
+import numpy as np
+from OpenGL.GL import *
+
+from skeletons import Skeleton, limb_indices
+from utils import orient_keypoints
+
+# Sequences up to this size are uploaded whole; longer ones are streamed as a window of
+# STREAM_WINDOW_FRAMES frames around the current frame.
+MAX_VERTEX_BUFFER_BYTES = 256 * 1024 * 1024
+STREAM_WINDOW_FRAMES = 4096
+# Frames oriented and uploaded per glBufferSubData call, so no full oriented copy is ever made.
+UPLOAD_CHUNK_FRAMES = 4096
+FLOAT_BYTES = 4
+# Onion skin: frames before the current one are tinted blue, frames after it orange, fading with distance.
+ONION_PAST_COLOR = (0.15, 0.35, 1.0)
+ONION_FUTURE_COLOR = (1.0, 0.45, 0.1)
+ONION_MAX_ALPHA = 0.6
+ONION_MIN_ALPHA = 0.08
+
+
+def upload_window(frame_index, frame_count, frame_bytes, max_bytes=MAX_VERTEX_BUFFER_BYTES,
+                  window_frames=STREAM_WINDOW_FRAMES):
+    """ (start, stop) frames to keep on the GPU so that frame_index is drawable. """
+    if frame_count * frame_bytes <= max_bytes or frame_count <= window_frames:
+        return 0, frame_count
+    start = max(0, min(frame_index - window_frames // 2, frame_count - window_frames))
+    return start, start + window_frames
+
+
+def onion_colors(frame_index, first, last, num_points):
+    """ Per-vertex RGBA (float32) for frames first..last: tinted by side and fading away from frame_index. """
+    distance = np.arange(first, last + 1) - frame_index
+    span = max(frame_index - first, last - frame_index, 1)
+    fade = (np.abs(distance) - 1).clip(0) / max(span - 1, 1)
+    colors = np.empty((len(distance), 4), dtype=np.float32)
+    colors[:, :3] = np.where((distance <= 0)[:, None], ONION_PAST_COLOR, ONION_FUTURE_COLOR)
+    colors[:, 3] = ONION_MAX_ALPHA - (ONION_MAX_ALPHA - ONION_MIN_ALPHA) * fade
+    return np.repeat(colors, num_points, axis=0)
+
+
+def ghost_indices(frame_index, first, last, indices, num_points):
+    """ Limb indices of every frame first..last except frame_index, relative to first's vertices. """
+    frames = np.arange(first, last + 1)
+    frames = frames[frames != frame_index] - first
+    return (frames[:, None] * num_points + indices.astype(np.int64)[None, :]).astype(np.uint32).ravel()
+
+
+def trajectory_indices(num_frames, num_points):
+    """ GL_LINES indices joining each joint to itself in the next frame, over num_frames consecutive frames. """
+    starts = np.arange(max(num_frames - 1, 0) * num_points, dtype=np.uint32)
+    return np.column_stack([starts, starts + num_points]).ravel()
+
+
+class SkeletonRenderer:
+    """
+    Retained-mode skeleton drawing. The oriented keypoints live in a vertex buffer and the limbs in an
+    index buffer, so drawing a frame is two draw calls whatever the joint count: the vertex pointer
+    is moved to the frame's offset, then the limbs are drawn with glDrawElements and the joints with
+    glDrawArrays. Without buffer objects it falls back to client-side arrays.
+    All GL methods must be called with the widget's context current.
+    """
+
+    def __init__(self):
+        self.keypoints = None
+        self.axis_signs = None
+        self.indices = np.empty(0, dtype=np.uint32)
+        self.num_points = 0
+        self.use_buffers = True
+        self.max_buffer_bytes = MAX_VERTEX_BUFFER_BYTES
+        self.window_frames = STREAM_WINDOW_FRAMES
+        self.uploads = 0
+        # Draw calls and vertices submitted since the last reset_counters() (once per paint).
+        self.draw_calls = 0
+        self.vertices = 0
+        self._vbo = None
+        self._ibo = None
+        self._window = (0, 0)
+        self._dirty = True
+
+    def set_data(self, keypoints, limb_seq, axis_signs=None):
+        """
+        Sets the sequence to draw; it is uploaded at the next draw. limb_seq is a Skeleton, whose
+        compiled indices are used as they are, or a list of [start, end] pairs.
+        """
+        self.keypoints = keypoints
+        self.axis_signs = axis_signs
+        self.num_points = keypoints.shape[1] if keypoints is not None else 0
+        if keypoints is None:
+            self.indices = np.empty(0, dtype=np.uint32)
+        elif isinstance(limb_seq, Skeleton) and limb_seq.fits(self.num_points):
+            self.indices = limb_seq.indices
+        else:
+            self.indices = limb_indices(limb_seq.limbs if isinstance(limb_seq, Skeleton) else limb_seq,
+                                        self.num_points)
+        self._dirty = True
+
+    def reset_counters(self):
+        self.draw_calls = self.vertices = 0
+
+    @property
+    def frame_bytes(self):
+        return self.num_points * 3 * FLOAT_BYTES
+
+    def frame_vertices(self, frame_index):
+        """ Oriented float32 joints of one frame, as drawn. """
+        return np.ascontiguousarray(orient_keypoints(self.keypoints[frame_index], self.axis_signs), dtype=np.float32)
+
+    def draw(self, frame_index, line_color=(0.0, 0.0, 0.0), point_color=(0.0, 0.5, 1.0)):
+        if self.keypoints is None or not self.num_points:
+            return
+        glEnableClientState(GL_VERTEX_ARRAY)
+        try:
+            index_pointer = self._bind_frame(frame_index)
+            if len(self.indices):
+                glLineWidth(2.5)
+                glColor3f(*line_color)
+                glDrawElements(GL_LINES, len(self.indices), GL_UNSIGNED_INT, index_pointer)
+                self._count(len(self.indices))
+            glPointSize(6.0)
+            glColor3f(*point_color)
+            glDrawArrays(GL_POINTS, 0, self.num_points)
+            self._count(self.num_points)
+        finally:
+            self._unbind()
+            glDisableClientState(GL_VERTEX_ARRAY)
+
+    def draw_onion(self, frame_index, before, after, ghosts=True, trajectories=True):
+        """
+        Draws faded ghost skeletons and joint trajectories for up to before/after frames around
+        frame_index: one glDrawElements call each over the already uploaded vertices, whatever the
+        window length. Ghosts do not write depth, so the current skeleton drawn afterwards stays on top.
+        """
+        if self.keypoints is None or not self.num_points or (before <= 0 and after <= 0):
+            return
+        self._prepare_buffers(frame_index)
+        start, stop = self._window if self.use_buffers else (0, self.keypoints.shape[0])
+        first, last = max(start, frame_index - before), min(stop - 1, frame_index + after)
+        if first == last:
+            return
+        colors = onion_colors(frame_index, first, last, self.num_points)
+        batches = []
+        if ghosts and len(self.indices):
+            batches.append((1.5, ghost_indices(frame_index, first, last, self.indices, self.num_points)))
+        if trajectories:
+            batches.append((1.0, trajectory_indices(last - first + 1, self.num_points)))
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glDepthMask(GL_FALSE)
+        try:
+            # Colours and indices come from client memory, so no buffer may be bound when they are set.
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+            glColorPointer(4, GL_FLOAT, 0, colors)
+            if self.use_buffers:
+                glBindBuffer(GL_ARRAY_BUFFER, self._vbo)
+                glVertexPointer(3, GL_FLOAT, 0, ctypes.c_void_p((first - start) * self.frame_bytes))
+            else:
+                vertices = np.ascontiguousarray(
+                    orient_keypoints(self.keypoints[first:last + 1], self.axis_signs), dtype=np.float32)
+                glVertexPointer(3, GL_FLOAT, 0, vertices)
+            for width, indices in batches:
+                glLineWidth(width)
+                glDrawElements(GL_LINES, len(indices), GL_UNSIGNED_INT, indices)
+                self._count(len(indices))
+        finally:
+            glDepthMask(GL_TRUE)
+            self._unbind()
+            glDisableClientState(GL_COLOR_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
+
+    def _count(self, vertices):
+        self.draw_calls += 1
+        self.vertices += vertices
+
+    def _prepare_buffers(self, frame_index):
+        """ Makes sure frame_index is in the vertex buffer, switching to client arrays if buffers fail. """
+        if self.use_buffers:
+            try:
+                self._ensure_uploaded(frame_index)
+            except GLError:
+                warnings.warn("Vertex buffers unavailable; drawing from client memory.", UserWarning)
+                self.release()
+                self.use_buffers = False
+
+    def _bind_frame(self, frame_index):
+        """ Points the vertex array at frame_index; returns the pointer to pass to glDrawElements. """
+        self._prepare_buffers(frame_index)
+        if not self.use_buffers:
+            glVertexPointer(3, GL_FLOAT, 0, self.frame_vertices(frame_index))
+            return self.indices
+        glBindBuffer(GL_ARRAY_BUFFER, self._vbo)
+        glVertexPointer(3, GL_FLOAT, 0, ctypes.c_void_p((frame_index - self._window[0]) * self.frame_bytes))
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self._ibo)
+        return ctypes.c_void_p(0)
+
+    def _unbind(self):
+        if self.use_buffers:
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def _ensure_uploaded(self, frame_index):
+        start, stop = self._window
+        if not self._dirty and start <= frame_index < stop:
+            return
+        if self._vbo is None:
+            self._vbo, self._ibo = glGenBuffers(2)
+        if self._dirty:
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self._ibo)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.indices.nbytes, self.indices, GL_STATIC_DRAW)
+        start, stop = upload_window(frame_index, self.keypoints.shape[0], self.frame_bytes,
+                                    self.max_buffer_bytes, self.window_frames)
+        glBindBuffer(GL_ARRAY_BUFFER, self._vbo)
+        glBufferData(GL_ARRAY_BUFFER, (stop - start) * self.frame_bytes, None, GL_STATIC_DRAW)
+        for chunk in range(start, stop, UPLOAD_CHUNK_FRAMES):
+            block = np.ascontiguousarray(
+                orient_keypoints(self.keypoints[chunk:min(chunk + UPLOAD_CHUNK_FRAMES, stop)], self.axis_signs),
+                dtype=np.float32)
+            glBufferSubData(GL_ARRAY_BUFFER, (chunk - start) * self.frame_bytes, block.nbytes, block)
+        self._window = (start, stop)
+        self._dirty = False
+        self.uploads += 1
+
+    def release(self):
+        """ Deletes the GL buffers; the data is uploaded again at the next draw. """
+        if self._vbo is not None:
+            glDeleteBuffers(2, [self._vbo, self._ibo])
+        self._vbo = self._ibo = None
+        self._window = (0, 0)
+        self._dirty = True
@@ -0,0 +1,172 @@
+import json
+import warnings
+import numpy as np
+
+# Registry name of the topology used when nothing else is chosen: the tool's original 17-joint layout,
+# documented as HALPE-17 (pelvis, legs, spine, head, arms; the Human3.6M joint order).
+DEFAULT_SKELETON = "halpe17"
+
+
+def limb_indices(limb_seq, num_points):
+    """
+    Flattened uint32 index array of the limbs of limb_seq that are valid for num_points joints.
+    Invalid limbs are reported once here instead of on every paint.
+    """
+    pairs = np.asarray(limb_seq if limb_seq is not None else [], dtype=np.int64).reshape(-1, 2)
+    valid = ((pairs >= 0) & (pairs < num_points)).all(axis=1)
+    for limb in pairs[~valid]:
+        warnings.warn(f"Limb {limb.tolist()}: Indices out of bounds for {num_points} points.", UserWarning)
+    return np.ascontiguousarray(pairs[valid], dtype=np.uint32).ravel()
+
+
+class Skeleton:
+    """
+    A named joint topology. limbs is an (n, 2) uint32 array of joint index pairs, validated against
+    num_joints when the skeleton is created, so code that draws or exports it never rechecks limbs.
+    """
+
+    def __init__(self, name, num_joints, limbs, joint_names=None):
+        limbs = np.asarray(limbs, dtype=np.int64).reshape(-1, 2)
+        if num_joints <= 0:
+            raise ValueError(f"Skeleton '{name}': joint count must be positive.")
+        bad = limbs[((limbs < 0) | (limbs >= num_joints)).any(axis=1)]
+        if len(bad):
+            raise ValueError(f"Skeleton '{name}': limb {bad[0].tolist()} is out of range for {num_joints} joints.")
+        if joint_names is not None and len(joint_names) != num_joints:
+            raise ValueError(f"Skeleton '{name}': {len(joint_names)} joint names for {num_joints} joints.")
+        self.name = name
+        self.num_joints = num_joints
+        self.limbs = np.ascontiguousarray(limbs, dtype=np.uint32)
+        self.limbs.setflags(write=False)
+        self.joint_names = list(joint_names) if joint_names is not None else None
+
+    @property
+    def indices(self):
+        """ Flattened limb index array, as used for GL_LINES index buffers. """
+        return self.limbs.ravel()
+
+    def limb_list(self):
+        return self.limbs.tolist()
+
+    def fits(self, num_points):
+        """ True if keypoints with num_points joints can be drawn with this skeleton. """
+        return num_points >= self.num_joints
+
+    def to_json(self):
+        data = {"name": self.name, "num_joints": self.num_joints, "limbs": self.limb_list()}
+        if self.joint_names is not None:
+            data["joint_names"] = self.joint_names
+        return data
+
+
+def _chain(*joints):
+    return [[a, b] for a, b in zip(joints, joints[1:])]
+
+
+def _loop(*joints):
+    return _chain(*joints, joints[0])
+
+
+def _tree(parents):
+    return [[parent, child] for child, parent in enumerate(parents) if parent >= 0]
+
+
+def _hand(wrist, base):
+    """ Limbs of a 21-point hand starting at base, attached to the body's wrist joint. """
+    limbs = [[wrist, base]]
+    for finger in range(5):
+        limbs += _chain(base, *range(base + 1 + 4 * finger, base + 5 + 4 * finger))
+    return limbs
+
+
+def _face68(base):
+    """ Contours of the 68-point iBUG face layout starting at base. """
+    f = lambda *points: [base + p for p in points]
+    return (_chain(*f(*range(0, 17))) + _chain(*f(*range(17, 22))) + _chain(*f(*range(22, 27)))
+            + _chain(*f(*range(27, 31))) + _chain(*f(*range(31, 36))) + _loop(*f(*range(36, 42)))
+            + _loop(*f(*range(42, 48))) + _loop(*f(*range(48, 60))) + _loop(*f(*range(60, 68))))
+
+
+COCO17_JOINTS = ["nose", "left_eye", "right_eye", "left_ear", "right_ear", "left_shoulder", "right_shoulder",
+                 "left_elbow", "right_elbow", "left_wrist", "right_wrist", "left_hip", "right_hip", "left_knee",
+                 "right_knee", "left_ankle", "right_ankle"]
+COCO17_LIMBS = [[15, 13], [13, 11], [16, 14], [14, 12], [11, 12], [5, 11], [6, 12], [5, 6], [5, 7], [6, 8],
+                [7, 9], [8, 10], [1, 2], [0, 1], [0, 2], [1, 3], [2, 4], [3, 5], [4, 6]]
+
+H36M17_JOINTS = ["pelvis", "right_hip", "right_knee", "right_ankle", "left_hip", "left_knee", "left_ankle", "spine",
+                 "thorax", "neck", "head", "left_shoulder", "left_elbow", "left_wrist", "right_shoulder",
+                 "right_elbow", "right_wrist"]
+H36M17_LIMBS = [[0, 1], [1, 2], [2, 3], [0, 4], [4, 5], [5, 6], [0, 7], [7, 8], [8, 9], [8, 11], [8, 14],
+                [9, 10], [11, 12], [12, 13], [14, 15], [15, 16]]
+# Parent of each of the 32 joints of the full Human3.6M skeleton.
+H36M32_PARENTS = [-1, 0, 1, 2, 3, 4, 0, 6, 7, 8, 9, 0, 11, 12, 13, 14, 12, 16, 17, 18, 19, 20, 19, 22, 12, 24,
+                  25, 26, 27, 28, 27, 30]
+
+# Halpe-26 is COCO-17 followed by head, neck, mid-hip and three points on each foot.
+HALPE26_JOINTS = COCO17_JOINTS + ["head", "neck", "hip", "left_big_toe", "right_big_toe", "left_small_toe",
+                                  "right_small_toe", "left_heel", "right_heel"]
+HALPE26_LIMBS = [[0, 1], [0, 2], [1, 3], [2, 4], [5, 18], [6, 18], [5, 7], [7, 9], [6, 8], [8, 10], [17, 18],
+                 [18, 19], [19, 11], [19, 12], [11, 13], [12, 14], [13, 15], [14, 16], [20, 24], [21, 25],
+                 [23, 25], [22, 24], [15, 24], [16, 25]]
+# Halpe-136 adds a 68-point face (26-93) and 21-point left (94-114) and right (115-135) hands.
+HALPE136_LIMBS = HALPE26_LIMBS + _face68(26) + _hand(9, 94) + _hand(10, 115)
+
+SMPL24_JOINTS = ["pelvis", "left_hip", "right_hip", "spine1", "left_knee", "right_knee", "spine2", "left_ankle",
+                 "right_ankle", "spine3", "left_foot", "right_foot", "neck", "left_collar", "right_collar", "head",
+                 "left_shoulder", "right_shoulder", "left_elbow", "right_elbow", "left_wrist", "right_wrist",
+                 "left_hand", "right_hand"]
+SMPL24_PARENTS = [-1, 0, 0, 0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 9, 9, 12, 13, 14, 16, 17, 18, 19, 20, 21]
+
+SKELETONS = {}
+
+
+def register_skeleton(skeleton):
+    """ Adds skeleton to the registry (replacing one with the same name) and returns it. """
+    SKELETONS[skeleton.name] = skeleton
+    return skeleton
+
+
+for _skeleton in (
+        Skeleton("halpe17", 17, H36M17_LIMBS, H36M17_JOINTS),
+        Skeleton("h36m17", 17, H36M17_LIMBS, H36M17_JOINTS),
+        Skeleton("h36m32", 32, _tree(H36M32_PARENTS)),
+        Skeleton("coco17", 17, COCO17_LIMBS, COCO17_JOINTS),
+        Skeleton("halpe26", 26, HALPE26_LIMBS, HALPE26_JOINTS),
+        Skeleton("halpe136", 136, HALPE136_LIMBS),
+        Skeleton("smpl24", 24, _tree(SMPL24_PARENTS), SMPL24_JOINTS)):
+    register_skeleton(_skeleton)
+
+
+def skeleton_from_json(data):
+    """ Skeleton from {"name", "num_joints", "limbs", optional "joint_names"}; raises ValueError if invalid. """
+    try:
+        name = str(data["name"])
+        limbs = data["limbs"]
+        num_joints = int(data.get("num_joints") or (np.max(limbs) + 1 if len(limbs) else 0))
+        return Skeleton(name, num_joints, limbs, data.get("joint_names"))
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid skeleton definition: {e}")
+
+
+def load_skeleton(path):
+    """ Reads a JSON skeleton file, registers it and returns it. Raises ValueError if it is invalid. """
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Could not read skeleton file: {e}")
+    return register_skeleton(skeleton_from_json(data))
+
+
+def skeleton_for_joint_count(num_points, preferred=DEFAULT_SKELETON):
+    """
+    Skeleton to draw keypoints with num_points joints: preferred if it has exactly that many joints,
+    else a registered skeleton that does, else preferred if its joints are a prefix, else None.
+    """
+    skeleton = SKELETONS.get(preferred)
+    if skeleton is not None and skeleton.num_joints == num_points:
+        return skeleton
+    exact = next((s for s in SKELETONS.values() if s.num_joints == num_points), None)
+    if exact is not None:
+        return exact
+    return skeleton if skeleton is not None and skeleton.fits(num_points) else None
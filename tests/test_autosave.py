@@ -0,0 +1,93 @@
+# tests/test_autosave.py
+import unittest
+import os
+import sys
+import tempfile
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from autosave import LabelJournal, journal_path
+from label_store import LabelStore
+
+
+class TestLabelJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.temp_dir.name, "labels.csv")
+        self.journal = LabelJournal(journal_path(self.csv_path))
+        self.store = LabelStore(10, mode="runs")
+        self.store.add_label("action", numeric=False)
+        self.store.add_label("count", numeric=True)
+        self.store.start_tracking()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _fresh_store(self):
+        store = LabelStore(10, mode="dense")
+        store.add_label("action", numeric=False)
+        store.add_label("count", numeric=True)
+        return store
+
+    def test_append_and_replay_restores_edits(self):
+        self.store.set_value(2, "action", "climb")
+        self.store.fill_range({"count": 3.0}, 4, 8)
+        self.assertEqual(self.journal.append(self.store.drain_changes()), 2)
+        self.assertEqual(self.store.drain_changes(), [], "Draining empties the change log.")
+
+        restored = self._fresh_store()
+        self.assertEqual(self.journal.replay(restored), 2)
+        for name in ("action", "count"):
+            self.assertEqual(list(restored.column_values(name, 0, 10)), list(self.store.column_values(name, 0, 10)))
+
+    def test_appends_only_new_edits(self):
+        self.store.set_value(0, "action", "a")
+        self.journal.append(self.store.drain_changes())
+        size = self.journal.size()
+        self.store.set_value(1, "action", "b")
+        self.journal.append(self.store.drain_changes())
+        with open(self.journal.path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+        self.assertGreater(self.journal.size(), size)
+
+    def test_unchanged_fill_is_not_recorded(self):
+        self.store.fill_range({"count": 0.0}, 0, 10)
+        self.assertEqual(self.store.drain_changes(), [])
+
+    def test_replay_drop_and_unknown_labels(self):
+        self.store.set_value(1, "action", "a")
+        self.store.remove_label("action")
+        self.store.add_label("action", numeric=False)
+        self.store.set_value(3, "action", "b")
+        self.journal.append(self.store.drain_changes())
+        with open(self.journal.path, 'a') as f:
+            f.write('{"f": 0, "t": 1, "l": "other", "v": "x"}\n{"f": 0, "t"')  # truncated last record
+
+        restored = self._fresh_store()
+        self.assertEqual(self.journal.replay(restored, label_names=["action", "count"]), 3)
+        self.assertEqual(restored.value(1, "action"), "", "Dropped label is reset.")
+        self.assertEqual(restored.value(3, "action"), "b")
+        self.assertFalse(restored.has_label("other"))
+
+    def test_truncate_before_keeps_later_records(self):
+        self.store.set_value(0, "action", "a")
+        self.journal.append(self.store.drain_changes())
+        offset = self.journal.size()
+        self.store.set_value(5, "action", "late")
+        self.journal.append(self.store.drain_changes())
+
+        self.journal.truncate_before(offset)
+        restored = self._fresh_store()
+        self.assertEqual(self.journal.replay(restored), 1)
+        self.assertEqual(restored.value(0, "action"), "")
+        self.assertEqual(restored.value(5, "action"), "late")
+
+        self.journal.truncate_before(self.journal.size())
+        self.assertFalse(self.journal.exists(), "Fully compacted journal is removed.")
+
+
+if __name__ == '__main__':
+    unittest.main()
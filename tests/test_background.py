@@ -0,0 +1,74 @@
+# tests/test_background.py
+import unittest
+import os
+import sys
+import threading
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from PyQt6.QtWidgets import QApplication
+from background import BackgroundTask
+
+app = QApplication.instance()
+if app is None:
+    app = QApplication(sys.argv)
+
+
+class TestBackgroundTask(unittest.TestCase):
+
+    def run_task(self, task):
+        """Start the task, wait for the worker and deliver its queued signals; returns the recorded events."""
+        events = []
+        task.progress.connect(lambda done, total, message: events.append(("progress", done, total)))
+        task.succeeded.connect(lambda result: events.append(("succeeded", result)))
+        task.failed.connect(lambda message: events.append(("failed", message)))
+        task.cancelled.connect(lambda: events.append(("cancelled",)))
+        task.start()
+        self.assertTrue(task.wait(5000), "Worker thread did not finish.")
+        QApplication.processEvents()
+        return events
+
+    def test_result_and_progress_are_delivered(self):
+        def work(context, n):
+            for i in range(n):
+                context.report(i + 1, n)
+            return n * 2
+
+        events = self.run_task(BackgroundTask("Counting", work, 3))
+        self.assertEqual(events[:3], [("progress", 1, 3), ("progress", 2, 3), ("progress", 3, 3)])
+        self.assertEqual(events[-1], ("succeeded", 6))
+
+    def test_failure_is_reported_as_message(self):
+        def work(context):
+            raise ValueError("bad file")
+
+        events = self.run_task(BackgroundTask("Failing", work))
+        self.assertEqual(events, [("failed", "bad file")])
+
+    def test_cancel_stops_at_next_progress_report(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def work(context):
+            started.set()
+            release.wait(5)
+            context.report(1, 2)
+            return "should not be delivered"
+
+        task = BackgroundTask("Cancellable", work)
+        events = []
+        task.succeeded.connect(lambda result: events.append("succeeded"))
+        task.cancelled.connect(lambda: events.append("cancelled"))
+        task.start()
+        self.assertTrue(started.wait(5))
+        task.cancel()
+        release.set()
+        self.assertTrue(task.wait(5000))
+        QApplication.processEvents()
+        self.assertEqual(events, ["cancelled"])
+
+
+if __name__ == '__main__':
+    unittest.main()
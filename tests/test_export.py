@@ -0,0 +1,112 @@
+# tests/test_export.py
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import export
+from export import (build_export_frame, build_label_frame, export_format, write_export, write_export_csv,
+                    write_label_csv)
+from label_store import LabelStore
+from skeletons import Skeleton
+from utils import NPY_AXIS_SIGNS
+
+
+class TestExportFormats(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.num_frames = 6
+        self.keypoints = np.random.default_rng(0).standard_normal((self.num_frames, 4, 3)).astype(np.float32)
+        self.store = LabelStore(self.num_frames, mode="runs")
+        self.store.add_label("action", numeric=False)
+        self.store.add_label("count", numeric=True)
+        self.store.fill_range({"action": "walk"}, 0, 3)
+        self.store.fill_range({"action": "run"}, 4, 6)
+        self.store.fill_range({"count": 2.5}, 1, 5)
+        self.label_names = ["action", "count", "missing"]
+        self.label_is_numeric = {"action": False, "count": True, "missing": False}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, extension):
+        path = os.path.join(self.temp_dir.name, f"out{extension}")
+        write_export(path, export_format(path), self.keypoints, NPY_AXIS_SIGNS, self.store, self.label_names,
+                     self.label_is_numeric, "c1", "r1")
+        return path
+
+    def test_export_format_by_extension(self):
+        self.assertEqual(export_format("a/b.CSV"), "csv")
+        self.assertEqual(export_format("b.npz"), "npz")
+        with self.assertRaises(ValueError):
+            export_format("b.xlsx")
+
+    def test_streamed_csv_matches_whole_table(self):
+        whole_path = os.path.join(self.temp_dir.name, "whole.csv")
+        build_export_frame(self.keypoints, NPY_AXIS_SIGNS, self.store, self.label_names, self.label_is_numeric,
+                           "c1", "r1").to_csv(whole_path, index=False)
+        streamed_path = os.path.join(self.temp_dir.name, "streamed.csv")
+        reported = []
+        write_export_csv(streamed_path, self.keypoints, NPY_AXIS_SIGNS, self.store, self.label_names,
+                         self.label_is_numeric, "c1", "r1", chunk_frames=4,
+                         progress=lambda done, total: reported.append((done, total)))
+        with open(whole_path, 'rb') as whole, open(streamed_path, 'rb') as streamed:
+            self.assertEqual(streamed.read(), whole.read())
+        self.assertEqual(reported, [(4, 6), (6, 6)])
+
+    def test_streamed_label_csv_matches_whole_table(self):
+        whole_path = os.path.join(self.temp_dir.name, "whole.csv")
+        build_label_frame(self.store, self.label_names, self.label_is_numeric, "c1", "r1",
+                          self.num_frames).to_csv(whole_path, index=False)
+        streamed_path = os.path.join(self.temp_dir.name, "streamed.csv")
+        write_label_csv(streamed_path, self.store, self.label_names, self.label_is_numeric, "c1", "r1",
+                        self.num_frames, chunk_frames=1)
+        with open(whole_path, 'rb') as whole, open(streamed_path, 'rb') as streamed:
+            self.assertEqual(streamed.read(), whole.read())
+
+    def test_npz_holds_tensor_and_label_arrays(self):
+        with np.load(self._write(".npz")) as data:
+            np.testing.assert_array_equal(data["keypoints"], self.keypoints * np.array(NPY_AXIS_SIGNS, np.float32))
+            self.assertEqual(data["keypoints"].dtype, np.float32)
+            self.assertEqual(list(data["label_names"]), self.label_names)
+            self.assertEqual(str(data["climber_id"]), "c1")
+            actions = data["categories/action"][data["labels/action"]]
+            self.assertEqual(list(actions), ["walk", "walk", "walk", "", "run", "run"])
+            np.testing.assert_array_equal(data["labels/count"], [0.0, 2.5, 2.5, 2.5, 2.5, 0.0])
+            self.assertEqual(list(data["categories/missing"][data["labels/missing"]]), [""] * self.num_frames)
+
+    def test_npz_stores_skeleton_limbs(self):
+        path = os.path.join(self.temp_dir.name, "out.npz")
+        skeleton = Skeleton("chain4", 4, [[0, 1], [1, 2], [2, 3]])
+        write_export(path, "npz", self.keypoints, NPY_AXIS_SIGNS, self.store, self.label_names,
+                     self.label_is_numeric, "c1", "r1", skeleton=skeleton)
+        with np.load(path) as data:
+            self.assertEqual(str(data["skeleton"]), "chain4")
+            self.assertEqual(data["limbs"].dtype, np.uint32)
+            np.testing.assert_array_equal(data["limbs"], skeleton.limbs)
+        with np.load(self._write(".npz")) as data:
+            self.assertNotIn("limbs", data.files)
+
+    @unittest.skipIf(export.pyarrow is None, "pyarrow is not installed")
+    def test_columnar_formats_match_csv_values(self):
+        csv_frame = build_export_frame(self.keypoints, NPY_AXIS_SIGNS, self.store, self.label_names,
+                                       self.label_is_numeric, "c1", "r1")
+        for extension, reader in ((".parquet", pd.read_parquet), (".feather", pd.read_feather)):
+            loaded = reader(self._write(extension))
+            self.assertEqual(list(loaded.columns), list(csv_frame.columns))
+            self.assertIsInstance(loaded["action"].dtype, pd.CategoricalDtype)
+            self.assertEqual(loaded["kp0_x"].dtype, np.float32)
+            self.assertEqual(loaded["action"].astype(str).tolist(), csv_frame["action"].tolist())
+            np.testing.assert_array_equal(loaded["count"], csv_frame["count"])
+            np.testing.assert_array_almost_equal(loaded["kp3_z"], csv_frame["kp3_z"])
+
+
+if __name__ == '__main__':
+    unittest.main()
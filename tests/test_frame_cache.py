@@ -0,0 +1,63 @@
+# tests/test_frame_cache.py
+import unittest
+import os
+import sys
+import numpy as np
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from frame_cache import FrameCache
+from video_reader import fit_frame
+
+
+def frame(value, nbytes=1000):
+    return np.full(nbytes, value, dtype=np.uint8)
+
+
+class TestFrameCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = FrameCache(max_bytes=10_000)
+        self.assertIsNone(cache.get(1))
+        cache.put(1, frame(1))
+        self.assertEqual(cache.get(1)[0], 1)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["frames"], stats["bytes"]), (1, 1, 1, 1000))
+
+    def test_evicts_least_recently_used(self):
+        cache = FrameCache(max_bytes=3000)
+        for i in range(3):
+            cache.put(i, frame(i))
+        cache.get(0)  # 1 is now the oldest
+        cache.put(3, frame(3))
+        self.assertFalse(cache.peek(1))
+        self.assertTrue(all(cache.peek(key) for key in (0, 2, 3)))
+        self.assertEqual(cache.stats()["bytes"], 3000)
+
+    def test_budget_changes_and_oversized_frames(self):
+        cache = FrameCache(max_bytes=5000)
+        for i in range(5):
+            cache.put(i, frame(i))
+        cache.set_max_bytes(2000)
+        self.assertEqual(len(cache), 2)
+        cache.put(9, frame(9, nbytes=4000))
+        self.assertFalse(cache.peek(9), "Frames over the whole budget are not cached.")
+        cache.set_max_bytes(0)
+        self.assertEqual(len(cache), 0)
+
+    def test_replacing_a_key_keeps_byte_count(self):
+        cache = FrameCache(max_bytes=5000)
+        cache.put(1, frame(1))
+        cache.put(1, frame(2, nbytes=500))
+        self.assertEqual(cache.stats()["bytes"], 500)
+
+    def test_fit_frame(self):
+        image = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        self.assertEqual(fit_frame(image, 640, 640).shape, (360, 640, 3))
+        self.assertIs(fit_frame(image, 4000, 4000), image, "Never upscales.")
+
+
+if __name__ == '__main__':
+    unittest.main()
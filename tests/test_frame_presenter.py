@@ -0,0 +1,54 @@
+# tests/test_frame_presenter.py
+import unittest
+import os
+import sys
+import numpy as np
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from PyQt6.QtGui import QColor
+from frame_presenter import FramePresenter
+from video_reader import fit_frame
+
+
+def bgr_frame(width, height, bgr=(255, 0, 0)):
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:] = bgr
+    return frame
+
+
+class TestFramePresenter(unittest.TestCase):
+
+    def test_scales_to_fit_keeping_aspect(self):
+        presenter = FramePresenter()
+        image = presenter.to_image(bgr_frame(1920, 1080), 640, 480)
+        self.assertEqual((image.width(), image.height()), (640, 360))
+        image = presenter.to_image(bgr_frame(160, 90), 640, 480, fast=True)
+        self.assertEqual((image.width(), image.height()), (640, 360))
+
+    def test_keeps_bgr_channel_order(self):
+        image = FramePresenter().to_image(bgr_frame(64, 48, bgr=(255, 0, 0)), 32, 24)
+        self.assertEqual(QColor(image.pixel(5, 5)).getRgb()[:3], (0, 0, 255))
+
+    def test_reuses_buffer_for_same_size(self):
+        presenter = FramePresenter()
+        for value in range(3):
+            image = presenter.to_image(bgr_frame(1280, 720, bgr=(value, value, value)), 320, 240)
+            self.assertEqual(QColor(image.pixel(0, 0)).red(), value)
+        self.assertEqual(presenter.allocations, 1)
+
+    def test_display_sized_frame_is_wrapped_without_resizing(self):
+        presenter = FramePresenter()
+        frame = fit_frame(bgr_frame(1920, 1080), 500, 400)
+        image = presenter.to_image(frame, 500, 400)
+        self.assertEqual((image.width(), image.height()), (frame.shape[1], frame.shape[0]))
+        self.assertEqual(presenter.allocations, 0)
+
+    def test_empty_area(self):
+        self.assertIsNone(FramePresenter().to_image(bgr_frame(64, 48), 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
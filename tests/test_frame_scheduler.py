@@ -0,0 +1,58 @@
+# tests/test_frame_scheduler.py
+import unittest
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from PyQt6.QtWidgets import QApplication
+from frame_scheduler import FrameRequestScheduler
+
+app = QApplication.instance()
+if app is None:
+    app = QApplication(sys.argv)
+
+
+class TestFrameRequestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = FrameRequestScheduler()
+        self.rendered = []
+        self.scheduler.render.connect(lambda index, preview: self.rendered.append((index, preview)))
+
+    def test_burst_renders_only_latest(self):
+        for index in range(10):
+            self.scheduler.request(index, preview=True)
+        self.assertEqual(self.rendered, [])
+        QApplication.processEvents()
+        self.assertEqual(self.rendered, [(9, True)])
+        self.assertEqual((self.scheduler.requested, self.scheduler.rendered, self.scheduler.dropped), (10, 1, 9))
+
+    def test_full_quality_request_replaces_preview(self):
+        self.scheduler.request(4, preview=True)
+        self.scheduler.request(4, preview=False)
+        QApplication.processEvents()
+        self.assertEqual(self.rendered, [(4, False)])
+
+    def test_flush_and_cancel(self):
+        self.scheduler.request(3)
+        self.scheduler.flush()
+        self.assertEqual(self.rendered, [(3, False)])
+        self.scheduler.request(5)
+        self.scheduler.cancel()
+        QApplication.processEvents()
+        self.assertEqual(self.rendered, [(3, False)])
+        self.assertFalse(self.scheduler.has_pending())
+
+    def test_requests_after_render_are_scheduled_again(self):
+        self.scheduler.request(1)
+        QApplication.processEvents()
+        self.scheduler.request(2)
+        QApplication.processEvents()
+        self.assertEqual(self.rendered, [(1, False), (2, False)])
+
+
+if __name__ == '__main__':
+    unittest.main()
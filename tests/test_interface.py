@@ -14,6 +14,8 @@ if project_root not in sys.path:
 from PyQt6.QtWidgets import QApplication, QLineEdit, QCheckBox
 from interface import Interface, \
     LabelUIElements  # Assuming LabelUIElements is accessible or part of Interface
+from label_store import LabelStore
+from video_reader import VideoReader
 
 # Ensure a QApplication instance exists for Qt-dependent parts
 app = QApplication.instance()
@@ -73,6 +75,12 @@ class TestInterfaceDataHandling(unittest.TestCase):
         # Explicitly delete interface to help with Qt resource cleanup if any test fails mid-way
         del self.interface
 
+    def _wait_for_save(self):
+        """Waits for the background save and delivers its completion signal."""
+        if self.interface._save_task is not None:
+            self.interface._save_task.wait()
+        QApplication.processEvents()
+
     def test_initialize_label_data_no_existing_csv(self):
         """Test _load_or_initialize_label_data when no CSV file exists."""
         # Ensure csv_file path is set as it would be in the app
@@ -89,6 +97,105 @@ class TestInterfaceDataHandling(unittest.TestCase):
             self.assertEqual(frame_data["object_visible"], "", "Default for non-numeric should be empty string.")
             self.assertEqual(frame_data["count"], 0.0, "Default for numeric should be 0.0.")
 
+    def test_load_existing_label_csv(self):
+        """Test _load_or_initialize_label_data imports an existing *_newlabels.csv in bulk."""
+        self.interface.csv_file = None
+        csv_path = os.path.splitext(self.interface.keypoints_path)[0] + "_newlabels.csv"
+        pd.DataFrame({
+            "climber_id": ["c"] * 5,
+            "frame": ["0", "1", "1", "3", "4"],
+            "action": ["walk", "run", "ignored duplicate", " ", "jump"],
+            "count": ["2.5", "", "7", "not a number", "4"],
+        }).to_csv(csv_path, index=False)
+
+        self.interface._load_or_initialize_label_data()
+
+        self.assertEqual(self.interface.csv_file, csv_path)
+        self.assertEqual(len(self.interface.label_values), self.num_frames)
+        self.assertEqual(self.interface.label_values[0]["action"], "walk")
+        self.assertEqual(self.interface.label_values[1]["action"], "run", "First row of a frame should win.")
+        self.assertEqual(self.interface.label_values[2]["action"], "", "Missing frames get defaults.")
+        self.assertEqual(self.interface.label_values[3]["action"], "", "Blank cells get defaults.")
+        self.assertEqual(self.interface.label_values[4]["action"], "jump")
+        self.assertEqual(self.interface.label_values[0]["count"], 2.5)
+        self.assertEqual(self.interface.label_values[1]["count"], 0.0)
+        self.assertEqual(self.interface.label_values[3]["count"], 0.0, "Unparseable numbers become 0.0.")
+        self.assertEqual(self.interface.label_values[4]["count"], 4.0)
+        self.assertEqual(self.interface.label_values[2]["object_visible"], "",
+                         "Labels missing from the CSV get defaults.")
+
+    def test_autosave_journal_replayed_on_reload(self):
+        """Test autosaved edits are replayed on reload and then compacted into the labels CSV."""
+        self.interface._load_or_initialize_label_data()
+        self.interface.label_values.set_value(2, "action", "climb")
+        self.interface.label_values.fill_range({"count": 3.0}, 1, 4)
+        self.interface.autosave()
+        journal_file = self.interface.csv_file + ".journal"
+        self.assertTrue(os.path.exists(journal_file))
+        self.assertFalse(os.path.exists(self.interface.csv_file), "Autosave should not write the CSV.")
+
+        self.interface._load_or_initialize_label_data()
+        self.assertEqual(self.interface.label_values[2]["action"], "climb")
+        self.assertEqual(self.interface.label_values[3]["count"], 3.0)
+        self.assertTrue(self.interface._has_unsaved_changes)
+
+        self._wait_for_save()
+        self.assertFalse(os.path.exists(journal_file), "Compaction should fold the journal into the CSV.")
+        self.assertFalse(self.interface._has_unsaved_changes)
+        saved_df = pd.read_csv(self.interface.csv_file, keep_default_na=False)
+        self.assertEqual(saved_df["action"].tolist(), ["", "", "climb", "", ""])
+        self.assertEqual(saved_df["count"].tolist(), [0.0, 3.0, 3.0, 3.0, 0.0])
+
+    def test_background_save_writes_snapshot(self):
+        """Edits made while a save runs are not in the file and keep the unsaved flag set."""
+        self.interface._load_or_initialize_label_data()
+        self.interface.label_values.set_value(0, "action", "before")
+        self.interface._has_unsaved_changes = True
+
+        self.interface.save_csv(show_dialog=False)
+        self.assertIsNotNone(self.interface._save_task, "Save should run on a worker.")
+        self.interface.label_values.set_value(1, "action", "during")
+        self._wait_for_save()
+
+        saved = pd.read_csv(self.interface.csv_file, keep_default_na=False)
+        self.assertEqual(saved["action"].tolist()[:2], ["before", ""])
+        self.assertFalse(os.path.exists(self.interface.csv_file + ".tmp"))
+        self.assertTrue(self.interface._has_unsaved_changes, "Edits after the snapshot are still unsaved.")
+
+        self.interface.save_csv(show_dialog=False, background=False)
+        self.assertIsNone(self.interface._save_task)
+        self.assertFalse(self.interface._has_unsaved_changes)
+        saved = pd.read_csv(self.interface.csv_file, keep_default_na=False)
+        self.assertEqual(saved["action"].tolist()[:2], ["before", "during"])
+
+    def test_video_frames_are_cached(self):
+        """Revisiting a frame is served from the decoded-frame cache."""
+        from tests.test_video_reader import write_test_video
+        video_path = os.path.join(self.temp_dir.name, "clip.avi")
+        write_test_video(video_path, self.num_frames)
+        self.interface.prefetch_spinbox.setValue(0)  # Only count the display's own lookups.
+        self.interface._apply_loaded_video(video_path, VideoReader(video_path), self.num_frames)
+        for index in (0, 1, 2, 1, 0):
+            self.interface.frame_index = index
+            self.interface.display_video_frame()
+        stats = self.interface.frame_cache.stats()
+        # Loading the video already displayed frame 0 once.
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 3))
+        self.assertIn("3 hits / 3 misses", self.interface.cache_stats_label.text())
+        self.interface.frame_cache_spinbox.setValue(0)
+        self.assertEqual(len(self.interface.frame_cache), 0)
+
+    def test_slider_moves_render_latest_frame_only(self):
+        """A burst of slider ticks renders just the last one."""
+        self.interface.total_frames = self.num_frames
+        self.interface.slider.setMaximum(self.num_frames - 1)
+        with patch.object(self.interface, 'update_frame_display') as update:
+            for value in (1, 2, 3, 4):
+                self.interface.slider.setValue(value)
+            QApplication.processEvents()
+        update.assert_called_once()
+        self.assertEqual(self.interface.frame_index, 4)
+
     def test_update_label_data_from_input_non_numeric(self):
         """Test _update_label_data_from_input for a non-numeric label."""
         self.interface.frame_index = 0
@@ -138,13 +245,13 @@ class TestInterfaceDataHandling(unittest.TestCase):
 
     @patch('interface.QFileDialog.getSaveFileName')
     def test_save_csv_data_preparation(self, mock_get_save_file_name):
-        """Test the data structure prepared by save_csv before writing."""
+        """Test the labels file written by save_csv: IDs, frame and label columns, no keypoints."""
+        output_path = os.path.join(self.temp_dir.name, "test_output.csv")
         # Mock QFileDialog to return a dummy path and not show a dialog
-        mock_get_save_file_name.return_value = (
-        os.path.join(self.temp_dir.name, "test_output.csv"), "CSV Files (*.csv)")
+        mock_get_save_file_name.return_value = (output_path, "CSV Files (*.csv)")
 
         # Populate label_values with some data
-        self.interface.label_values = {}
+        self.interface.label_values = LabelStore()
         for i in range(self.num_frames):
             self.interface.label_values[i] = {
                 "action": f"walk_{i}",
@@ -152,33 +259,66 @@ class TestInterfaceDataHandling(unittest.TestCase):
                 "count": float(i)
             }
 
-        # Mock the part of save_csv that creates the DataFrame
-        # We need to capture the 'data_to_save' list
-        with patch('interface.pd.DataFrame') as mock_pd_dataframe:
-            self.interface.save_csv(show_dialog=False)  # Use current self.csv_file or trigger internal logic
-
-            self.assertTrue(mock_pd_dataframe.called, "pandas.DataFrame should have been called.")
-
-            # Get the arguments passed to pd.DataFrame
-            call_args = mock_pd_dataframe.call_args
-            data_saved_list = call_args[0][0]  # First positional argument is the data list
-            columns_saved = call_args[1]['columns']  # Keyword argument 'columns'
-
-            self.assertEqual(len(data_saved_list), self.num_frames)
-
-            expected_headers = ["climber_id", "route_id", "frame"]
-            for kp_idx in range(self.num_keypoints):
-                expected_headers.extend([f"kp{kp_idx}_x", f"kp{kp_idx}_y", f"kp{kp_idx}_z"])
-            expected_headers.extend(self.interface.label_names)
-            self.assertEqual(columns_saved, expected_headers)
-
-            for i in range(self.num_frames):
-                row = data_saved_list[i]
-                self.assertEqual(row["frame"], i)
-                self.assertEqual(row["action"], f"walk_{i}")
-                self.assertEqual(row["object_visible"], "True")
-                self.assertEqual(row["count"], float(i))
-                self.assertEqual(row["climber_id"], "test_climber")
+        self.interface.save_csv(show_dialog=False)  # Use current self.csv_file or trigger internal logic
+        self._wait_for_save()
+        self.assertTrue(os.path.exists(output_path), "save_csv should have written the CSV file.")
+
+        saved = pd.read_csv(output_path, keep_default_na=False)
+        self.assertEqual(len(saved), self.num_frames)
+
+        expected_headers = ["climber_id", "route_id", "frame"] + self.interface.label_names
+        self.assertEqual(list(saved.columns), expected_headers)
+
+        for i in range(self.num_frames):
+            row = saved.iloc[i]
+            self.assertEqual(row["frame"], i)
+            self.assertEqual(row["action"], f"walk_{i}")
+            self.assertEqual(str(row["object_visible"]), "True")
+            self.assertEqual(row["count"], float(i))
+            self.assertEqual(row["climber_id"], "test_climber")
+
+    @patch('interface.QFileDialog.getSaveFileName')
+    def test_export_merged_dataset(self, mock_get_save_file_name):
+        """Test the merged export: column order, keypoints and coerced label values."""
+        output_path = os.path.join(self.temp_dir.name, "merged.csv")
+        mock_get_save_file_name.return_value = (output_path, "CSV Files (*.csv)")
+        self.interface.label_values = LabelStore(self.num_frames)
+        for i in range(self.num_frames):
+            self.interface.label_values[i] = {"action": f"walk_{i}", "object_visible": "True", "count": float(i)}
+
+        self.interface.export_merged_dataset()
+        self._wait_for_save()
+
+        saved = pd.read_csv(output_path, keep_default_na=False)
+        expected_headers = ["climber_id", "route_id", "frame"]
+        for kp_idx in range(self.num_keypoints):
+            expected_headers.extend([f"kp{kp_idx}_x", f"kp{kp_idx}_y", f"kp{kp_idx}_z"])
+        expected_headers.extend(self.interface.label_names)
+        self.assertEqual(list(saved.columns), expected_headers)
+        for i in range(self.num_frames):
+            row = saved.iloc[i]
+            self.assertEqual(row["action"], f"walk_{i}")
+            self.assertEqual(row["count"], float(i))
+            self.assertAlmostEqual(row["kp1_y"], float(self.interface.keypoints[i, 1, 1]), places=6)
+        self.assertFalse(os.path.exists(output_path + ".journal"), "Exports are not journalled.")
+
+    def test_save_csv_coerces_label_types(self):
+        """Numeric labels are written as floats (blank/invalid -> 0.0), others as strings."""
+        output_path = os.path.join(self.temp_dir.name, "coerced.csv")
+        self.interface.csv_file = output_path
+        self.interface.label_values = LabelStore(self.num_frames)
+        self.interface.label_values.add_label("action")
+        self.interface.label_values.add_label("count")
+        self.interface.label_values.set_value(0, "count", "12")
+        self.interface.label_values.set_value(1, "count", "oops")
+        self.interface.label_values.set_value(2, "action", "3")
+
+        self.interface.save_csv(show_dialog=False)
+        self._wait_for_save()
+
+        saved = pd.read_csv(output_path, dtype=str, keep_default_na=False)
+        self.assertEqual(list(saved["count"]), ["12.0", "0.0", "0.0", "0.0", "0.0"])
+        self.assertEqual(list(saved["action"]), ["", "", "3", "", ""])
 
 
 if __name__ == '__main__':
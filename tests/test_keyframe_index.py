@@ -0,0 +1,84 @@
+# tests/test_keyframe_index.py
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import cv2
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from keyframe_index import KeyframeIndex, index_path, load_or_build_keyframe_index
+from video_reader import VideoReader
+
+
+def write_gop_video(path, num_frames, size=(128, 96)):
+    """Writes an MPEG-4 video (a keyframe every 12 frames) with frame i's number drawn as 8 bit stripes."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 25.0, size)
+    for i in range(num_frames):
+        image = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        for bit in range(8):
+            if i >> bit & 1:
+                image[:, bit * 16:(bit + 1) * 16] = 255
+        writer.write(image)
+    writer.release()
+
+
+def frame_number(frame):
+    columns = frame.mean(axis=(0, 2))
+    return sum(1 << bit for bit in range(8) if columns[bit * 16 + 4:bit * 16 + 12].mean() > 127)
+
+
+class TestKeyframeIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "gop.mp4")
+        self.num_frames = 60
+        write_gop_video(self.path, self.num_frames)
+        self.index = KeyframeIndex.build(self.path)
+        if self.index is None:
+            self.skipTest("Video backend cannot report packets.")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_build(self):
+        self.assertEqual(self.index.frame_count, self.num_frames)
+        self.assertEqual(self.index.keyframes[0], 0)
+        self.assertGreater(len(self.index.keyframes), 1)
+        self.assertTrue((np.diff(self.index.pts) > 0).all())
+        keyframe = int(self.index.keyframes[1])
+        self.assertEqual(self.index.keyframe_at_or_before(keyframe + 1), keyframe)
+        self.assertEqual(self.index.keyframe_at_or_before(keyframe), keyframe)
+        self.assertEqual(self.index.keyframe_before(keyframe), 0)
+        self.assertEqual(self.index.frame_at_pts(self.index.pts[7]), 7)
+
+    def test_saved_next_to_video_and_invalidated(self):
+        built = load_or_build_keyframe_index(self.path)
+        self.assertTrue(os.path.exists(index_path(self.path)))
+        loaded = KeyframeIndex.load(self.path)
+        np.testing.assert_array_equal(loaded.keyframes, built.keyframes)
+        np.testing.assert_array_equal(loaded.pts, built.pts)
+
+        write_gop_video(self.path, self.num_frames - 1)
+        self.assertIsNone(KeyframeIndex.load(self.path), "A changed video invalidates the index.")
+
+    def test_reader_random_access_is_exact(self):
+        reader = VideoReader(self.path, read_ahead=2, keyframe_index=self.index)
+        try:
+            for target in (50, 3, 37, 36, 59, 0, 25, 13):
+                self.assertEqual(frame_number(reader.read(target)), target)
+            seeks = reader.seeks
+            keyframe = int(self.index.keyframes[2])
+            reader.read(keyframe)
+            reader.read(int(self.index.keyframes[3]) - 1)
+            self.assertEqual(reader.seeks, seeks + 1, "Targets in the current GOP decode forward.")
+        finally:
+            reader.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
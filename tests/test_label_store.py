@@ -0,0 +1,122 @@
+# tests/test_label_store.py
+import unittest
+import os
+import sys
+import numpy as np
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from label_store import LabelStore
+
+
+class TestLabelStore(unittest.TestCase):
+
+    mode = "dense"
+
+    def setUp(self):
+        self.store = LabelStore(10, mode=self.mode)
+        self.store.add_label("action", numeric=False)
+        self.store.add_label("count", numeric=True)
+
+    def test_defaults(self):
+        self.assertEqual(len(self.store), 10)
+        self.assertEqual(self.store.frame_values(4), {"action": "", "count": 0.0})
+        self.assertEqual(self.store[9]["action"], "")
+        self.assertNotIn(10, self.store)
+
+    def test_columns_are_compact_arrays(self):
+        self.store.set_value(2, "action", "walk")
+        codes, categories = self.store.categorical("action")
+        self.assertEqual(codes.dtype, np.int32)
+        self.assertEqual(categories[codes[2]], "walk")
+        self.assertEqual(self.store.column_values("count").dtype, np.float64)
+
+    def test_set_and_read_values(self):
+        self.store.set_value(3, "action", "climb")
+        self.store.set_value(3, "count", 2)
+        self.assertEqual(self.store.value(3, "action"), "climb")
+        self.assertEqual(self.store.value(3, "count"), 2.0)
+        self.assertIsNone(self.store.value(42, "count"))
+
+    def test_non_numeric_value_converts_numeric_column_without_loss(self):
+        self.store.set_value(1, "count", 5.0)
+        self.store.set_value(2, "count", "many")
+        self.assertFalse(self.store.is_numeric("count"))
+        self.assertEqual(self.store.value(1, "count"), "5.0")
+        self.assertEqual(self.store.value(2, "count"), "many")
+
+    def test_number_makes_empty_string_column_numeric(self):
+        self.store.set_value(0, "action", 1.5)
+        self.assertTrue(self.store.is_numeric("action"))
+        self.assertEqual(self.store.value(0, "action"), 1.5)
+
+    def test_fill_range_counts_changed_frames(self):
+        self.store.set_value(5, "action", "walk")
+        changed = self.store.fill_range({"action": "walk", "count": 0.0}, 2, 8)
+        self.assertEqual(changed, 5)  # frame 5 already had the same values
+        np.testing.assert_array_equal(self.store.column_values("action")[2:8], ["walk"] * 6)
+        self.assertEqual(self.store.value(1, "action"), "")
+
+    def test_copy_frame_and_snapshot(self):
+        self.store.set_frame_values(0, {"action": "sit", "count": 3.0})
+        self.store.copy_frame(0, 1)
+        snapshot = self.store.copy()
+        self.store.set_value(1, "action", "stand")
+        self.assertEqual(snapshot.frame_values(1), {"action": "sit", "count": 3.0})
+        self.assertEqual(self.store.value(1, "action"), "stand")
+
+    def test_writing_past_the_end_grows_store(self):
+        self.store[12] = {"action": "jump"}
+        self.assertEqual(len(self.store), 13)
+        self.assertEqual(self.store.value(11, "count"), 0.0)
+
+
+class TestRunLabelStore(TestLabelStore):
+    """Runs the same behaviour checks against the interval-encoded storage mode."""
+    mode = "runs"
+
+    def test_memory_scales_with_segments(self):
+        store = LabelStore(1_000_000, mode="runs")
+        store.add_label("action")
+        store.fill_range({"action": "climbing"}, 1200, 5400)
+        store.fill_range({"action": "resting"}, 5400, 900_000)
+        column = store._columns["action"]
+        self.assertEqual(column.starts.tolist(), [0, 1200, 5400, 900_000])
+        self.assertEqual(store.value(5399, "action"), "climbing")
+        self.assertEqual(store.value(5400, "action"), "resting")
+        values = store.column_values("action", 1199, 1201)
+        self.assertEqual(list(values), ["", "climbing"])
+
+    def test_adjacent_equal_segments_merge(self):
+        store = LabelStore(100, mode="runs")
+        store.add_label("action")
+        store.fill_range({"action": "walk"}, 10, 20)
+        store.fill_range({"action": "walk"}, 20, 30)
+        store.set_value(15, "action", "walk")
+        self.assertEqual(store._columns["action"].starts.tolist(), [0, 10, 30])
+
+    def test_label_changing_every_frame(self):
+        values = np.arange(50_000) % 7
+        store = LabelStore(len(values), mode="runs")
+        store.add_label("count", numeric=True)
+        store.assign_column("count", np.arange(len(values)), values)
+        column = store._columns["count"]
+        self.assertEqual(len(column.starts), len(values))
+        self.assertLessEqual(column.starts.nbytes + column.run_values.nbytes, 16 * len(values))
+        np.testing.assert_array_equal(store.column_values("count"), values)
+        snapshot = store.copy()
+        store.fill_range({"count": 3.0}, 100, 40_000)
+        store.set_value(7, "count", 9.0)
+        expected = values.astype(np.float64)
+        expected[100:40_000] = 3.0
+        expected[7] = 9.0
+        np.testing.assert_array_equal(store.column_values("count"), expected)
+        np.testing.assert_array_equal(snapshot.column_values("count"), values)
+        self.assertEqual(store.value(99, "count"), float(values[99]))
+        self.assertEqual(store.value(40_000, "count"), float(values[40_000]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# tests/test_offscreen_render.py
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from PyQt6.QtWidgets import QApplication
+from offscreen_render import (OffscreenRenderer, default_labels_path, draw_label_text, read_label_texts,
+                              render_sequence)
+
+app = QApplication.instance()
+if app is None:
+    app = QApplication(sys.argv)
+
+
+class TestOffscreenRender(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.keypoints_path = os.path.join(self.temp_dir.name, "seq.npy")
+        np.save(self.keypoints_path, np.random.default_rng(0).random((4, 17, 3)).astype(np.float32) - 0.5)
+        self.labels_path = os.path.join(self.temp_dir.name, "seq_newlabels.csv")
+        pd.DataFrame({"climber_id": "c1", "route_id": "r1", "frame": [0, 1, 2, 3],
+                      "action": ["walk", "walk", "", "run"], "count": ["1", "2", "3", "4"]}).to_csv(
+            self.labels_path, index=False)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_default_labels_path(self):
+        self.assertEqual(default_labels_path(self.keypoints_path), self.labels_path)
+        self.assertIsNone(default_labels_path(os.path.join(self.temp_dir.name, "other.npy")))
+
+    def test_read_label_texts(self):
+        texts = read_label_texts(self.labels_path, 5)
+        self.assertEqual(texts[0], ["action: walk", "count: 1"])
+        self.assertEqual(texts[2], ["count: 3"])
+        self.assertEqual(texts[4], [])
+
+    def test_merged_export_keypoint_columns_are_not_labels(self):
+        merged = pd.read_csv(self.labels_path)
+        merged.insert(3, "kp0_x", 0.5)
+        merged.to_csv(self.labels_path, index=False)
+        self.assertEqual(read_label_texts(self.labels_path, 4)[3], ["action: run", "count: 4"])
+
+    def test_draw_label_text(self):
+        image = np.full((120, 200, 3), 255, dtype=np.uint8)
+        draw_label_text(image, ["action: walk"], frame_index=3)
+        self.assertTrue((image[:60] != 255).any())
+        self.assertTrue((image[70:] == 255).all())
+
+    def test_render_sequence_to_video(self):
+        try:
+            OffscreenRenderer(64, 48).release()
+        except ValueError:
+            self.skipTest("No OpenGL context available for offscreen rendering.")
+        import cv2
+        output = os.path.join(self.temp_dir.name, "seq_preview.mp4")
+        render_sequence(self.keypoints_path, output, self.labels_path, size=(160, 120))
+        cap = cv2.VideoCapture(output)
+        self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 4)
+        cap.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -127,6 +127,33 @@ class TestOpenGLWidget(unittest.TestCase):
         self.widget.set_frame_index(num_frames + 100) # Index 110 is out of bounds
         self.assertEqual(self.widget.frame_index, num_frames - 1, "Index > num_frames should be clamped to num_frames-1.")
 
+    def test_repaint_requests_are_coalesced_under_fps_cap(self):
+        """Repaint requests inside one frame interval become a single deferred update."""
+        import time
+        from unittest.mock import patch
+        self.widget.set_max_fps(20)
+        self.widget._last_paint_start = time.perf_counter()
+        with patch.object(self.widget, 'update') as update:
+            for _ in range(5):
+                self.widget.request_repaint()
+            update.assert_not_called()
+            self.assertTrue(self.widget._repaint_timer.isActive())
+            deadline = time.perf_counter() + 1.0
+            while self.widget._repaint_timer.isActive() and time.perf_counter() < deadline:
+                app.processEvents()
+            update.assert_called_once()
+
+    def test_uncapped_repaint_updates_immediately(self):
+        from unittest.mock import patch
+        self.widget.set_max_fps(0)
+        with patch.object(self.widget, 'update') as update:
+            self.widget.request_repaint()
+            update.assert_called_once()
+
+    def test_paint_stats_without_paints(self):
+        stats = self.widget.paint_stats()
+        self.assertEqual((stats["paints"], stats["fps"], stats["draw_calls"]), (0, 0.0, 0))
+
     # Note: Testing mouse/wheel events requires more advanced setup (e.g., QTest)
     # to simulate events and is omitted here for simplicity.
 
@@ -0,0 +1,59 @@
+# tests/test_prefetch.py
+import unittest
+import os
+import sys
+import tempfile
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from frame_cache import FrameCache
+from prefetch import FramePrefetcher, prefetch_order
+from tests.test_video_reader import write_test_video, frame_number
+
+
+class TestPrefetchOrder(unittest.TestCase):
+
+    def test_forward_first_when_moving_forward(self):
+        self.assertEqual(prefetch_order(10, 1, 3, 2, 100), [11, 12, 13, 8, 9])
+
+    def test_backward_blocks_first_when_moving_backward(self):
+        self.assertEqual(prefetch_order(20, -1, 2, 10, 100), [12, 13, 14, 15, 16, 17, 18, 19, 10, 11, 21, 22])
+
+    def test_clipped_to_video(self):
+        self.assertEqual(prefetch_order(1, 1, 5, 5, 4), [2, 3, 0])
+
+
+class TestFramePrefetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "test.avi")
+        write_test_video(self.path, 40)
+        self.cache = FrameCache(max_bytes=64 * 1024 * 1024)
+        self.prefetcher = FramePrefetcher(self.path, self.cache, ahead=6, behind=3)
+        self.prefetcher.start()
+
+    def tearDown(self):
+        self.prefetcher.stop()
+        self.temp_dir.cleanup()
+
+    def test_fills_window_around_target(self):
+        self.prefetcher.set_target(10)
+        self.assertTrue(self.prefetcher.wait_idle())
+        for index in list(range(7, 10)) + list(range(11, 17)):
+            self.assertEqual(frame_number(self.cache.get((index, None))), index)
+        self.assertFalse(self.cache.peek((17, None)))
+
+    def test_follows_direction_and_size(self):
+        self.prefetcher.set_target(30, (32, 24))
+        self.prefetcher.set_target(29, (32, 24))
+        self.assertTrue(self.prefetcher.wait_idle())
+        frame = self.cache.get((26, (32, 24)))
+        self.assertEqual(frame.shape, (24, 32, 3))
+        self.assertEqual(frame_number(frame), 26)
+
+
+if __name__ == '__main__':
+    unittest.main()
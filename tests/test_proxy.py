@@ -0,0 +1,62 @@
+# tests/test_proxy.py
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import cv2
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from proxy import build_proxy, find_proxy, proxy_path
+from utils import OperationCancelled
+from video_reader import VideoReader
+from tests.test_keyframe_index import write_gop_video, frame_number
+
+
+class TestProxy(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "source.mp4")
+        self.num_frames = 30
+        write_gop_video(self.path, self.num_frames)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_build_and_find(self):
+        self.assertIsNone(find_proxy(self.path, width=64))
+        path = build_proxy(self.path, width=64)
+        self.assertEqual(path, proxy_path(self.path, width=64))
+        self.assertEqual(find_proxy(self.path, width=64), path)
+
+        reader = VideoReader(path)
+        try:
+            self.assertEqual(reader.frame_count, self.num_frames)
+            self.assertEqual((reader.width, reader.height), (64, 48))
+            for index in (17, 3, 29):
+                frame = cv2.resize(reader.read(index), (128, 96), interpolation=cv2.INTER_NEAREST)
+                self.assertEqual(frame_number(frame), index, "Proxy frames line up with the source.")
+        finally:
+            reader.release()
+
+    def test_changed_source_invalidates_proxy(self):
+        build_proxy(self.path, width=64)
+        write_gop_video(self.path, self.num_frames - 1)
+        self.assertIsNone(find_proxy(self.path, width=64))
+
+    def test_cancelled_build_leaves_nothing(self):
+        def cancel(done, total):
+            raise OperationCancelled()
+
+        with patch('proxy.PROGRESS_EVERY_FRAMES', 8):
+            with self.assertRaises(OperationCancelled):
+                build_proxy(self.path, width=64, progress=cancel)
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ["source.mp4"])
+
+
+if __name__ == '__main__':
+    unittest.main()
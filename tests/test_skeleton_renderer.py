@@ -0,0 +1,69 @@
+# tests/test_skeleton_renderer.py
+import unittest
+import os
+import sys
+import numpy as np
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from skeleton_renderer import (SkeletonRenderer, upload_window, onion_colors, ghost_indices, trajectory_indices,
+                               ONION_MAX_ALPHA, ONION_MIN_ALPHA)
+from skeletons import SKELETONS
+
+
+class TestUploadWindow(unittest.TestCase):
+
+    def test_small_sequence_is_uploaded_whole(self):
+        self.assertEqual(upload_window(500, 1000, 204, max_bytes=1 << 20), (0, 1000))
+
+    def test_large_sequence_is_streamed_around_frame(self):
+        self.assertEqual(upload_window(5000, 10000, 204, max_bytes=1000, window_frames=100), (4950, 5050))
+        self.assertEqual(upload_window(3, 10000, 204, max_bytes=1000, window_frames=100), (0, 100))
+        self.assertEqual(upload_window(9999, 10000, 204, max_bytes=1000, window_frames=100), (9900, 10000))
+
+
+class TestOnionSkin(unittest.TestCase):
+
+    def test_ghost_indices_skip_current_frame(self):
+        indices = np.array([0, 1, 1, 2], dtype=np.uint32)
+        ghosts = ghost_indices(5, 4, 6, indices, 3)
+        self.assertEqual(ghosts.dtype, np.uint32)
+        # Frames 4 and 6 are vertices 0-2 and 6-8 of the window starting at frame 4.
+        np.testing.assert_array_equal(ghosts, [0, 1, 1, 2, 6, 7, 7, 8])
+
+    def test_trajectory_indices_join_joints_across_frames(self):
+        np.testing.assert_array_equal(trajectory_indices(3, 2), [0, 2, 1, 3, 2, 4, 3, 5])
+        self.assertEqual(len(trajectory_indices(1, 2)), 0)
+
+    def test_onion_colors_fade_away_from_current_frame(self):
+        colors = onion_colors(10, 7, 12, 2)
+        self.assertEqual(colors.shape, (6 * 2, 4))
+        alphas = colors[::2, 3]
+        self.assertAlmostEqual(alphas[0], ONION_MIN_ALPHA, places=5)  # Frame 7, furthest away.
+        self.assertAlmostEqual(alphas[2], ONION_MAX_ALPHA, places=5)  # Frame 9, adjacent.
+        self.assertTrue((np.diff(alphas[:4]) >= 0).all() and (np.diff(alphas[3:]) <= 0).all())
+        self.assertFalse(np.array_equal(colors[0, :3], colors[-1, :3]))  # Past and future tints differ.
+
+
+class TestSkeletonRenderer(unittest.TestCase):
+
+    def test_frame_vertices_are_oriented_float32(self):
+        keypoints = np.arange(2 * 3 * 3, dtype=np.float64).reshape(2, 3, 3)
+        renderer = SkeletonRenderer()
+        renderer.set_data(keypoints, [[0, 1]], (1, -1, 1))
+        vertices = renderer.frame_vertices(1)
+        self.assertEqual(vertices.dtype, np.float32)
+        np.testing.assert_array_equal(vertices, keypoints[1] * [1, -1, 1])
+        self.assertEqual(renderer.frame_bytes, 3 * 3 * 4)
+
+    def test_skeleton_indices_are_used_as_compiled(self):
+        skeleton = SKELETONS["coco17"]
+        renderer = SkeletonRenderer()
+        renderer.set_data(np.zeros((2, 17, 3), dtype=np.float32), skeleton)
+        self.assertIs(renderer.indices.base, skeleton.limbs)
+
+
+if __name__ == '__main__':
+    unittest.main()
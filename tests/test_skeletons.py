@@ -0,0 +1,83 @@
+# tests/test_skeletons.py
+import unittest
+import os
+import sys
+import json
+import tempfile
+import numpy as np
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from skeletons import (SKELETONS, DEFAULT_SKELETON, Skeleton, limb_indices, load_skeleton, skeleton_for_joint_count)
+
+
+class TestSkeletonRegistry(unittest.TestCase):
+
+    def test_builtin_topologies(self):
+        expected = {"h36m17": 17, "h36m32": 32, "coco17": 17, "halpe17": 17, "halpe26": 26, "halpe136": 136,
+                    "smpl24": 24}
+        for name, num_joints in expected.items():
+            skeleton = SKELETONS[name]
+            self.assertEqual(skeleton.num_joints, num_joints)
+            self.assertEqual(skeleton.limbs.dtype, np.uint32)
+            self.assertTrue(skeleton.limbs.flags['C_CONTIGUOUS'])
+            self.assertLess(int(skeleton.limbs.max()), num_joints)
+            # Every joint is connected.
+            self.assertEqual(len(np.unique(skeleton.limbs)), num_joints, name)
+
+    def test_default_is_the_original_limb_sequence(self):
+        self.assertEqual(SKELETONS[DEFAULT_SKELETON].limb_list(),
+                         [[0, 1], [1, 2], [2, 3], [0, 4], [4, 5], [5, 6], [0, 7], [7, 8], [8, 9], [8, 11], [8, 14],
+                          [9, 10], [11, 12], [12, 13], [14, 15], [15, 16]])
+
+    def test_invalid_skeleton_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Skeleton("bad", 3, [[0, 1], [1, 3]])
+        with self.assertRaises(ValueError):
+            Skeleton("bad", 3, [[0, 1]], joint_names=["a", "b"])
+
+    def test_skeleton_for_joint_count(self):
+        self.assertEqual(skeleton_for_joint_count(17).name, DEFAULT_SKELETON)
+        self.assertEqual(skeleton_for_joint_count(17, "coco17").name, "coco17")
+        self.assertEqual(skeleton_for_joint_count(136).name, "halpe136")
+        self.assertEqual(skeleton_for_joint_count(20).name, DEFAULT_SKELETON)  # Extra joints are left unconnected.
+        self.assertIsNone(skeleton_for_joint_count(5))
+
+    def test_load_json_skeleton(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "hand.json")
+            with open(path, 'w') as f:
+                json.dump({"name": "test_triangle", "num_joints": 3, "limbs": [[0, 1], [1, 2], [2, 0]]}, f)
+            try:
+                skeleton = load_skeleton(path)
+                self.assertIs(SKELETONS["test_triangle"], skeleton)
+                np.testing.assert_array_equal(skeleton.indices, [0, 1, 1, 2, 2, 0])
+            finally:
+                SKELETONS.pop("test_triangle", None)
+            with open(path, 'w') as f:
+                json.dump({"name": "broken", "num_joints": 2, "limbs": [[0, 2]]}, f)
+            with self.assertRaises(ValueError):
+                load_skeleton(path)
+            self.assertNotIn("broken", SKELETONS)
+
+
+class TestLimbIndices(unittest.TestCase):
+
+    def test_flattens_valid_limbs(self):
+        indices = limb_indices([[0, 1], [1, 2]], 3)
+        self.assertEqual(indices.dtype, np.uint32)
+        np.testing.assert_array_equal(indices, [0, 1, 1, 2])
+
+    def test_drops_out_of_range_limbs_with_warning(self):
+        with self.assertWarns(UserWarning):
+            indices = limb_indices([[0, 1], [1, 5], [-1, 0]], 3)
+        np.testing.assert_array_equal(indices, [0, 1])
+
+    def test_no_limbs(self):
+        self.assertEqual(len(limb_indices(None, 3)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,7 +13,8 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from utils import load_keypoint_data
+from utils import load_keypoint_data, orient_keypoints, keypoint_axis_signs
+from keypoint_cache import cache_paths, read_cached_keypoints, invalidate_keypoint_cache
 
 
 class TestLoadKeypointData(unittest.TestCase):
@@ -67,6 +68,24 @@ class TestLoadKeypointData(unittest.TestCase):
         np.testing.assert_array_almost_equal(loaded_data, self.npy_data_3d, decimal=5)
         self.assertEqual(loaded_data.shape, self.npy_data_3d.shape)
 
+    def test_load_npy_file_memory_mapped(self):
+        loaded_data = load_keypoint_data(self.valid_npy_path, mmap_mode='r')
+        self.assertIsInstance(loaded_data, np.memmap, "mmap_mode should return a memory-mapped array.")
+        self.assertFalse(loaded_data.flags.writeable)
+        np.testing.assert_array_equal(loaded_data, self.npy_data_3d)
+        del loaded_data
+
+    def test_orient_keypoints_does_not_mutate_source(self):
+        loaded_data = load_keypoint_data(self.valid_npy_path, mmap_mode='r')
+        oriented = orient_keypoints(loaded_data[3], keypoint_axis_signs(self.valid_npy_path))
+        expected = self.npy_data_3d[3].copy()
+        expected[:, 0] *= -1
+        expected[:, 1] *= -1
+        np.testing.assert_array_equal(oriented, expected)
+        self.assertEqual(oriented.dtype, self.npy_data_3d.dtype)
+        np.testing.assert_array_equal(loaded_data, self.npy_data_3d)
+        del loaded_data
+
     def test_load_valid_csv_file(self):
         """Test loading a CSV that should be reshaped to 3D by utils.py."""
         loaded_data = load_keypoint_data(self.valid_csv_path)
@@ -77,6 +96,26 @@ class TestLoadKeypointData(unittest.TestCase):
         # Compare content by reshaping the original npy_data_3d to match how it would be loaded
         np.testing.assert_array_almost_equal(loaded_data, self.npy_data_3d, decimal=5)
 
+    def test_load_csv_with_header_and_frame_column(self):
+        """Test a CSV with a text header row and a leading frame index column."""
+        header_csv_path = os.path.join(self.temp_dir.name, "header_frame_keypoints.csv")
+        flat = self.npy_data_3d.reshape(self.csv_data_frames, -1).astype(np.float64)
+        df = pd.DataFrame(flat, columns=[f"c{i}" for i in range(flat.shape[1])])
+        df.insert(0, "frame", np.arange(self.csv_data_frames))
+        df.to_csv(header_csv_path, index=False)
+        with self.assertWarnsRegex(UserWarning, "Info: Assuming the first numeric column .* is a frame index"):
+            loaded_data = load_keypoint_data(header_csv_path)
+        self.assertEqual(loaded_data.shape, self.csv_expected_3d_shape)
+        self.assertEqual(loaded_data.dtype, np.float64)
+        np.testing.assert_array_almost_equal(loaded_data, flat.reshape(self.csv_expected_3d_shape), decimal=10)
+
+    def test_load_csv_streamed_in_small_chunks(self):
+        """The streaming reader must give the same result regardless of chunk size."""
+        from utils import _read_keypoint_csv
+        loaded_data, frame_index_stripped = _read_keypoint_csv(self.valid_csv_path, chunk_bytes=1)
+        self.assertFalse(frame_index_stripped)
+        np.testing.assert_array_almost_equal(loaded_data, self.npy_data_3d, decimal=5)
+
     def test_load_non_existent_file(self):
         non_existent_path = os.path.join(self.temp_dir.name, "does_not_exist.npy")
         with self.assertWarnsRegex(UserWarning, "Error: File not found"):
@@ -130,5 +169,50 @@ class TestLoadKeypointData(unittest.TestCase):
         self.assertIsNone(loaded_data)
 
 
+class TestKeypointCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data = np.random.rand(6, 4, 3)
+        flat = pd.DataFrame(self.data.reshape(6, -1))
+        flat.insert(0, "frame", np.arange(6))
+        self.csv_path = os.path.join(self.temp_dir.name, "cached_keypoints.csv")
+        flat.to_csv(self.csv_path, index=False, header=False)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_second_load_is_served_from_sidecar(self):
+        with self.assertWarnsRegex(UserWarning, "is a frame index"):
+            first = load_keypoint_data(self.csv_path, mmap_mode='r', use_cache=True)
+        data_path, meta_path = cache_paths(self.csv_path)
+        self.assertTrue(os.path.exists(data_path) and os.path.exists(meta_path))
+        # The stripped frame-index flag is stored, so the same info warning is raised on a cache hit.
+        with self.assertWarnsRegex(UserWarning, "is a frame index"):
+            second = load_keypoint_data(self.csv_path, mmap_mode='r', use_cache=True)
+        self.assertIsInstance(second, np.memmap)
+        np.testing.assert_array_equal(first, second)
+        del second
+
+    def test_changed_source_invalidates_sidecar(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            load_keypoint_data(self.csv_path, use_cache=True)
+            with open(self.csv_path, 'a') as f:
+                f.write("6," + ",".join(["1.5"] * 12) + "\n")
+            self.assertIsNone(read_cached_keypoints(self.csv_path))
+            reloaded = load_keypoint_data(self.csv_path, use_cache=True)
+        self.assertEqual(reloaded.shape, (7, 4, 3))
+
+    def test_size_limit_and_invalidation(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            load_keypoint_data(self.csv_path, use_cache=True, max_cache_bytes=0)
+            self.assertFalse(os.path.exists(cache_paths(self.csv_path)[0]))
+            load_keypoint_data(self.csv_path, use_cache=True)
+        invalidate_keypoint_cache(self.csv_path)
+        self.assertFalse(any(os.path.exists(path) for path in cache_paths(self.csv_path)))
+
+
 if __name__ == '__main__':
     unittest.main()
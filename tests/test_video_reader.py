@@ -0,0 +1,72 @@
+# tests/test_video_reader.py
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import cv2
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from video_reader import VideoReader
+
+
+def write_test_video(path, num_frames, size=(64, 48)):
+    """Writes a video whose frame i is a flat gray image of brightness 5 * i."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 25.0, size)
+    for i in range(num_frames):
+        writer.write(np.full((size[1], size[0], 3), 5 * i, dtype=np.uint8))
+    writer.release()
+
+
+def frame_number(frame):
+    return int(round(float(frame.mean()) / 5))
+
+
+class TestVideoReader(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "test.avi")
+        self.num_frames = 40
+        write_test_video(self.path, self.num_frames)
+        self.reader = VideoReader(self.path, read_ahead=4)
+
+    def tearDown(self):
+        self.reader.release()
+        self.temp_dir.cleanup()
+
+    def test_metadata(self):
+        self.assertEqual(self.reader.frame_count, self.num_frames)
+        self.assertEqual((self.reader.width, self.reader.height), (64, 48))
+        self.assertAlmostEqual(self.reader.fps, 25.0)
+
+    def test_stepping_forward_does_not_seek(self):
+        for i in range(10):
+            self.assertEqual(frame_number(self.reader.read(i)), i)
+        self.assertEqual(self.reader.seeks, 0)
+        self.assertEqual(frame_number(self.reader.read(13)), 13, "Short skips decode forward.")
+        self.assertEqual(self.reader.seeks, 0)
+
+    def test_jumps_seek_to_the_right_frame(self):
+        for target in (30, 2, 25, 24, 28):
+            self.assertEqual(frame_number(self.reader.read(target)), target)
+        self.assertEqual(self.reader.seeks, 4, "Backwards steps and far jumps seek.")
+        self.assertIs(self.reader.read(28), self.reader.read(28), "Re-reading the current frame is free.")
+
+    def test_out_of_range(self):
+        self.assertIsNone(self.reader.read(-1))
+        self.assertIsNone(self.reader.read(self.num_frames))
+        self.reader.release()
+        self.assertFalse(self.reader.is_opened())
+        self.assertIsNone(self.reader.read(0))
+
+    def test_missing_file(self):
+        with self.assertRaises(ValueError):
+            VideoReader(os.path.join(self.temp_dir.name, "missing.mp4"))
+
+
+if __name__ == '__main__':
+    unittest.main()
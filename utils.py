@@ -1,16 +1,64 @@
+import csv
 import numpy as np
 import pandas as pd
 import warnings
 
+from keypoint_cache import (DEFAULT_MAX_CACHE_BYTES, read_cached_keypoints, write_cached_keypoints,
+                            invalidate_keypoint_cache)
 
-def load_keypoint_data(file_path):
+# Sign applied to each (x, y, z) axis when keypoints from a given file type are displayed or exported.
+NPY_AXIS_SIGNS = (-1, -1, 1)
+CSV_AXIS_SIGNS = (-1, 1, 1)
+
+
+
+class OperationCancelled(Exception):
+    """ Raised from a progress callback to abort a long-running load or save. """
+
+
+# Number of leading rows inspected to work out a CSV's layout, and approximate size of each parsed chunk.
+CSV_SNIFF_ROWS = 64
+CSV_CHUNK_BYTES = 16 * 1024 * 1024
+
+
+def keypoint_axis_signs(file_path):
+    """
+    Returns the per-axis signs used to orient keypoints loaded from file_path,
+    or None if the data is used as stored.
+    """
+    if file_path.endswith('.npy'):
+        return NPY_AXIS_SIGNS
+    elif file_path.endswith('.csv'):
+        return CSV_AXIS_SIGNS
+    return None
+
+
+def orient_keypoints(keypoints, axis_signs):
+    """
+    Applies axis_signs to a frame or a block of frames and returns the result as a new array.
+    The source array is never modified, so read-only memory-mapped data can be passed directly.
+    """
+    keypoints = np.asarray(keypoints)
+    if axis_signs is None:
+        return keypoints
+    return keypoints * np.asarray(axis_signs, dtype=keypoints.dtype)
+
+
+def load_keypoint_data(file_path, mmap_mode=None, use_cache=False, refresh_cache=False,
+                       max_cache_bytes=DEFAULT_MAX_CACHE_BYTES, progress=None):
     """
     Loads keypoint data from .npy or .csv files with error handling.
     It attempts to return a 3D NumPy array of shape (frames, num_keypoints, 3).
+    With mmap_mode (e.g. 'r'), .npy files are memory-mapped instead of read into RAM,
+    so opening a file costs the same regardless of its length.
+    With use_cache, parsed CSVs are stored in a binary sidecar (see keypoint_cache) that later
+    loads reuse, memory-mapped with mmap_mode; refresh_cache discards an existing sidecar first.
+    progress, if given, is called as progress(rows_done, rows_total) while a CSV is parsed and may
+    raise OperationCancelled to abort the load (the exception propagates to the caller).
     """
     try:
         if file_path.endswith('.npy'):
-            keypoints = np.load(file_path)
+            keypoints = np.load(file_path, mmap_mode=mmap_mode)
             if keypoints.ndim == 3 and keypoints.shape[-1] == 3:
                 return keypoints
             elif keypoints.ndim == 2 and keypoints.shape[1] > 0 and keypoints.shape[1] % 3 == 0:
@@ -29,97 +77,238 @@ def load_keypoint_data(file_path):
                 return None
 
         elif file_path.endswith('.csv'):
+            if use_cache:
+                if refresh_cache:
+                    invalidate_keypoint_cache(file_path)
+                cached = read_cached_keypoints(file_path, mmap_mode=mmap_mode)
+                if cached is not None:
+                    keypoints, frame_index_stripped = cached
+                    if frame_index_stripped:
+                        _warn_frame_index_stripped(file_path)
+                    return keypoints
             try:
-                df = pd.read_csv(file_path, header=None, skip_blank_lines=True)
-
-                if df.empty:
-                    # This case is often caught by EmptyDataError if file is truly empty or unparsable
-                    warnings.warn(f"Warning: CSV file '{file_path}' is empty or resulted in an empty DataFrame.",
-                                  UserWarning)
-                    return None
-
-                df_numeric_coerce = df.apply(pd.to_numeric, errors='coerce')
-                df_cleaned_rows = df_numeric_coerce.dropna(axis=0, how='all')
-
-                if df_cleaned_rows.empty:
-                    warnings.warn(
-                        f"Warning: No data rows found in CSV '{file_path}' after attempting to clean headers/text.",
-                        UserWarning)
-                    return None
-
-                df_cleaned_cols = df_cleaned_rows.dropna(axis=1, how='all')
-                if df_cleaned_cols.empty:
-                    warnings.warn(
-                        f"Warning: No numeric columns found in CSV '{file_path}' after cleaning text columns.",
-                        UserWarning)
-                    return None
-
-                potential_keypoint_df = df_cleaned_cols
-                num_initial_numeric_cols = df_cleaned_cols.shape[1]
-
-                if num_initial_numeric_cols > 1:
-                    first_col_is_int_like = False
-                    try:
-                        if not df_cleaned_cols.iloc[:, 0].isnull().all():
-                            # Check if convertible to float first, then to Int64 for null-safety
-                            df_cleaned_cols.iloc[:, 0].astype(float).astype('Int64')
-                            first_col_is_int_like = True
-                    except (ValueError, TypeError):
-                        pass
-
-                    if first_col_is_int_like:
-                        cols_after_removing_first = num_initial_numeric_cols - 1
-                        if cols_after_removing_first > 0 and cols_after_removing_first % 3 == 0:
-                            warnings.warn(
-                                f"Info: Assuming the first numeric column in '{file_path}' is a frame index "
-                                "and excluding it from keypoint data.", UserWarning
-                            )
-                            potential_keypoint_df = df_cleaned_cols.iloc[:, 1:]
-
-                if potential_keypoint_df.empty or potential_keypoint_df.shape[1] == 0:
-                    warnings.warn(f"Warning: No keypoint data columns remaining in '{file_path}' after processing.",
-                                  UserWarning)
-                    return None
-
-                # CRITICAL CHECK: After all cleaning, if any NaNs remain in the data intended for keypoints,
-                # it means some original non-numeric string data was present where numbers were expected.
-                if potential_keypoint_df.isnull().values.any():
-                    warnings.warn(
-                        f"Warning: CSV file '{file_path}' contains non-numeric values or unparseable entries "
-                        "within the presumed keypoint data area. Cannot form clean numeric keypoints.", UserWarning
-                    )
-                    return None  # Keypoint data must be purely numeric
-
-                keypoints_2d = potential_keypoint_df.values.astype(float)  # Now this should be safe
-
-                num_frames = keypoints_2d.shape[0]
-                num_data_columns = keypoints_2d.shape[1]
-
-                if num_data_columns > 0 and num_data_columns % 3 == 0:
-                    num_keypoints = num_data_columns // 3
-                    keypoints_3d = keypoints_2d.reshape(num_frames, num_keypoints, 3)
-                    return keypoints_3d
-                else:
-                    warnings.warn(
-                        f"Warning: Number of final numeric data columns ({num_data_columns}) in CSV '{file_path}' "
-                        f"is not divisible by 3. Cannot reshape to (frames, points, 3). "
-                        f"Original numeric columns before frame exclusion attempt: {num_initial_numeric_cols}. "
-                        f"Processed data shape: {keypoints_2d.shape}", UserWarning
-                    )
-                    return None
-
-            except pd.errors.EmptyDataError:
-                warnings.warn(f"Error: CSV file '{file_path}' is completely empty (EmptyDataError).", UserWarning)
-                return None
-            except Exception as e:
-                warnings.warn(f"Error processing CSV file '{file_path}': {e}", UserWarning)
-                return None
+                keypoints, frame_index_stripped = _read_keypoint_csv(file_path, progress=progress)
+            except OperationCancelled:
+                raise
+            except Exception:
+                # Anything the streaming reader cannot handle exactly (text cells, ragged rows, NaNs,
+                # layout changes after the sniffed rows) goes through the tolerant pandas path,
+                # which produces the detailed warnings.
+                keypoints, frame_index_stripped = _load_keypoint_csv_coerced(file_path)
+            if use_cache and keypoints is not None:
+                write_cached_keypoints(file_path, keypoints, frame_index_stripped, max_bytes=max_cache_bytes)
+            return keypoints
         else:
             warnings.warn(f"Unsupported file format: '{file_path}'. Please use .npy or .csv.", UserWarning)
             return None
+    except OperationCancelled:
+        raise
     except FileNotFoundError:
         warnings.warn(f"Error: File not found at '{file_path}'", UserWarning)
         return None
     except Exception as e:
         warnings.warn(f"An unexpected error occurred while loading '{file_path}': {e}", UserWarning)
         return None
+
+
+def _warn_frame_index_stripped(file_path):
+    warnings.warn(
+        f"Info: Assuming the first numeric column in '{file_path}' is a frame index "
+        "and excluding it from keypoint data.", UserWarning
+    )
+
+
+class _CsvLayoutError(ValueError):
+    """ Raised when a CSV does not match the layout the streaming reader can parse exactly. """
+
+
+def _is_number(cell):
+    try:
+        float(cell)
+    except ValueError:
+        return False
+    return True
+
+
+def _count_lines(file_path, block_size=1 << 24):
+    """ Upper bound for the number of rows in a text file (newline count + 1). """
+    count = 1
+    with open(file_path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            count += block.count(b'\n')
+    return count
+
+
+def _sniff_keypoint_csv(file_path, sniff_rows=CSV_SNIFF_ROWS):
+    """
+    Works out the layout of a keypoint CSV from its first rows.
+    Returns (header_lines, num_columns, has_frame_column), where header_lines is the number of raw
+    lines before the first numeric row.
+    """
+    header_lines = 0
+    data_rows = []
+    with open(file_path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        for row in reader:
+            cells = [cell.strip() for cell in row]
+            if not any(cells):
+                if not data_rows:
+                    header_lines = reader.line_num
+                continue
+            numeric = [_is_number(cell) for cell in cells]
+            if not data_rows and not any(numeric):
+                header_lines = reader.line_num
+                continue
+            if not all(numeric):
+                raise _CsvLayoutError("Text or empty cells in the data rows.")
+            data_rows.append([float(cell) for cell in cells])
+            if len(data_rows) >= sniff_rows:
+                break
+
+    if not data_rows:
+        raise _CsvLayoutError("No numeric rows found.")
+    num_columns = len(data_rows[0])
+    if any(len(row) != num_columns for row in data_rows):
+        raise _CsvLayoutError("Rows have different numbers of columns.")
+    has_frame_column = (num_columns > 1 and (num_columns - 1) % 3 == 0
+                        and all(row[0].is_integer() for row in data_rows))
+    if (num_columns - int(has_frame_column)) % 3 != 0:
+        raise _CsvLayoutError("Keypoint columns are not divisible by 3.")
+    return header_lines, num_columns, has_frame_column
+
+
+def _read_keypoint_csv(file_path, chunk_bytes=CSV_CHUNK_BYTES, progress=None):
+    """
+    Streaming reader for purely numeric keypoint CSVs. The layout is sniffed from the first rows,
+    then typed chunks are parsed straight into a preallocated float array, so peak memory stays
+    close to the size of the result. Raises for anything it cannot reproduce exactly.
+    Returns (keypoints, frame_index_stripped).
+    """
+    header_lines, num_columns, has_frame_column = _sniff_keypoint_csv(file_path)
+    first_keypoint_column = 1 if has_frame_column else 0
+    capacity = _count_lines(file_path) - header_lines
+    keypoints_2d = np.empty((capacity, num_columns - first_keypoint_column), dtype=np.float64)
+    frame_column = np.empty(capacity, dtype=np.float64) if has_frame_column else None
+    chunk_rows = max(1, chunk_bytes // (num_columns * 8))
+
+    num_rows = 0
+    with pd.read_csv(file_path, header=None, skiprows=header_lines, dtype=np.float64,
+                     skip_blank_lines=True, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            values = chunk.to_numpy()
+            rows_in_chunk = values.shape[0]
+            if values.shape[1] != num_columns or num_rows + rows_in_chunk > capacity:
+                raise _CsvLayoutError("Layout changed after the sniffed rows.")
+            if np.isnan(values[:, first_keypoint_column:]).any():
+                raise _CsvLayoutError("Missing values in the keypoint data area.")
+            keypoints_2d[num_rows:num_rows + rows_in_chunk] = values[:, first_keypoint_column:]
+            if has_frame_column:
+                frame_column[num_rows:num_rows + rows_in_chunk] = values[:, 0]
+            num_rows += rows_in_chunk
+            if progress is not None:
+                progress(num_rows, capacity)
+
+    if num_rows == 0:
+        raise _CsvLayoutError("No data rows.")
+    if has_frame_column:
+        frames = frame_column[:num_rows]
+        frames = frames[~np.isnan(frames)]
+        if frames.size == 0 or not np.all(frames == np.floor(frames)):
+            raise _CsvLayoutError("First column is not a frame index.")
+        _warn_frame_index_stripped(file_path)
+    return keypoints_2d[:num_rows].reshape(num_rows, -1, 3), has_frame_column
+
+
+def _load_keypoint_csv_coerced(file_path):
+    """
+    Tolerant CSV loader: reads every cell as text, coerces to numeric and drops text-only
+    rows/columns before validating the keypoint area. Slow, but handles arbitrary layouts.
+    Returns (keypoints or None, frame_index_stripped).
+    """
+    try:
+        df = pd.read_csv(file_path, header=None, skip_blank_lines=True)
+
+        if df.empty:
+            # This case is often caught by EmptyDataError if file is truly empty or unparsable
+            warnings.warn(f"Warning: CSV file '{file_path}' is empty or resulted in an empty DataFrame.",
+                          UserWarning)
+            return None, False
+
+        df_numeric_coerce = df.apply(pd.to_numeric, errors='coerce')
+        df_cleaned_rows = df_numeric_coerce.dropna(axis=0, how='all')
+
+        if df_cleaned_rows.empty:
+            warnings.warn(
+                f"Warning: No data rows found in CSV '{file_path}' after attempting to clean headers/text.",
+                UserWarning)
+            return None, False
+
+        df_cleaned_cols = df_cleaned_rows.dropna(axis=1, how='all')
+        if df_cleaned_cols.empty:
+            warnings.warn(
+                f"Warning: No numeric columns found in CSV '{file_path}' after cleaning text columns.",
+                UserWarning)
+            return None, False
+
+        potential_keypoint_df = df_cleaned_cols
+        frame_index_stripped = False
+        num_initial_numeric_cols = df_cleaned_cols.shape[1]
+
+        if num_initial_numeric_cols > 1:
+            first_col_is_int_like = False
+            try:
+                if not df_cleaned_cols.iloc[:, 0].isnull().all():
+                    # Check if convertible to float first, then to Int64 for null-safety
+                    df_cleaned_cols.iloc[:, 0].astype(float).astype('Int64')
+                    first_col_is_int_like = True
+            except (ValueError, TypeError):
+                pass
+
+            if first_col_is_int_like:
+                cols_after_removing_first = num_initial_numeric_cols - 1
+                if cols_after_removing_first > 0 and cols_after_removing_first % 3 == 0:
+                    _warn_frame_index_stripped(file_path)
+                    potential_keypoint_df = df_cleaned_cols.iloc[:, 1:]
+                    frame_index_stripped = True
+
+        if potential_keypoint_df.empty or potential_keypoint_df.shape[1] == 0:
+            warnings.warn(f"Warning: No keypoint data columns remaining in '{file_path}' after processing.",
+                          UserWarning)
+            return None, False
+
+        # CRITICAL CHECK: After all cleaning, if any NaNs remain in the data intended for keypoints,
+        # it means some original non-numeric string data was present where numbers were expected.
+        if potential_keypoint_df.isnull().values.any():
+            warnings.warn(
+                f"Warning: CSV file '{file_path}' contains non-numeric values or unparseable entries "
+                "within the presumed keypoint data area. Cannot form clean numeric keypoints.", UserWarning
+            )
+            return None, False  # Keypoint data must be purely numeric
+
+        keypoints_2d = potential_keypoint_df.values.astype(float)  # Now this should be safe
+
+        num_frames = keypoints_2d.shape[0]
+        num_data_columns = keypoints_2d.shape[1]
+
+        if num_data_columns > 0 and num_data_columns % 3 == 0:
+            num_keypoints = num_data_columns // 3
+            keypoints_3d = keypoints_2d.reshape(num_frames, num_keypoints, 3)
+            return keypoints_3d, frame_index_stripped
+        else:
+            warnings.warn(
+                f"Warning: Number of final numeric data columns ({num_data_columns}) in CSV '{file_path}' "
+                f"is not divisible by 3. Cannot reshape to (frames, points, 3). "
+                f"Original numeric columns before frame exclusion attempt: {num_initial_numeric_cols}. "
+                f"Processed data shape: {keypoints_2d.shape}", UserWarning
+            )
+            return None, False
+
+    except pd.errors.EmptyDataError:
+        warnings.warn(f"Error: CSV file '{file_path}' is completely empty (EmptyDataError).", UserWarning)
+        return None, False
+    except Exception as e:
+        warnings.warn(f"Error processing CSV file '{file_path}': {e}", UserWarning)
+        return None, False
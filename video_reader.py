@@ -0,0 +1,117 @@
+import cv2
+
+# Targets at most this many frames ahead of the decoder are reached by decoding forward; anything
+# else (backwards, or further ahead) seeks. A seek restarts decoding at the previous keyframe, so
+# for typical GOP lengths a short forward decode is cheaper.
+DEFAULT_READ_AHEAD = 16
+
+
+class VideoReader:
+    """
+    cv2.VideoCapture wrapper for frame-indexed access. It keeps the metadata read at open time and
+    tracks which frame the decoder returns next, so stepping forward reads sequentially and only
+    real jumps pay for a seek. With a KeyframeIndex, seeks go to the nearest keyframe and decode
+    forward to exactly the requested frame, and any target in the decoder's current GOP is reached
+    without seeking.
+    """
+
+    def __init__(self, path, read_ahead=DEFAULT_READ_AHEAD, keyframe_index=None):
+        self.path = path
+        self.read_ahead = read_ahead
+        self._cap = cv2.VideoCapture(path)
+        if not self._cap.isOpened():
+            raise ValueError("Could not open video file.")
+        self.frame_count = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = self._cap.get(cv2.CAP_PROP_FPS)
+        self.width = int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.keyframe_index = keyframe_index
+        if keyframe_index is not None and keyframe_index.frame_count:
+            # Counted from the packets; the container's frame count can be an estimate.
+            self.frame_count = keyframe_index.frame_count
+        # Index of the frame the next cap.read() returns; None when unknown (after a failed read).
+        self._next_index = 0
+        self._last_index = None
+        self._last_frame = None
+        self.seeks = 0
+        self.sequential_reads = 0
+
+    def is_opened(self):
+        return self._cap is not None and self._cap.isOpened()
+
+    def read(self, index):
+        """
+        Returns frame index as a BGR array, or None if it is out of range or cannot be decoded.
+        The returned array is shared with the reader's one-frame memo; do not modify it.
+        """
+        if not self.is_opened() or not 0 <= index < self.frame_count:
+            return None
+        if index == self._last_index:
+            return self._last_frame
+        if self._decodes_forward_to(index):
+            positioned = self._grab_forward(index - self._next_index + 1)
+            self.sequential_reads += 1
+        else:
+            positioned = self._seek_and_grab(index)
+            self.seeks += 1
+        ok, frame = self._cap.retrieve() if positioned else (False, None)
+        if not ok:
+            self._next_index = None
+            self._last_index = self._last_frame = None
+            return None
+        self._next_index = index + 1
+        self._last_index, self._last_frame = index, frame
+        return frame
+
+    def _decodes_forward_to(self, index):
+        if self._next_index is None or index < self._next_index:
+            return False
+        if index - self._next_index <= self.read_ahead:
+            return True
+        # No keyframe in between: a seek would restart from a keyframe at or before our position.
+        return self.keyframe_index is not None and self.keyframe_index.keyframe_at_or_before(index) <= self._next_index
+
+    def _grab_forward(self, count):
+        for _ in range(count):
+            if not self._cap.grab():
+                return False
+        return True
+
+    def _seek_and_grab(self, index):
+        """ Seeks so that the last grabbed frame is index. """
+        if self.keyframe_index is None:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            return self._cap.grab()
+        keyframe = self.keyframe_index.keyframe_at_or_before(index)
+        while keyframe is not None:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+            if not self._cap.grab():
+                return False
+            landed = self.keyframe_index.frame_at_pts(int(self._cap.get(cv2.CAP_PROP_PTS)))
+            if landed is None:
+                landed = keyframe
+            if landed <= index:
+                return self._grab_forward(index - landed)
+            # The backend's seek overshot; start from the keyframe before.
+            keyframe = self.keyframe_index.keyframe_before(keyframe)
+        return False
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        self._last_index = self._last_frame = None
+
+
+def fitted_size(w, h, width, height):
+    """ (width, height) of a w x h frame scaled to fit in width x height, keeping its aspect ratio. """
+    scale = min(width / w, height / h)
+    return max(1, round(w * scale)), max(1, round(h * scale))
+
+
+def fit_frame(frame, width, height):
+    """ Downscales frame to fit in width x height, keeping its aspect ratio. Never upscales. """
+    h, w = frame.shape[:2]
+    if width <= 0 or height <= 0 or min(width / w, height / h) >= 1:
+        return frame
+    return cv2.resize(frame, fitted_size(w, h, width, height), interpolation=cv2.INTER_AREA)